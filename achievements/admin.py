@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+
 from django.contrib import admin
 from django import forms
 
-from .models import Achievement, AchievementImage, AREAS, VILLAGES
+from .geography import get_geography
+from .jobs import enqueue_renditions
+from .models import Achievement, AchievementImage, Area, RenditionJob, Village
 
 
 class AchievementAdminForm(forms.ModelForm):
@@ -13,24 +17,39 @@ class AchievementAdminForm(forms.ModelForm):
 
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
-		if self.instance and self.instance.pk:
-			# If editing existing achievement, set initial village choices
-			area = self.instance.area
-			if area in VILLAGES:
-				self.fields['village'].choices = [('', '---------')] + VILLAGES[area]
+		geography = get_geography()
+		# المراكز والقرى من جدولي Area و Village بدل قوائم ثابتة في الكود
+		if self.is_bound:
+			area = self.data.get(self.add_prefix('area'))
 		else:
-			# If creating new achievement, start with empty village choices
-			self.fields['village'].choices = [('', '---------')]
+			area = self.instance.area if self.instance and self.instance.pk else None
+		village_choices = [('', '---------')] + list(geography.village_choices(area))
+		current_village = self.instance.village if self.instance and self.instance.pk else None
+		if current_village and current_village not in dict(village_choices):
+			# قيمة قديمة غير موجودة في الجدول تبقى قابلة للحفظ كما هي
+			village_choices.append((current_village, current_village))
+		self.fields['area'] = forms.ChoiceField(
+			label=self.fields['area'].label,
+			choices=[('', '---------')] + geography.area_choices(),
+			widget=forms.Select(attrs=self.fields['area'].widget.attrs),
+		)
+		self.fields['village'] = forms.ChoiceField(
+			label=self.fields['village'].label,
+			choices=village_choices,
+			required=False,
+		)
+
+	def clean_village(self):
+		return self.cleaned_data.get('village') or None
 
 	def clean(self):
 		cleaned_data = super().clean()
 		area = cleaned_data.get('area')
 		village = cleaned_data.get('village')
 		
-		if area and village:
+		if area and village and village != self.instance.village:
 			# Check if village belongs to selected area
-			area_villages = [v[0] for v in VILLAGES.get(area, [])]
-			if village not in area_villages:
+			if not get_geography().belongs(area, village):
 				raise forms.ValidationError(f"القرية '{village}' لا تنتمي للمركز '{area}'")
 		
 		return cleaned_data
@@ -66,11 +85,43 @@ class AchievementAdmin(admin.ModelAdmin):
 		form = super().get_form(request, obj, **kwargs)
 		if 'area' in form.base_fields:
 			# Make area field trigger village field update
+			villages = {area: list(choices) for area, choices in get_geography().villages.items()}
 			form.base_fields['area'].widget.attrs.update({
-				'onchange': 'updateVillageChoices(this.value)'
+				'onchange': 'updateVillageChoices(this.value)',
+				'data-villages': json.dumps(villages, ensure_ascii=False),
 			})
 		return form
 
 	class Media:
 		js = ('admin/js/achievement_admin.js',)
 
+
+class VillageInline(admin.TabularInline):
+	model = Village
+	extra = 3
+	fields = ("name", "sort_order")
+
+
+@admin.register(Area)
+class AreaAdmin(admin.ModelAdmin):
+	list_display = ("name", "sort_order")
+	list_editable = ("sort_order",)
+	ordering = ("sort_order", "id")
+	inlines = [VillageInline]
+
+
+@admin.register(RenditionJob)
+class RenditionJobAdmin(admin.ModelAdmin):
+	list_display = ("id", "image", "status", "attempts", "run_after", "worker", "updated_at")
+	list_filter = ("status",)
+	list_select_related = ("image",)
+	readonly_fields = ("image", "status", "attempts", "run_after", "worker", "last_error", "created_at", "updated_at")
+	actions = ["retry_jobs"]
+
+	def has_add_permission(self, request):
+		return False
+
+	def retry_jobs(self, request, queryset):
+		count = enqueue_renditions(queryset.values_list("image_id", flat=True))
+		self.message_user(request, f"تمت إعادة {count} مهمة إلى الطابور")
+	retry_jobs.short_description = "إعادة المحاولة"
@@ -7,3 +7,6 @@ class AchievementsConfig(AppConfig):
 	default_auto_field = "django.db.models.BigAutoField"
 	name = "achievements"
 
+
+	def ready(self):
+		from . import signals  # noqa: F401
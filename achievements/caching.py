@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+CONTENT_VERSION_KEY = "achievements:content-version"
+# المفاتيح مرتبطة برقم الإصدار فلا حاجة لانتهاء صلاحية قصير
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _fresh_version() -> int:
+	# قيمة مبنية على الوقت حتى لا يعود الإصدار لقيمة قديمة إذا حُذف المفتاح من الكاش
+	return time.time_ns() // 1000
+
+
+def get_content_version() -> int:
+	version = cache.get(CONTENT_VERSION_KEY)
+	if version is None:
+		cache.add(CONTENT_VERSION_KEY, _fresh_version(), None)
+		version = cache.get(CONTENT_VERSION_KEY)
+	return version
+
+
+def bump_content_version() -> None:
+	"""يُستدعى عند أي تغيير في الإنجازات أو صورها فتصبح كل الأجزاء المخزنة قديمة"""
+	try:
+		cache.incr(CONTENT_VERSION_KEY)
+	except ValueError:
+		cache.set(CONTENT_VERSION_KEY, _fresh_version(), None)
+
+
+def versioned_key(prefix: str, version: int, *parts) -> str:
+	# قيم الفلتر من المستخدم (عربي ومسافات) تُختصر ببصمة لتناسب قيود مفاتيح memcached
+	digest = hashlib.md5("\x00".join(str(p or "") for p in parts).encode("utf-8")).hexdigest()
+	return f"{prefix}:{version}:{digest}"
+
+
+class CachedCountPaginator(Paginator):
+	"""Paginator يحفظ عدد النتائج في الكاش لكل (إصدار، فلتر)"""
+
+	def __init__(self, object_list, per_page, count_key: str, **kwargs):
+		super().__init__(object_list, per_page, **kwargs)
+		self.count_key = count_key
+
+	@cached_property
+	def count(self):
+		count = cache.get(self.count_key)
+		if count is None:
+			count = super().count
+			cache.set(self.count_key, count, CACHE_TIMEOUT)
+		return count
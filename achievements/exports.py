@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from PIL import Image, ImageOps
+
+from .geography import get_geography
+from .models import Achievement, AchievementImage
+
+
+EXPORT_CHUNK_SIZE = 500
+# أقصى ضلع للصورة المضمّنة في ملف Excel
+EMBED_SIZE = 96
+# الصور المضمّنة تبقى في الذاكرة حتى حفظ الملف (openpyxl)، فعددها محدود؛ بعده تُكتب الروابط فقط
+MAX_EMBEDDED_IMAGES = 2000
+
+HEADERS = [
+	"م",  # order
+	"اسم المشروع",  # project name (title)
+	"الوصف",
+	"المركز",
+	"القرية",
+	"رابط الصورة الأولى",  # hyperlink to first image file (if exists)
+]
+IMAGE_HEADERS = [
+	"م",  # order (achievement id)
+	"اسم المشروع",
+	"اسم الملف",
+	"المسار الكامل",
+	"رابط الملف",
+]
+FORMATS = ("xlsx", "csv", "parquet")
+
+
+@dataclass
+class ExportImage:
+	name: str
+	path: str
+	renditions: dict
+
+	@property
+	def filename(self) -> str:
+		return Path(self.name).name
+
+	@property
+	def link(self) -> str:
+		return Path(self.path).as_uri() if self.path else ""
+
+
+@dataclass
+class ExportRow:
+	id: int
+	title: str
+	description: str
+	area: str
+	village: str
+	images: list[ExportImage] = field(default_factory=list)
+
+
+def _storage():
+	return AchievementImage._meta.get_field("image").storage
+
+
+def _path(storage, name: str) -> str:
+	# المسار يُحسب دون فحص وجود الملف (مخزن المحتوى يضمن وجوده)
+	try:
+		return storage.path(name)
+	except NotImplementedError:
+		return ""
+
+
+def _with_images(chunk: list[tuple], storage, geography) -> Iterator[ExportRow]:
+	rows = {
+		pk: ExportRow(pk, title, description, area, geography.village_name(village) if village else "")
+		for pk, title, description, area, village in chunk
+	}
+	images = (
+		AchievementImage.objects.filter(achievement_id__in=rows)
+		.exclude(image="")
+		.exclude(image__isnull=True)
+		.order_by("id")
+		.values_list("achievement_id", "image", "renditions")
+	)
+	for achievement_id, name, renditions in images:
+		rows[achievement_id].images.append(ExportImage(name, _path(storage, name), renditions or {}))
+	yield from rows.values()
+
+
+def iter_export_rows(queryset=None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[ExportRow]:
+	"""مرور واحد على الإنجازات بدفعات، مع استعلام صور واحد لكل دفعة"""
+	if queryset is None:
+		queryset = Achievement.objects.all()
+	rows = queryset.order_by("id").values_list("id", "title", "description", "area", "village").iterator(chunk_size=chunk_size)
+	storage, geography = _storage(), get_geography()
+	for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+		yield from _with_images(chunk, storage, geography)
+
+
+def embed_thumbnail(image: ExportImage, storage=None) -> bytes | None:
+	"""JPEG صغير للتضمين من المقاس المصغّر المولَّد مسبقًا، أو من الأصل إن لم يوجد"""
+	storage = storage or _storage()
+	thumb = image.renditions.get("thumb", {}).get("jpeg") if image.renditions.get("source") == image.name else None
+	try:
+		with storage.open(thumb["name"] if thumb else image.name, "rb") as f:
+			picture = Image.open(f)
+			# فك ترميز JPEG بدقة مخفضة مباشرة بدل تحميل الأصل كاملًا
+			picture.draft("RGB", (EMBED_SIZE * 2, EMBED_SIZE * 2))
+			picture = ImageOps.exif_transpose(picture)
+			picture.thumbnail((EMBED_SIZE, EMBED_SIZE))
+			buffer = BytesIO()
+			picture.convert("RGB").save(buffer, "JPEG", quality=80)
+	except Exception:
+		return None
+	return buffer.getvalue()
+
+
+def _batched(rows: Iterable[ExportRow], size: int) -> Iterator[list[ExportRow]]:
+	rows = iter(rows)
+	return iter(lambda: list(islice(rows, size)), [])
+
+
+def write_xlsx(
+	output,
+	rows: Iterable[ExportRow],
+	embed_images: bool = False,
+	workers: int = 4,
+	max_images: int = MAX_EMBEDDED_IMAGES,
+) -> int:
+	"""
+	ورقتان في وضع write-only: الصفوف تُكتب للقرص فورًا ولا تبقى في الذاكرة.
+	الصور المضمّنة استثناء: تبقى حتى الحفظ، لذلك يُضمَّن أول max_images صورة فقط.
+	"""
+	from openpyxl import Workbook
+	from openpyxl.cell import WriteOnlyCell
+	from openpyxl.drawing.image import Image as XLImage
+
+	workbook = Workbook(write_only=True)
+	ws = workbook.create_sheet("Achievements")
+	ws_images = workbook.create_sheet("Images")
+	# أبعاد الأعمدة تُكتب مع أول صف في وضع write-only، فتُضبط قبله
+	if embed_images:
+		ws.column_dimensions["G"].width = 14
+	ws.append(HEADERS)
+	ws_images.append(IMAGE_HEADERS)
+
+	storage = _storage()
+	count = 0
+	remaining = max_images if embed_images else 0
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		for chunk in _batched(rows, EXPORT_CHUNK_SIZE):
+			firsts = [row.images[0] if row.images else None for row in chunk]
+			thumbs = [None] * len(chunk)
+			if remaining > 0:
+				positions = [i for i, image in enumerate(firsts) if image is not None][:remaining]
+				remaining -= len(positions)
+				# الملف المشترك بين عدة إنجازات يُصغَّر مرة واحدة؛ Pillow يحرر الـ GIL فتعمل الخيوط بالتوازي
+				unique = {firsts[i].name: firsts[i] for i in positions}
+				made = dict(zip(unique, pool.map(lambda image: embed_thumbnail(image, storage), unique.values())))
+				for i in positions:
+					thumbs[i] = made[firsts[i].name]
+			for row, first, thumb in zip(chunk, firsts, thumbs):
+				count += 1
+				row_number = count + 1
+				link = ""
+				if first is not None and first.link:
+					link = WriteOnlyCell(ws, value="فتح الصورة")
+					link.hyperlink = first.link
+					link.style = "Hyperlink"
+				if thumb:
+					picture = XLImage(BytesIO(thumb))
+					picture.anchor = f"G{row_number}"
+					ws.add_image(picture)
+					ws.row_dimensions[row_number].height = 80
+				ws.append([row.id, row.title, row.description, row.area, row.village, link])
+				for image in row.images:
+					ws_images.append([row.id, row.title, image.filename, image.path, image.link])
+	workbook.save(output)
+	return count
+
+
+def write_csv(output, rows: Iterable[ExportRow]) -> int:
+	"""صف لكل إنجاز، والصور مفصولة بـ | (utf-8-sig حتى يفتحه Excel بالعربية)"""
+	count = 0
+	with open(output, "w", newline="", encoding="utf-8-sig") as f:
+		writer = csv.writer(f)
+		writer.writerow(HEADERS[:-1] + ["الصور"])
+		for row in rows:
+			count += 1
+			writer.writerow([
+				row.id, row.title, row.description, row.area, row.village,
+				" | ".join(image.path or image.name for image in row.images),
+			])
+	return count
+
+
+def write_parquet(output, rows: Iterable[ExportRow]) -> int:
+	"""يتطلب pyarrow؛ كل دفعة تُكتب كمجموعة صفوف مستقلة"""
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+
+	schema = pa.schema([
+		("id", pa.int64()),
+		("title", pa.string()),
+		("description", pa.string()),
+		("area", pa.string()),
+		("village", pa.string()),
+		("images", pa.list_(pa.string())),
+	])
+	count = 0
+	with pq.ParquetWriter(output, schema) as writer:
+		for chunk in _batched(rows, EXPORT_CHUNK_SIZE):
+			count += len(chunk)
+			writer.write_table(pa.Table.from_pydict({
+				"id": [row.id for row in chunk],
+				"title": [row.title for row in chunk],
+				"description": [row.description for row in chunk],
+				"area": [row.area for row in chunk],
+				"village": [row.village for row in chunk],
+				"images": [[image.path or image.name for image in row.images] for row in chunk],
+			}, schema=schema))
+	return count
+
+
+def export_achievements(
+	output,
+	fmt: str = "xlsx",
+	queryset=None,
+	embed_images: bool = False,
+	workers: int = 4,
+	max_images: int = MAX_EMBEDDED_IMAGES,
+) -> int:
+	rows = iter_export_rows(queryset)
+	if fmt == "xlsx":
+		return write_xlsx(output, rows, embed_images=embed_images, workers=workers, max_images=max_images)
+	if fmt == "csv":
+		return write_csv(output, rows)
+	if fmt == "parquet":
+		return write_parquet(output, rows)
+	raise ValueError(f"Unknown export format: {fmt}")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+
+from .caching import CACHE_TIMEOUT, get_content_version
+from .geography import get_geography
+from .models import Achievement, AchievementFacetCount
+
+
+def _facet_keys(area: str | None, village: str | None) -> list[tuple[str, str]]:
+	if not area:
+		return []
+	keys = [(area, "")]
+	if village:
+		keys.append((area, village))
+	return keys
+
+
+def adjust_facets(changes: Counter) -> None:
+	"""تطبيق فروق العدّ: changes من (area, village) إلى +n أو -n"""
+	deltas: Counter = Counter()
+	for (area, village), delta in changes.items():
+		for key in _facet_keys(area, village):
+			deltas[key] += delta
+	deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+	if not deltas:
+		return
+	AchievementFacetCount.objects.bulk_create(
+		[AchievementFacetCount(area=area, village=village) for area, village in deltas],
+		ignore_conflicts=True,
+	)
+	for (area, village), delta in deltas.items():
+		if delta > 0:
+			count = F("count") + delta
+		else:
+			# لا ينزل تحت الصفر (عمود unsigned في MySQL)
+			count = Case(When(count__gt=-delta, then=F("count") + delta), default=Value(0))
+		AchievementFacetCount.objects.filter(area=area, village=village).update(count=count)
+
+
+def rebuild_facets() -> int:
+	"""إعادة بناء الجدول كاملًا باستعلام GROUP BY (بعد الاستيراد أو التعديل المباشر)"""
+	totals: Counter = Counter()
+	rows = Achievement.objects.values("area", "village").annotate(n=Count("id")).order_by()
+	for row in rows:
+		for key in _facet_keys(row["area"], row["village"]):
+			totals[key] += row["n"]
+	with transaction.atomic():
+		AchievementFacetCount.objects.all().delete()
+		AchievementFacetCount.objects.bulk_create(
+			[AchievementFacetCount(area=area, village=village, count=n) for (area, village), n in totals.items()]
+		)
+	return len(totals)
+
+
+def get_facets() -> dict:
+	"""{"areas": {مركز: عدد}, "villages": {مركز: {قرية: عدد}}} من الكاش حسب إصدار المحتوى"""
+	key = f"achievements:facets:{get_content_version()}"
+	facets = cache.get(key)
+	if facets is None:
+		facets = {"areas": {}, "villages": {}}
+		for area, village, count in AchievementFacetCount.objects.filter(count__gt=0).values_list(
+			"area", "village", "count"
+		):
+			if village:
+				facets["villages"].setdefault(area, {})[village] = count
+			else:
+				facets["areas"][area] = count
+		cache.set(key, facets, CACHE_TIMEOUT)
+	return facets
+
+
+def village_options(area: str, facets: dict, selected: str | None = None) -> list[tuple[str, str]]:
+	"""قرى المركز التي لها إنجازات، مع العدد في النص المعروض"""
+	counts = facets["villages"].get(area, {})
+	return [
+		(code, f"{name} ({counts.get(code, 0)})")
+		for code, name in get_geography().village_choices(area)
+		if counts.get(code) or code == selected
+	]
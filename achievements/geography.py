@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+
+VERSION_KEY = "achievements:geography-version"
+# أقصى مدة قبل التحقق من تغيّر الجداول في عملية أخرى
+RECHECK_SECONDS = 5.0
+
+_DIACRITICS = re.compile(r"[ً-ْٰـ]")  # التشكيل والتطويل
+_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي"})
+
+
+def normalize_arabic(text: str) -> str:
+	"""توحيد الكتابة للمطابقة: الهمزات، الألف المقصورة، التاء المربوطة، التشكيل والمسافات"""
+	text = unicodedata.normalize("NFC", text or "")
+	text = _DIACRITICS.sub("", text).translate(_LETTERS)
+	return " ".join(text.split()).casefold()
+
+
+@dataclass(frozen=True)
+class Geography:
+	"""فهرس ثابت للمراكز والقرى؛ كل الاستعلامات عليه عمليات dict"""
+
+	areas: tuple[str, ...] = ()
+	villages: dict[str, tuple[tuple[str, str], ...]] = field(default_factory=dict)
+	village_names: dict[str, str] = field(default_factory=dict)
+	village_areas: dict[str, str] = field(default_factory=dict)
+	by_normalized: dict[str, tuple[str, str]] = field(default_factory=dict)
+	by_area_normalized: dict[tuple[str, str], str] = field(default_factory=dict)
+
+	@classmethod
+	def build(cls, rows) -> "Geography":
+		"""rows: (اسم المركز، اسم القرية أو None) مرتبة حسب العرض"""
+		areas: list[str] = []
+		villages: dict[str, list[tuple[str, str]]] = {}
+		village_names: dict[str, str] = {}
+		village_areas: dict[str, str] = {}
+		by_normalized: dict[str, tuple[str, str]] = {}
+		by_area_normalized: dict[tuple[str, str], str] = {}
+		for area, village in rows:
+			if area not in villages:
+				areas.append(area)
+				villages[area] = []
+			if not village:
+				continue
+			# رمز القرية هو اسمها كما يُخزَّن في Achievement.village
+			villages[area].append((village, village))
+			village_names.setdefault(village, village)
+			village_areas.setdefault(village, area)
+			normalized = normalize_arabic(village)
+			by_normalized.setdefault(normalized, (area, village))
+			by_area_normalized.setdefault((area, normalized), village)
+		return cls(
+			areas=tuple(areas),
+			villages={area: tuple(items) for area, items in villages.items()},
+			village_names=village_names,
+			village_areas=village_areas,
+			by_normalized=by_normalized,
+			by_area_normalized=by_area_normalized,
+		)
+
+	def area_choices(self) -> list[tuple[str, str]]:
+		return [(area, area) for area in self.areas]
+
+	def village_choices(self, area: str | None) -> tuple[tuple[str, str], ...]:
+		return self.villages.get(area or "", ())
+
+	def village_name(self, code: str) -> str:
+		return self.village_names.get(code, code)
+
+	def area_of(self, village: str) -> str | None:
+		return self.village_areas.get(village)
+
+	def has_area(self, area: str) -> bool:
+		return area in self.villages
+
+	def belongs(self, area: str, village: str) -> bool:
+		return (area, normalize_arabic(village)) in self.by_area_normalized
+
+	def match(self, text: str, area: str | None = None) -> str | None:
+		"""رمز القرية المطابقة لاسم مكتوب بأي صيغة، مع تقييدها بالمركز إن وُجد"""
+		normalized = normalize_arabic(text)
+		if area:
+			return self.by_area_normalized.get((area, normalized))
+		found = self.by_normalized.get(normalized)
+		return found[1] if found else None
+
+
+_lock = threading.Lock()
+_state: dict = {"index": None, "version": None, "checked": 0.0}
+
+
+def _load() -> Geography:
+	from .models import Area, Village
+
+	rows = [(area, None) for area in Area.objects.order_by("sort_order", "id").values_list("name", flat=True)]
+	rows += list(
+		Village.objects.order_by("area__sort_order", "area_id", "sort_order", "id").values_list("area__name", "name")
+	)
+	# المراكز أولًا بترتيبها ثم القرى؛ build يحافظ على أول ظهور لكل مركز
+	return Geography.build(rows)
+
+
+def get_geography() -> Geography:
+	"""الفهرس من ذاكرة العملية؛ يُعاد بناؤه فقط إذا تغير رقم الإصدار في الكاش المشترك"""
+	now = time.monotonic()
+	index = _state["index"]
+	if index is not None and now - _state["checked"] < RECHECK_SECONDS:
+		return index
+	version = cache.get(VERSION_KEY)
+	with _lock:
+		if _state["index"] is None or version != _state["version"] or version is None:
+			if version is None:
+				cache.add(VERSION_KEY, time.time_ns(), None)
+				version = cache.get(VERSION_KEY)
+			_state["index"] = _load()
+			_state["version"] = version
+		_state["checked"] = now
+		return _state["index"]
+
+
+def invalidate_geography() -> None:
+	try:
+		cache.incr(VERSION_KEY)
+	except ValueError:
+		cache.set(VERSION_KEY, time.time_ns(), None)
+	_state["index"] = None
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Iterable
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caching import bump_content_version
+from .models import AchievementImage, RenditionJob
+
+
+MAX_ATTEMPTS = 5
+# مهلة حجز المهمة؛ إذا توقف العامل قبلها تعود المهمة للطابور
+LEASE = timedelta(minutes=10)
+RETRY_BASE_DELAY = timedelta(seconds=30)
+
+
+def enqueue_renditions(image_ids: Iterable[int]) -> int:
+	"""إضافة صور للطابور أو إعادتها للانتظار (مهمة واحدة لكل صورة)"""
+	image_ids = list(image_ids)
+	if not image_ids:
+		return 0
+	now = timezone.now()
+	reset = {"status": RenditionJob.PENDING, "attempts": 0, "run_after": now, "worker": "", "last_error": "", "updated_at": now}
+	existing = set(
+		RenditionJob.objects.filter(image_id__in=image_ids).values_list("image_id", flat=True)
+	)
+	if existing:
+		RenditionJob.objects.filter(image_id__in=existing).update(**reset)
+	RenditionJob.objects.bulk_create(
+		[RenditionJob(image_id=image_id, run_after=now) for image_id in image_ids if image_id not in existing],
+		ignore_conflicts=True,
+	)
+	return len(image_ids)
+
+
+def enqueue_missing() -> int:
+	"""وضع كل الصور التي لا تملك مقاسات حديثة في الطابور (للصور المستوردة سابقًا)"""
+	missing = [
+		image_id
+		for image_id, name, renditions in AchievementImage.objects.exclude(image="")
+		.exclude(image__isnull=True)
+		.values_list("id", "image", "renditions")
+		.iterator(chunk_size=500)
+		if (renditions or {}).get("source") != name
+	]
+	return enqueue_renditions(missing)
+
+
+def _claimable(now) -> Q:
+	return Q(run_after__lte=now) & (
+		Q(status=RenditionJob.PENDING) | Q(status=RenditionJob.RUNNING)
+	)
+
+
+def claim_jobs(worker: str, limit: int) -> list[tuple[int, int, str]]:
+	"""حجز دفعة من المهام وإرجاع (job_id, image_id, اسم الملف) لكل منها
+
+	الحجز تحديث مشروط على صفوف ما زالت متاحة، فلا يحجز عاملان نفس المهمة
+	حتى على SQLite التي لا تدعم SELECT ... FOR UPDATE SKIP LOCKED.
+	"""
+	now = timezone.now()
+	candidates = list(
+		RenditionJob.objects.filter(_claimable(now))
+		.order_by("run_after", "id")
+		.values_list("id", flat=True)[:limit]
+	)
+	if not candidates:
+		return []
+	RenditionJob.objects.filter(_claimable(now), pk__in=candidates).update(
+		status=RenditionJob.RUNNING,
+		run_after=now + LEASE,
+		worker=worker,
+		attempts=F("attempts") + 1,
+		updated_at=now,
+	)
+	return list(
+		RenditionJob.objects.filter(pk__in=candidates, status=RenditionJob.RUNNING, worker=worker)
+		.values_list("id", "image_id", "image__image")
+	)
+
+
+def complete_jobs(results: dict[int, dict], worker: str) -> None:
+	"""حفظ نتائج دفعة: results من job_id إلى قيم حقول AchievementImage"""
+	if not results:
+		return
+	now = timezone.now()
+	jobs = RenditionJob.objects.filter(pk__in=results, worker=worker).only("id", "image_id")
+	images = []
+	for job in jobs:
+		fields = results[job.pk]
+		images.append(AchievementImage(pk=job.image_id, **fields))
+	# bulk_update لا يستدعي save() فلا تُعاد إضافة الصور للطابور
+	AchievementImage.objects.bulk_update(images, ["width", "height", "placeholder", "renditions"])
+	RenditionJob.objects.filter(pk__in=results, worker=worker).update(
+		status=RenditionJob.DONE, last_error="", updated_at=now
+	)
+	# الصفحة المخزنة تعرض الأصل حتى تُولد المقاسات
+	bump_content_version()
+
+
+def fail_job(job_id: int, worker: str, error: str) -> None:
+	now = timezone.now()
+	job = RenditionJob.objects.filter(pk=job_id, worker=worker).only("attempts").first()
+	if job is None:
+		return
+	if job.attempts >= MAX_ATTEMPTS:
+		status, run_after = RenditionJob.FAILED, now
+	else:
+		status, run_after = RenditionJob.PENDING, now + RETRY_BASE_DELAY * (2 ** (job.attempts - 1))
+	RenditionJob.objects.filter(pk=job_id).update(
+		status=status, run_after=run_after, last_error=error[:2000], updated_at=now
+	)
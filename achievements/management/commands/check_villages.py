@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from achievements.geography import get_geography
 from achievements.models import Achievement
 
 
@@ -22,11 +25,14 @@ class Command(BaseCommand):
         
         # Show village distribution
         self.stdout.write("\nVillage distribution:")
-        from achievements.models import VILLAGES
+        geography = get_geography()
+        counts = dict(
+            Achievement.objects.exclude(village__isnull=True).values_list("village").annotate(n=Count("id")).order_by()
+        )
         
-        for area, villages in VILLAGES.items():
+        for area in geography.areas:
             self.stdout.write(f"\n{area}:")
-            for code, name in villages:
-                count = Achievement.objects.filter(village=code).count()
+            for code, name in geography.village_choices(area):
+                count = counts.get(code, 0)
                 if count > 0:
                     self.stdout.write(f"  {code} → {name}: {count} achievements")
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from django.core.management.base import BaseCommand
-from achievements.models import Achievement, VILLAGES
+from django.db.models import Count
+
+from achievements.geography import get_geography
+from achievements.models import Achievement
 
 
 class Command(BaseCommand):
@@ -10,11 +13,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE("Starting village name fix for achievements..."))
         
-        # Create a mapping from display names to codes
-        village_mapping = {}
-        for area, villages in VILLAGES.items():
-            for code, name in villages:
-                village_mapping[name] = code
+        geography = get_geography()
         
         updated_count = 0
         not_found_count = 0
@@ -27,16 +26,17 @@ class Command(BaseCommand):
             current_village = achievement.village
             
             # Check if current village is already a code
-            if current_village in [code for code, name in village_mapping.items()]:
+            if current_village in geography.village_names:
                 self.stdout.write(f"✓ {achievement.title[:50]}... → Already has correct code: {current_village}")
                 continue
             
-            # Try to find the village by display name
-            if current_village in village_mapping:
-                achievement.village = village_mapping[current_village]
+            # Try to find the village by its name (any spelling of hamza/ta marbuta/ya)
+            code = geography.match(current_village, achievement.area) or geography.match(current_village)
+            if code:
+                achievement.village = code
                 achievement.save()
                 updated_count += 1
-                self.stdout.write(f"✓ {achievement.title[:50]}... → {current_village} → {village_mapping[current_village]}")
+                self.stdout.write(f"✓ {achievement.title[:50]}... → {current_village} → {code}")
             else:
                 not_found_count += 1
                 self.stdout.write(f"✗ {achievement.title[:50]}... → Could not map: {current_village}")
@@ -47,9 +47,12 @@ class Command(BaseCommand):
             
         # Show current village distribution
         self.stdout.write("\nCurrent village distribution:")
-        for area, villages in VILLAGES.items():
+        counts = dict(
+            Achievement.objects.exclude(village__isnull=True).values_list("village").annotate(n=Count("id")).order_by()
+        )
+        for area in geography.areas:
             self.stdout.write(f"\n{area}:")
-            for code, name in villages:
-                count = Achievement.objects.filter(village=code).count()
+            for code, name in geography.village_choices(area):
+                count = counts.get(code, 0)
                 if count > 0:
                     self.stdout.write(f"  {name}: {count} achievements")
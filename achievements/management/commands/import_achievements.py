@@ -1,14 +1,130 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import re
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-from achievements.models import Achievement, AchievementImage, AREAS
+from achievements.caching import bump_content_version
+from achievements.facets import adjust_facets
+from achievements.jobs import enqueue_renditions
+from blobstore.refs import incref
+from achievements.geography import get_geography
+from achievements.models import Achievement, AchievementImage
+
+
+# بنفس ترتيب الأفضلية القديم عند كتابة اسم الصورة بدون امتداد
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".jfif")
+
+# اسم الصورة قد يحتوي لاحقة " (1)" مفصولة بمسافة
+IMAGE_NAME_RE = re.compile(r"[^\s,]+(?:\s+\(\d+\)(?:\.\w+)?)?")
+COPY_SUFFIX_RE = re.compile(r"\s*\(\d+\)(?=\.\w+$|$)")
+
+
+def normalize_name(name: str) -> str:
+    return unicodedata.normalize("NFC", " ".join(name.split())).casefold()
+
+
+class ImageIndex:
+    """فهرس لمجلد الصور يُبنى بقراءة واحدة للمجلد بدل فحص exists() لكل احتمال"""
+
+    def __init__(self, directory: Path):
+        self.by_name: dict[str, Path] = {}
+        self.by_stem: dict[str, tuple[int, Path]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                self.by_name[normalize_name(path.name)] = path
+                suffix = path.suffix.lower()
+                if suffix in IMAGE_EXTENSIONS:
+                    rank = IMAGE_EXTENSIONS.index(suffix)
+                    stem = normalize_name(path.stem)
+                    if stem not in self.by_stem or rank < self.by_stem[stem][0]:
+                        self.by_stem[stem] = (rank, path)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def find(self, name: str) -> Path | None:
+        candidates = [name]
+        without_copy_suffix = COPY_SUFFIX_RE.sub("", name)
+        if without_copy_suffix != name:
+            candidates.append(without_copy_suffix)
+        for candidate in candidates:
+            key = normalize_name(candidate)
+            if key in self.by_name:
+                return self.by_name[key]
+            if Path(candidate).suffix == "" and key in self.by_stem:
+                return self.by_stem[key][1]
+        return None
+
+
+@dataclass
+class PlannedAchievement:
+    import_key: str
+    title: str
+    description: str
+    area: str
+    images: list[Path] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+
+
+def parse_blocks(raw: str) -> list[str]:
+    # الكتل مفصولة بأسطر من الشرطات
+    return [b.strip() for b in re.split(r"-+\s*\n", raw) if b.strip()]
+
+
+def plan_block(block: str, index: ImageIndex, areas: tuple[str, ...]) -> PlannedAchievement | None:
+    image_lines = re.findall(r"^اسم الصورة\s*:\s*(.+)$", block, re.MULTILINE)
+    area_match = re.search(r"^اسم الدائرة\s*:\s*(.+)$", block, re.MULTILINE)
+    village_match = re.search(r"^اسم القريه\s*:\s*(.+)$", block, re.MULTILINE)
+    desc_match = re.search(r"^الوصف الخاص بالصورة\s*:\s*(.+)$", block, re.MULTILINE)
+    if not (area_match and village_match and desc_match):
+        return None
+
+    area_text = area_match.group(1).strip()
+    area = area_text if area_text in areas else areas[0]
+    village = village_match.group(1).strip()
+    description = desc_match.group(1).strip()
+
+    # Creative title from village and a concise hint from description
+    hint = description.split(" ")[:6]
+    title = f"{village} – {' '.join(hint)}".strip()
+
+    image_names = [name for line in image_lines for name in IMAGE_NAME_RE.findall(line.strip())]
+    key_source = "\n".join([area, village, description, *image_names])
+    planned = PlannedAchievement(
+        import_key=hashlib.sha256(key_source.encode("utf-8")).hexdigest(),
+        title=title,
+        description=description,
+        area=area,
+    )
+    for name in image_names:
+        path = index.find(name)
+        if path is None:
+            planned.missing.append(name)
+        elif path not in planned.images:
+            planned.images.append(path)
+    return planned
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 class Command(BaseCommand):
@@ -16,6 +132,7 @@ class Command(BaseCommand):
         "Import achievements and images from default 'engazat.txt' + 'ENGAZAT'"
         " and also supports the alternative Arabic folder 'باقي الانجازات' with"
         " 'باقى الانجازات.txt' + 'الصور الخاصة بالانجازات' if present."
+        " Safe to re-run: blocks and image files already imported are skipped."
     )
 
     def add_arguments(self, parser):
@@ -25,117 +142,153 @@ class Command(BaseCommand):
             default=str(Path.cwd()),
             help="Base directory that contains 'achevments file' folder",
         )
+        parser.add_argument("--dry-run", action="store_true", help="Parse and match files without writing anything")
+        parser.add_argument("--workers", type=int, default=8, help="Threads used to hash and copy image files")
 
-    def handle(self, *args, **options):
-        # Build a list of (text_file, images_dir) sources to import
+    def find_sources(self, base: Path) -> list[tuple[Path, Path]]:
         sources: list[tuple[Path, Path]] = []
+        for folder, txt_name, images_name in (
+            ("achevments file", "engazat.txt", "ENGAZAT"),
+            ("باقي الانجازات", "باقى الانجازات.txt", "الصور الخاصة بالانجازات"),
+        ):
+            txt_path = base / folder / txt_name
+            images_dir = base / folder / images_name
+            if txt_path.exists() and images_dir.exists():
+                sources.append((txt_path, images_dir))
+        return sources
 
-        base_dir_default = Path(options["base"]) / "achevments file"
-        txt_default = base_dir_default / "engazat.txt"
-        imgs_default = base_dir_default / "ENGAZAT"
-        if txt_default.exists() and imgs_default.exists():
-            sources.append((txt_default, imgs_default))
-
-        base_dir_ar = Path(options["base"]) / "باقي الانجازات"
-        txt_ar = base_dir_ar / "باقى الانجازات.txt"
-        imgs_ar = base_dir_ar / "الصور الخاصة بالانجازات"
-        if txt_ar.exists() and imgs_ar.exists():
-            sources.append((txt_ar, imgs_ar))
-
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        sources = self.find_sources(Path(options["base"]))
         if not sources:
             raise CommandError(
                 "No sources found. Expected either 'achevments file/engazat.txt' + 'ENGAZAT'"
                 " or 'باقي الانجازات/باقى الانجازات.txt' + 'الصور الخاصة بالانجازات'."
             )
 
-        area_values = {a for a, _ in AREAS}
-
-        created_without_image = 0
-        created_total = 0
-
+        # 1) بناء الخطة: تحليل الكتل ومطابقة أسماء الصور مع فهرس المجلد
+        areas = get_geography().areas
+        if not areas:
+            raise CommandError("No areas defined. Add areas in the admin before importing.")
+        plan: list[PlannedAchievement] = []
+        invalid_blocks = 0
         for txt_path, images_dir in sources:
-            self.stdout.write(self.style.NOTICE(f"Reading: {txt_path}"))
+            index = ImageIndex(images_dir)
             raw = txt_path.read_text(encoding="utf-8", errors="ignore")
-
-            # Split blocks by delimiter lines
-            blocks = [b.strip() for b in re.split(r"-+\s*\n", raw) if b.strip()]
-            self.stdout.write(self.style.NOTICE(f"Found {len(blocks)} blocks in {txt_path.name}"))
+            blocks = parse_blocks(raw)
+            self.stdout.write(self.style.NOTICE(
+                f"Reading: {txt_path} ({len(blocks)} blocks, {len(index)} files)"
+            ))
             for block in blocks:
-                # Extract fields
-                image_lines = re.findall(r"^اسم الصورة\s*:\s*(.+)$", block, re.MULTILINE)
-                area_match = re.search(r"^اسم الدائرة\s*:\s*(.+)$", block, re.MULTILINE)
-                village_match = re.search(r"^اسم القريه\s*:\s*(.+)$", block, re.MULTILINE)
-                desc_match = re.search(r"^الوصف الخاص بالصورة\s*:\s*(.+)$", block, re.MULTILINE)
+                planned = plan_block(block, index, areas)
+                if planned is None:
+                    invalid_blocks += 1
+                else:
+                    plan.append(planned)
 
-                if not (area_match and village_match and desc_match):
-                    continue
+        # 2) استبعاد ما استُورد سابقًا (بالبصمة، أو بالعنوان والوصف لما قبل إضافة البصمة)
+        keys = {p.import_key for p in plan}
+        existing_keys = set(
+            Achievement.objects.filter(import_key__in=keys).values_list("import_key", flat=True)
+        )
+        legacy = {
+            (title, description): pk
+            for pk, title, description in Achievement.objects.filter(import_key__isnull=True)
+            .values_list("id", "title", "description")
+        }
+        new_plan: list[PlannedAchievement] = []
+        adopted: list[Achievement] = []
+        seen_keys: set[str] = set()
+        for planned in plan:
+            if planned.import_key in existing_keys or planned.import_key in seen_keys:
+                continue
+            seen_keys.add(planned.import_key)
+            legacy_pk = legacy.pop((planned.title, planned.description), None)
+            if legacy_pk is not None:
+                adopted.append(Achievement(pk=legacy_pk, import_key=planned.import_key))
+                continue
+            new_plan.append(planned)
+        skipped = len(plan) - len(new_plan)
+
+        # 3) بصمة محتوى كل ملف (بالتوازي)؛ الملف المكرر يُنسخ مرة واحدة
+        paths = list(dict.fromkeys(path for p in new_plan for path in p.images))
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            hashes = dict(zip(paths, pool.map(file_sha256, paths)))
+        stored = {
+            content_hash: name
+            for content_hash, name in AchievementImage.objects.filter(content_hash__in=set(hashes.values()))
+            .values_list("content_hash", "image")
+        }
+        to_copy = {}
+        for path, content_hash in hashes.items():
+            if content_hash not in stored and content_hash not in to_copy:
+                to_copy[content_hash] = path
+
+        missing = sum(len(p.missing) for p in new_plan)
+        without_images = sum(1 for p in new_plan if not p.images)
+        if options["dry_run"]:
+            self.summary(len(plan), invalid_blocks, skipped, new_plan, len(to_copy), missing, without_images, started, dry_run=True)
+            return
+
+        # 4) نسخ الملفات الجديدة فقط (بالتوازي) عبر تخزين الحقل (مخزن المحتوى)
+        image_field = AchievementImage._meta.get_field("image")
 
-                area_text = area_match.group(1).strip()
-                area = area_text if area_text in area_values else next(iter(area_values))
-
-                village = village_match.group(1).strip()
-                description = desc_match.group(1).strip()
-
-            # Creative title from village and a concise hint from description
-                hint = description.split(" ")[:6]
-                title = f"{village} – {' '.join(hint)}".strip()
-
-                with transaction.atomic():
-                    achievement = Achievement.objects.create(
-                        title=title,
-                        description=description,
-                        area=area,
-                    )
-                    created_total += 1
-
-                # Parse possibly multiple image names across one or more lines
-                    image_names: list[str] = []
-                    for line in image_lines:
-                    # Split by whitespace and parentheses commas
-                        parts = re.split(r"\s+", line.strip())
-                        for p in parts:
-                            p = p.strip().strip(",")
-                            if p:
-                                image_names.append(p)
-
-                # Normalize to possible files with common extensions
-                    exts = [".jpg", ".jpeg", ".png", ".jfif", ".JPG", ".JPEG", ".PNG", ".JFIF"]
-
-                    found_any = False
-                    for base in image_names:
-                    # Some names come without extension or with (1)
-                        base_clean = base
-                    # keep provided extension if any
-                        cand_paths: list[Path] = []
-                        bpath = images_dir / base_clean
-                        cand_paths.append(bpath)
-                        if bpath.suffix == "":
-                            for ext in exts:
-                                cand_paths.append(images_dir / f"{base_clean}{ext}")
-
-                    # also try removing spaces like " (1)"
-                        if " (" in base_clean:
-                            base_alt = re.sub(r"\s*\(\d+\)$", "", base_clean)
-                            cand_paths.append(images_dir / base_alt)
-                            if Path(base_alt).suffix == "":
-                                for ext in exts:
-                                    cand_paths.append(images_dir / f"{base_alt}{ext}")
-
-                        for cand in cand_paths:
-                            if cand.exists() and cand.is_file():
-                                with cand.open("rb") as f:
-                                    AchievementImage.objects.create(
-                                        achievement=achievement,
-                                        image=File(f, name=cand.name),
-                                    )
-                                found_any = True
-                                break
-
-                    if not found_any:
-                        created_without_image += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Created {created_total} achievements"))
-        if created_without_image:
-            self.stdout.write(self.style.WARNING(f"{created_without_image} achievements created without images"))
+        def copy(item):
+            content_hash, path = item
+            name = image_field.generate_filename(None, path.name)
+            return content_hash, image_field.storage.save(name, ContentFile(path.read_bytes()))
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            stored.update(pool.map(copy, to_copy.items()))
+
+        # 5) إنشاء السجلات دفعة واحدة
+        with transaction.atomic():
+            if adopted:
+                Achievement.objects.bulk_update(adopted, ["import_key"])
+            Achievement.objects.bulk_create(
+                [
+                    Achievement(import_key=p.import_key, title=p.title, description=p.description, area=p.area)
+                    for p in new_plan
+                ],
+                batch_size=500,
+            )
+            adjust_facets(Counter((p.area, "") for p in new_plan))
+            # MySQL لا يُرجع المفاتيح من bulk_create
+            ids = dict(
+                Achievement.objects.filter(import_key__in=[p.import_key for p in new_plan])
+                .values_list("import_key", "id")
+            )
+            images = [
+                AchievementImage(
+                    achievement_id=ids[p.import_key],
+                    image=stored[hashes[path]],
+                    content_hash=hashes[path],
+                )
+                for p in new_plan
+                for path in p.images
+            ]
+            AchievementImage.objects.bulk_create(images, batch_size=500)
+            # bulk_create لا يُطلق post_save، لذا تُحدّث عدّادات مخزن المحتوى وطابور المقاسات هنا
+            incref(image.image.name for image in images)
+            new_images = list(
+                AchievementImage.objects.filter(achievement_id__in=ids.values()).values_list("id", flat=True)
+            )
+            transaction.on_commit(lambda: enqueue_renditions(new_images))
+            transaction.on_commit(bump_content_version)
 
+        self.summary(len(plan), invalid_blocks, skipped, new_plan, len(to_copy), missing, without_images, started)
+        if adopted:
+            self.stdout.write(f"Linked {len(adopted)} previously imported achievements to their source blocks")
 
+    def summary(self, planned, invalid, skipped, new_plan, copied, missing, without_images, started, dry_run=False):
+        prefix = "[dry-run] Would create" if dry_run else "Created"
+        images = sum(len(p.images) for p in new_plan)
+        self.stdout.write(f"Blocks: {planned} parsed, {invalid} invalid, {skipped} already imported")
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {len(new_plan)} achievements with {images} images ({copied} new files)"
+        ))
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing} image names did not match any file"))
+        if without_images:
+            self.stdout.write(self.style.WARNING(f"{without_images} achievements without images"))
+        self.stdout.write(f"Done in {time.monotonic() - started:.1f}s")
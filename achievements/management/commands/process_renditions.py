@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from achievements.jobs import claim_jobs, complete_jobs, enqueue_missing, fail_job
+from achievements.models import AchievementImage, RenditionJob
+from achievements.renditions import build_renditions
+
+
+def _init_worker():
+	# ضروري مع spawn (ويندوز وماك)، ولا يفعل شيئًا تقريبًا مع fork
+	django.setup()
+
+
+def _render(job_id: int, source_name: str):
+	"""يعمل داخل العملية الفرعية: عمل على الملفات فقط دون أي اتصال بقاعدة البيانات"""
+	storage = AchievementImage._meta.get_field("image").storage
+	try:
+		return job_id, build_renditions(storage, source_name), None
+	except Exception:
+		return job_id, None, traceback.format_exc(limit=3)
+
+
+class Command(BaseCommand):
+	help = "Build thumbnail/medium renditions for queued achievement images using a process pool"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+		parser.add_argument("--batch", type=int, default=32, help="Jobs claimed per batch")
+		parser.add_argument("--backfill", action="store_true", help="Queue every image without up-to-date renditions, process them and exit")
+		parser.add_argument("--once", action="store_true", help="Process the current queue and exit instead of polling")
+		parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when the queue is empty")
+
+	def handle(self, *args, **options):
+		worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+		drain = options["backfill"] or options["once"]
+
+		if options["backfill"]:
+			queued = enqueue_missing()
+			self.stdout.write(self.style.NOTICE(f"Queued {queued} images for backfill"))
+
+		total = RenditionJob.objects.exclude(status__in=[RenditionJob.DONE, RenditionJob.FAILED]).count()
+		self.stdout.write(self.style.NOTICE(f"{total} jobs pending, {options['workers']} workers"))
+
+		# لا تُورَّث اتصالات قاعدة البيانات المفتوحة للعمليات الفرعية
+		connections.close_all()
+
+		done = failed = 0
+		started = time.monotonic()
+		with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+			while True:
+				jobs = claim_jobs(worker, options["batch"])
+				if not jobs:
+					if drain:
+						break
+					time.sleep(options["sleep"])
+					continue
+
+				futures = [pool.submit(_render, job_id, name) for job_id, _, name in jobs]
+				results = {}
+				for future in as_completed(futures):
+					job_id, fields, error = future.result()
+					if error is None:
+						results[job_id] = fields
+						done += 1
+					else:
+						fail_job(job_id, worker, error)
+						failed += 1
+						self.stdout.write(self.style.WARNING(f"Job {job_id} failed: {error.strip().splitlines()[-1]}"))
+				complete_jobs(results, worker)
+
+				elapsed = time.monotonic() - started
+				rate = (done + failed) / elapsed if elapsed else 0.0
+				progress = f"{done + failed}/{total}" if drain else str(done + failed)
+				self.stdout.write(f"[{progress}] {done} done, {failed} failed, {rate:.1f} images/s")
+
+		elapsed = time.monotonic() - started
+		self.stdout.write(self.style.SUCCESS(f"Finished: {done} done, {failed} failed in {elapsed:.1f}s"))
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from achievements.caching import bump_content_version
+from achievements.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "Recompute the area/village achievement counts used by the achievements filters"
+
+    def handle(self, *args, **options):
+        rows = rebuild_facets()
+        transaction.on_commit(bump_content_version)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} facet counts"))
@@ -1,99 +1,158 @@
 from __future__ import annotations
 
-import re
+import csv
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from achievements.models import Achievement, VILLAGES
+from django.db import connections, transaction
+
+from achievements.caching import bump_content_version
+from achievements.facets import adjust_facets
+from achievements.geography import get_geography
+from achievements.models import Achievement
+from achievements.village_matcher import VillageMatch, VillageMatcher, match_rows
+
+
+_matcher: VillageMatcher | None = None
+
+
+def _init_worker(matcher: VillageMatcher):
+    global _matcher
+    django.setup()
+    _matcher = matcher
+
+
+def _match_chunk(rows):
+    return match_rows(_matcher, rows)
+
+
+def detect_village_from_description(description: str, area: str, matcher: VillageMatcher | None = None) -> str | None:
+    """Detect village from achievement description"""
+    if not description or not area:
+        return None
+    matcher = matcher or VillageMatcher(get_geography())
+    return matcher.match(description, area).village
 
 
 class Command(BaseCommand):
     help = "Update existing achievements with village information based on their descriptions"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-tag every achievement, not only those without a village")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes used for matching (useful for large tables)")
+        parser.add_argument("--chunk", type=int, default=2000, help="Achievements matched and written per batch")
+        parser.add_argument("--min-confidence", type=float, default=0.5, help="Lowest confidence accepted (1.0 full name, 0.7 without prefix, 0.5 single word)")
+        parser.add_argument("--skip-ambiguous", action="store_true", help="Leave achievements whose best match is tied between villages")
+        parser.add_argument("--report", type=str, help="Write ambiguous and low-confidence matches to this CSV file")
+        parser.add_argument("--dry-run", action="store_true", help="Match and report without saving")
+        parser.add_argument("--verbose-rows", action="store_true", help="Print one line per achievement")
+
     def handle(self, *args, **options):
+        started = time.monotonic()
         self.stdout.write(self.style.NOTICE("Starting village assignment for achievements..."))
-        
-        updated_count = 0
-        not_found_count = 0
-        
-        # Get all achievements without villages
-        achievements = Achievement.objects.filter(village__isnull=True)
-        self.stdout.write(f"Found {achievements.count()} achievements without villages")
-        
-        for achievement in achievements:
-            village = self.detect_village_from_description(achievement.description, achievement.area)
-            
-            if village:
-                achievement.village = village
-                achievement.save()
-                updated_count += 1
-                self.stdout.write(f"✓ {achievement.title[:50]}... → {village}")
-            else:
-                not_found_count += 1
-                self.stdout.write(f"✗ {achievement.title[:50]}... → No village found")
-        
-        self.stdout.write(self.style.SUCCESS(f"\nCompleted! Updated {updated_count} achievements"))
-        if not_found_count > 0:
-            self.stdout.write(self.style.WARNING(f"{not_found_count} achievements could not be assigned villages"))
-    
-    def detect_village_from_description(self, description: str, area: str) -> str | None:
-        """Detect village from achievement description"""
-        if not description or not area:
-            return None
-        
-        # Get villages for this area
-        area_villages = VILLAGES.get(area, [])
-        if not area_villages:
-            return None
-        
-        # Clean description for better matching
-        clean_desc = description.lower().strip()
-        
-        # Try exact matches first
-        for village_code, village_name in area_villages:
-            if village_name.lower() in clean_desc:
-                return village_code
-        
-        # Try partial matches for common patterns
-        for village_code, village_name in area_villages:
-            # Remove common prefixes/suffixes for matching
-            clean_village = village_name.lower()
-            
-            # Handle special cases
-            if "كفر" in clean_village:
-                # Try with and without "كفر"
-                if clean_village in clean_desc or clean_village.replace("كفر ", "") in clean_desc:
-                    return village_code
-            
-            elif "منشأة" in clean_village:
-                # Try with and without "منشأة"
-                if clean_village in clean_desc or clean_village.replace("منشأة ", "") in clean_desc:
-                    return village_code
-            
-            elif "عزبة" in clean_village:
-                # Try with and without "عزبة"
-                if clean_village in clean_desc or clean_village.replace("عزبة ", "") in clean_desc:
-                    return village_code
-            
+
+        geography = get_geography()
+        matcher = VillageMatcher(geography)
+        queryset = Achievement.objects.exclude(area__isnull=True).exclude(area="")
+        if not options["all"]:
+            queryset = queryset.filter(village__isnull=True)
+        total = queryset.count()
+        self.stdout.write(f"Found {total} achievements to check ({len(matcher.variants)} name variants)")
+
+        stats = Counter()
+        confidence_histogram = Counter()
+        report_rows = []
+        rows = queryset.order_by("id").values_list("id", "area", "village", "description").iterator(chunk_size=options["chunk"])
+        chunks = iter(lambda: list(islice(rows, options["chunk"])), [])
+
+        if options["workers"] > 1:
+            # القراءة كاملة قبل تشغيل العمليات حتى لا يُورَّث مؤشر أو اتصال مفتوح
+            chunks = list(chunks)
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker, initargs=(matcher,)) as pool:
+                matched = list(pool.map(_match_chunk, [[(pk, area, desc) for pk, area, _, desc in chunk] for chunk in chunks]))
+        else:
+            matched = None
+
+        for index, chunk in enumerate(chunks):
+            current = {pk: (area, village) for pk, area, village, _ in chunk}
+            if matched is not None:
+                results = matched[index]
             else:
-                # Regular matching
-                if clean_village in clean_desc:
-                    return village_code
-        
-        # Try fuzzy matching for similar names
-        for village_code, village_name in area_villages:
-            clean_village = village_name.lower()
-            
-            # Split village name into words and check if most words match
-            village_words = clean_village.split()
-            desc_words = clean_desc.split()
-            
-            matches = 0
-            for v_word in village_words:
-                if any(v_word in d_word for d_word in desc_words):
-                    matches += 1
-            
-            # If more than 50% of words match, consider it a match
-            if matches > 0 and matches / len(village_words) >= 0.5:
-                return village_code
-        
-        return None
+                results = match_rows(matcher, [(pk, area, desc) for pk, area, _, desc in chunk])
+            updates: dict[str, list[int]] = {}
+            facet_changes = Counter()
+            for pk, match in results:
+                area, old_village = current[pk]
+                accepted = self.accept(match, options)
+                if match.village:
+                    confidence_histogram[match.confidence] += 1
+                if match.ambiguous:
+                    stats["ambiguous"] += 1
+                if match.ambiguous or (match.village and not accepted):
+                    report_rows.append(self.report_row(pk, area, match, geography))
+                if not accepted:
+                    stats["not_found"] += 1
+                    if options["verbose_rows"]:
+                        self.stdout.write(f"✗ #{pk} → No village found")
+                    continue
+                if match.village == old_village:
+                    stats["unchanged"] += 1
+                    continue
+                updates.setdefault(match.village, []).append(pk)
+                facet_changes[(area, match.village)] += 1
+                facet_changes[(area, old_village or "")] -= 1
+                if options["verbose_rows"]:
+                    self.stdout.write(f"✓ #{pk} → {geography.village_name(match.village)} ({match.confidence})")
+            stats["updated"] += sum(map(len, updates.values()))
+
+            if updates and not options["dry_run"]:
+                # تحديث واحد لكل قرية بدل CASE طويل من bulk_update؛ لا يُطلق post_save،
+                # لذا تُحدّث العدّادات والكاش هنا
+                with transaction.atomic():
+                    for village, ids in updates.items():
+                        Achievement.objects.filter(pk__in=ids).update(village=village)
+                    adjust_facets(facet_changes)
+                    transaction.on_commit(bump_content_version)
+
+        if options["report"] and report_rows:
+            with open(options["report"], "w", newline="", encoding="utf-8-sig") as f:
+                writer = csv.writer(f)
+                writer.writerow(["id", "area", "village", "confidence", "alternatives"])
+                writer.writerows(report_rows)
+            self.stdout.write(f"Wrote {len(report_rows)} rows to {options['report']}")
+
+        self.summary(stats, confidence_histogram, total, started, options["dry_run"])
+
+    def accept(self, match: VillageMatch, options) -> bool:
+        if match.village is None or match.confidence < options["min_confidence"]:
+            return False
+        return not (options["skip_ambiguous"] and match.ambiguous)
+
+    def report_row(self, pk, area, match: VillageMatch, geography):
+        return [
+            pk,
+            area,
+            geography.village_name(match.village),
+            match.confidence,
+            " | ".join(geography.village_name(code) for code in match.alternatives),
+        ]
+
+    def summary(self, stats, confidence_histogram, total, started, dry_run):
+        elapsed = time.monotonic() - started
+        prefix = "[dry-run] Would update" if dry_run else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"\nCompleted! {prefix} {stats['updated']} achievements"))
+        if stats["unchanged"]:
+            self.stdout.write(f"{stats['unchanged']} achievements already had the detected village")
+        if stats["not_found"]:
+            self.stdout.write(self.style.WARNING(f"{stats['not_found']} achievements could not be assigned villages"))
+        if stats["ambiguous"]:
+            self.stdout.write(self.style.WARNING(f"{stats['ambiguous']} matches were tied between villages"))
+        for confidence, count in sorted(confidence_histogram.items(), reverse=True):
+            self.stdout.write(f"  confidence {confidence:.2f}: {count}")
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(f"Done in {elapsed:.1f}s ({rate:.0f} achievements/s)")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:16
+
+import blobstore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0007_import_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='achievementimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=blobstore.storage.get_blob_storage, upload_to='achievements/'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:18
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_facets(apps, schema_editor):
+    Achievement = apps.get_model('achievements', 'Achievement')
+    AchievementFacetCount = apps.get_model('achievements', 'AchievementFacetCount')
+    totals = Counter()
+    for row in Achievement.objects.values('area', 'village').annotate(n=Count('id')).order_by():
+        if not row['area']:
+            continue
+        totals[(row['area'], '')] += row['n']
+        if row['village']:
+            totals[(row['area'], row['village'])] += row['n']
+    AchievementFacetCount.objects.bulk_create(
+        [AchievementFacetCount(area=area, village=village, count=n) for (area, village), n in totals.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0008_alter_achievementimage_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AchievementFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('area', models.CharField(max_length=50)),
+                ('village', models.CharField(blank=True, default='', max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('area', 'village'), name='achievement_facet_unique')],
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
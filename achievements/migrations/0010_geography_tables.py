@@ -0,0 +1,126 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:21
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# نسخة من achievements.geography.normalize_arabic وقت كتابة الترحيل، حتى لا يتغير ناتجه مع الكود
+_DIACRITICS = re.compile(r'[\u064b-\u0652\u0670\u0640]')
+_LETTERS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ى': 'ي', 'ة': 'ه', 'ؤ': 'و', 'ئ': 'ي'})
+
+
+def normalize_arabic(text):
+    text = unicodedata.normalize('NFC', text or '')
+    text = _DIACRITICS.sub('', text).translate(_LETTERS)
+    return ' '.join(text.split()).casefold()
+
+
+# القيم التي كانت ثابتة في achievements.models (AREAS و VILLAGES)
+SEED = (
+    ('السادات', (
+        'مدينة السادات',
+        'كفر داوود',
+        'السلام',
+        'الطرانه',
+        'الاخماس',
+        'الجيار',
+        'الخطاطبة البلد',
+        'الخطاطبة المحطه',
+        'ابو نشابه',
+        'عدنان المدني',
+    )),
+    ('منوف', (
+        'مدينة منوف',
+        'طملاي',
+        'شبشير طملاي',
+        'برهيم و منشأة سدود',
+        'جزي',
+        'منشأة غمرين',
+        'بالمشط',
+        'كفر السنابسه',
+        'صنصفط',
+        'دمليج',
+        'زاوية رزين',
+        'سدود',
+        'بهواش',
+        'كمشوش',
+        'فيشا الكبري',
+        'كفر فيشا الكبري',
+        'هيت',
+        'سروهيت',
+        'دبركي',
+        'غمرين',
+        'تتا',
+        'منشأة سلطان',
+        'سنجرج',
+        'شبرا بلوله',
+        'كفر شبرا بلوله',
+        'الحامول',
+        'كفر العامره',
+        'كفر رماح',
+        'ميت ربيعه',
+    )),
+    ('سرس الليان', ()),
+)
+
+
+def seed_geography(apps, schema_editor):
+    Area = apps.get_model('achievements', 'Area')
+    Village = apps.get_model('achievements', 'Village')
+    for area_order, (area_name, villages) in enumerate(SEED):
+        area, _ = Area.objects.get_or_create(name=area_name, defaults={'sort_order': area_order})
+        for village_order, name in enumerate(villages):
+            Village.objects.get_or_create(
+                area=area,
+                name=name,
+                defaults={'normalized_name': normalize_arabic(name), 'sort_order': village_order},
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0009_achievementfacetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Area',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('sort_order', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('sort_order', 'id'),
+            },
+        ),
+        migrations.AlterField(
+            model_name='achievement',
+            name='area',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='achievement',
+            name='village',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.CreateModel(
+            name='Village',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(db_index=True, editable=False, max_length=100)),
+                ('sort_order', models.PositiveSmallIntegerField(default=0)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='villages', to='achievements.area')),
+            ],
+            options={
+                'ordering': ('sort_order', 'id'),
+                'constraints': [models.UniqueConstraint(fields=('area', 'name'), name='village_unique_per_area')],
+            },
+        ),
+        migrations.RunPython(seed_geography, migrations.RunPython.noop),
+    ]
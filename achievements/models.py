@@ -1,72 +1,68 @@
 from __future__ import annotations
 
-from django.db import models
-
-
-AREAS = (
-	("السادات", "السادات"),
-	("منوف", "منوف"),
-	("سرس الليان", "سرس الليان"),
-)
-
-VILLAGES = {
-	"منوف": [
-		("مدينة منوف", "مدينة منوف"),
-		("طملاي", "طملاي"),
-		("شبشير طملاي", "شبشير طملاي"),
-		("برهيم و منشأة سدود", "برهيم و منشأة سدود"),
-		("جزي", "جزي"),
-		("منشأة غمرين", "منشأة غمرين"),
-		("بالمشط", "بالمشط"),
-		("كفر السنابسه", "كفر السنابسه"),
-		("صنصفط", "صنصفط"),
-		("دمليج", "دمليج"),
-		("زاوية رزين", "زاوية رزين"),
-		("سدود", "سدود"),
-		("بهواش", "بهواش"),
-		("كمشوش", "كمشوش"),
-		("فيشا الكبري", "فيشا الكبري"),
-		("كفر فيشا الكبري", "كفر فيشا الكبري"),
-		("هيت", "هيت"),
-		("سروهيت", "سروهيت"),
-		("دبركي", "دبركي"),
-		("غمرين", "غمرين"),
-		("تتا", "تتا"),
-		("منشأة سلطان", "منشأة سلطان"),
-		("سنجرج", "سنجرج"),
-		("شبرا بلوله", "شبرا بلوله"),
-		("كفر شبرا بلوله", "كفر شبرا بلوله"),
-		("الحامول", "الحامول"),
-		("كفر العامره", "كفر العامره"),
-		("كفر رماح", "كفر رماح"),
-		("ميت ربيعه", "ميت ربيعه"),
-	],
-	"السادات": [
-		("مدينة السادات", "مدينة السادات"),
-		("كفر داوود", "كفر داوود"),
-		("السلام", "السلام"),
-		("الطرانه", "الطرانه"),
-		("الاخماس", "الاخماس"),
-		("الجيار", "الجيار"),
-		("الخطاطبة البلد", "الخطاطبة البلد"),
-		("الخطاطبة المحطه", "الخطاطبة المحطه"),
-		("ابو نشابه", "ابو نشابه"),
-		("عدنان المدني", "عدنان المدني"),
-	],
-	"سرس الليان": [],
-}
-
-# Create a flat list of all villages for choices
-ALL_VILLAGES = []
-for area_villages in VILLAGES.values():
-    ALL_VILLAGES.extend(area_villages)
+from django.db import models, transaction
+from django.utils import timezone
+
+from blobstore.storage import get_blob_storage
+
+from .geography import get_geography, normalize_arabic
+from .renditions import RENDITION_WIDTHS, available_formats
+
+
+class Area(models.Model):
+	"""مركز (دائرة)؛ المراكز والقرى تُدار من لوحة الإدارة وتُقرأ عبر achievements.geography"""
+
+	name = models.CharField(max_length=50, unique=True)
+	sort_order = models.PositiveSmallIntegerField(default=0)
+
+	class Meta:
+		ordering = ("sort_order", "id")
+
+	def __str__(self) -> str:
+		return self.name
+
+	def save(self, *args, **kwargs):
+		previous = Area.objects.filter(pk=self.pk).values_list("name", flat=True).first() if self.pk else None
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+			if previous is not None and previous != self.name:
+				_propagate_rename({"area": previous}, {"area": self.name})
+
+
+class Village(models.Model):
+	area = models.ForeignKey(Area, on_delete=models.CASCADE, related_name="villages")
+	name = models.CharField(max_length=100)
+	# الاسم بعد توحيد الهمزات والتاء المربوطة والياء للمطابقة مع النصوص الحرة
+	normalized_name = models.CharField(max_length=100, db_index=True, editable=False)
+	sort_order = models.PositiveSmallIntegerField(default=0)
+
+	class Meta:
+		ordering = ("sort_order", "id")
+		constraints = [
+			models.UniqueConstraint(fields=["area", "name"], name="village_unique_per_area"),
+		]
+
+	def __str__(self) -> str:
+		return self.name
+
+	def save(self, *args, **kwargs):
+		self.normalized_name = normalize_arabic(self.name)
+		previous = Village.objects.filter(pk=self.pk).values_list("area__name", "name").first() if self.pk else None
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+			current = (self.area.name, self.name)
+			if previous is not None and previous != current:
+				_propagate_rename(dict(zip(("area", "village"), previous)), dict(zip(("area", "village"), current)))
 
 
 class Achievement(models.Model):
 	title = models.CharField(max_length=255)
 	description = models.TextField()
-	area = models.CharField(max_length=50, choices=AREAS)
-	village = models.CharField(max_length=100, choices=ALL_VILLAGES, blank=True, null=True)
+	# اسم المركز والقرية كما في جدولي Area و Village (يُتحقق منهما في نموذج الإدارة)
+	area = models.CharField(max_length=50)
+	village = models.CharField(max_length=100, blank=True, null=True)
+	# بصمة كتلة المصدر في import_achievements حتى لا يتكرر الاستيراد
+	import_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 
 	def __str__(self) -> str:
@@ -75,30 +71,143 @@ class Achievement(models.Model):
 	@property
 	def village_choices(self):
 		"""Return available villages for the selected area"""
-		return VILLAGES.get(self.area, [])
+		return list(get_geography().village_choices(self.area))
 	
 	@property
 	def village_display_name(self):
 		"""Return the display name of the village"""
 		if self.village:
-			# Find the display name from choices
-			for code, name in ALL_VILLAGES:
-				if code == self.village:
-					return name
-			# If not found in choices, return the village code itself
-			return self.village
+			# If not found in the index, return the village code itself
+			return get_geography().village_name(self.village)
 		return ""
 
 
+def _propagate_rename(old: dict, new: dict) -> None:
+	"""الإنجازات تخزن اسم المركز والقرية نصًا؛ إعادة تسميتهما تنقل الإنجازات وتعيد بناء عدّاد الفلاتر"""
+	from .facets import rebuild_facets
+
+	# update() لا يطلق إشارات Achievement؛ إشارة حفظ Area/Village ترفع إصدار المحتوى
+	if Achievement.objects.filter(**old).update(**new):
+		rebuild_facets()
+
+
 class AchievementImage(models.Model):
 	achievement = models.ForeignKey(
 		Achievement,
 		on_delete=models.CASCADE,
 		related_name="images",
 	)
-	image = models.ImageField(upload_to="achievements/", blank=True, null=True)
+	image = models.ImageField(upload_to="achievements/", storage=get_blob_storage, blank=True, null=True)
+	width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+	height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+	# صورة مصغرة جدًا ومموهة (data URI) تُعرض حتى تحميل الصورة الفعلية
+	placeholder = models.TextField(blank=True, default="", editable=False)
+	renditions = models.JSONField(blank=True, default=dict, editable=False)
+	content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True, editable=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 
 	def __str__(self) -> str:
 		return f"Image for {self.achievement_id}"
 
+	@property
+	def has_renditions(self) -> bool:
+		return bool(self.image) and self.renditions.get("source") == self.image.name
+
+	def _variant_url(self, size: str, fmt: str) -> str | None:
+		variant = self.renditions.get(size, {}).get(fmt) if self.has_renditions else None
+		return self.image.storage.url(variant["name"]) if variant else None
+
+	def srcset_for(self, fmt: str) -> str:
+		if not self.has_renditions:
+			return ""
+		entries = []
+		for size in RENDITION_WIDTHS:
+			variant = self.renditions.get(size, {}).get(fmt)
+			if variant:
+				entries.append(f"{self.image.storage.url(variant['name'])} {variant['width']}w")
+		return ", ".join(entries)
+
+	@property
+	def sources(self) -> list[dict]:
+		"""عناصر <source> للصيغ الحديثة بترتيب الأفضلية"""
+		sources = []
+		for key, _, mime, _ in available_formats():
+			if key == "jpeg":
+				continue
+			srcset = self.srcset_for(key)
+			if srcset:
+				sources.append({"type": mime, "srcset": srcset})
+		return sources
+
+	@property
+	def srcset(self) -> str:
+		return self.srcset_for("jpeg")
+
+	@property
+	def thumb_url(self) -> str:
+		return self._variant_url("thumb", "jpeg") or (self.image.url if self.image else "")
+
+	@property
+	def display_url(self) -> str:
+		"""المقاس المتوسط لنافذة العرض بدل الأصل كامل الدقة"""
+		return self._variant_url("medium", "jpeg") or (self.image.url if self.image else "")
+
+	@property
+	def thumb_size(self) -> tuple[int | None, int | None]:
+		variant = self.renditions.get("thumb", {}).get("jpeg") if self.has_renditions else None
+		if variant:
+			return variant["width"], variant["height"]
+		return self.width, self.height
+
+
+class AchievementFacetCount(models.Model):
+	"""عدد الإنجازات لكل مركز (village فارغ) ولكل (مركز، قرية)؛ يُحدَّث تدريجيًا"""
+
+	area = models.CharField(max_length=50)
+	village = models.CharField(max_length=100, blank=True, default="")
+	count = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["area", "village"], name="achievement_facet_unique"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.area} / {self.village or '*'}: {self.count}"
+
+
+class RenditionJob(models.Model):
+	"""طابور توليد المقاسات المشتقة لصور الإنجازات (يعالجه process_renditions)"""
+
+	PENDING = "pending"
+	RUNNING = "running"
+	DONE = "done"
+	FAILED = "failed"
+	STATUSES = (
+		(PENDING, "في الانتظار"),
+		(RUNNING, "قيد المعالجة"),
+		(DONE, "تم"),
+		(FAILED, "فشل"),
+	)
+
+	image = models.OneToOneField(
+		AchievementImage,
+		on_delete=models.CASCADE,
+		related_name="rendition_job",
+	)
+	status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	# وقت أول محاولة تالية؛ للمهام الجارية هو نهاية مهلة الحجز
+	run_after = models.DateTimeField(default=timezone.now)
+	worker = models.CharField(max_length=64, blank=True, default="")
+	last_error = models.TextField(blank=True, default="")
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["status", "run_after"], name="rendition_job_claim_idx"),
+		]
+
+	def __str__(self) -> str:
+		return f"Renditions for image {self.image_id} ({self.status})"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps, features
+
+
+# أقصى عرض لكل مقاس؛ المصغّرة لشبكة الإنجازات والمتوسطة لنافذة العرض
+RENDITION_WIDTHS = {
+	"thumb": 480,
+	"medium": 1280,
+}
+
+# الصيغ بترتيب الأفضلية داخل <picture>؛ JPEG دائمًا كاحتياطي
+FORMATS = (
+	("avif", "AVIF", "image/avif", {"quality": 50}),
+	("webp", "WEBP", "image/webp", {"quality": 75, "method": 6}),
+	("jpeg", "JPEG", "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+)
+
+PLACEHOLDER_WIDTH = 16
+
+
+def available_formats():
+	supported = []
+	for key, pil_format, mime, options in FORMATS:
+		if key == "jpeg" or features.check(key):
+			supported.append((key, pil_format, mime, options))
+	return supported
+
+
+def _encode(image: Image.Image, pil_format: str, options: dict) -> bytes:
+	buffer = BytesIO()
+	image.save(buffer, pil_format, **options)
+	return buffer.getvalue()
+
+
+def _resize(image: Image.Image, width: int) -> Image.Image:
+	if image.width <= width:
+		return image
+	height = max(1, round(image.height * width / image.width))
+	return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _placeholder(image: Image.Image) -> str:
+	tiny = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+	data = _encode(tiny, "JPEG", {"quality": 40})
+	return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def _rendition_name(source_name: str, size: str, data: bytes, ext: str) -> str:
+	# الاسم مشتق من المحتوى فيمكن تخزينه مؤقتًا في المتصفح بلا نهاية
+	root, _ = posixpath.splitext(source_name)
+	digest = hashlib.sha256(data).hexdigest()[:12]
+	return f"{root}.{size}.{digest}.{ext}"
+
+
+def _load(storage, name: str) -> Image.Image:
+	with storage.open(name, "rb") as source:
+		image = Image.open(source)
+		image = ImageOps.exif_transpose(image)
+		if image.mode not in ("RGB", "L"):
+			image = image.convert("RGB")
+		else:
+			image.load()
+		return image
+
+
+def build_renditions(storage, source_name: str) -> dict:
+	"""توليد المقاسات المشتقة لصورة إنجاز وحفظها بجانب الأصل
+
+	يُقرأ الأصل من تخزين الحقل، وتُكتب المقاسات عبر التخزين الافتراضي بأسمائها
+	كما هي (وليس في مخزن المحتوى) فتبقى بجانب الأصل ويحذفها gc_blobs معه.
+
+	تُرجع قيم الحقول: width, height, placeholder, renditions. حقل renditions
+	على شكل {"source": اسم الأصل, "thumb": {"webp": {...}, ...}, "medium": {...}}
+	وكل عنصر فيه name و width و height.
+	"""
+	image = _load(storage, source_name)
+
+	renditions: dict = {"source": source_name}
+	for size, max_width in RENDITION_WIDTHS.items():
+		resized = _resize(image, max_width)
+		variants = {}
+		for key, pil_format, _, options in available_formats():
+			data = _encode(resized, pil_format, options)
+			name = _rendition_name(source_name, size, data, key)
+			if not default_storage.exists(name):
+				name = default_storage.save(name, ContentFile(data))
+			variants[key] = {"name": name, "width": resized.width, "height": resized.height}
+		renditions[size] = variants
+
+	return {
+		"width": image.width,
+		"height": image.height,
+		"placeholder": _placeholder(image),
+		"renditions": renditions,
+	}
+
+
+def rendition_names(renditions: dict) -> list[str]:
+	names = []
+	for size in RENDITION_WIDTHS:
+		for variant in (renditions or {}).get(size, {}).values():
+			names.append(variant["name"])
+	return names
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .caching import bump_content_version
+from .facets import adjust_facets
+from .geography import invalidate_geography
+from .jobs import enqueue_renditions
+from .models import Achievement, AchievementImage, Area, Village
+
+
+@receiver(post_save, sender=AchievementImage)
+def queue_image_renditions(sender, instance: AchievementImage, raw=False, **kwargs):
+	# يشمل الرفع من لوحة الإدارة وأمر import_achievements؛ التوليد نفسه في process_renditions
+	if raw or not instance.image or instance.has_renditions:
+		return
+	enqueue_renditions([instance.pk])
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+@receiver(post_save, sender=AchievementImage)
+@receiver(post_delete, sender=AchievementImage)
+def invalidate_achievements_cache(sender, **kwargs):
+	# بعد الحفظ الفعلي حتى لا يُخزَّن طلب متزامن البيانات القديمة تحت الإصدار الجديد
+	transaction.on_commit(bump_content_version)
+
+
+def _facet_of(instance: Achievement) -> tuple[str | None, str]:
+	# من __dict__ حتى لا تُحمَّل الحقول المؤجلة
+	return instance.__dict__.get("area"), instance.__dict__.get("village") or ""
+
+
+@receiver(post_init, sender=Achievement)
+def remember_facet(sender, instance: Achievement, **kwargs):
+	instance._original_facet = _facet_of(instance)
+
+
+@receiver(post_save, sender=Achievement)
+def update_facets_on_save(sender, instance: Achievement, created, raw=False, **kwargs):
+	current = _facet_of(instance)
+	previous = None if created else getattr(instance, "_original_facet", None)
+	# مركز غير محمّل عند الإنشاء (only/defer): يُترك لـ rebuild_facets
+	unknown = previous is not None and previous[0] is None
+	if previous != current and not unknown:
+		changes = Counter({current: 1})
+		if previous is not None:
+			changes[previous] -= 1
+		adjust_facets(changes)
+	instance._original_facet = current
+
+
+@receiver(post_delete, sender=Achievement)
+def update_facets_on_delete(sender, instance: Achievement, **kwargs):
+	adjust_facets(Counter({_facet_of(instance): -1}))
+
+
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+@receiver(post_save, sender=Village)
+@receiver(post_delete, sender=Village)
+def invalidate_geography_cache(sender, **kwargs):
+	# القوائم المنسدلة وأسماء القرى جزء من الصفحات المخزنة أيضًا
+	transaction.on_commit(invalidate_geography)
+	transaction.on_commit(bump_content_version)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from django.urls import reverse
+
+from website.testing import QueryBudgetTestCase
+
+
+class AchievementsListTests(QueryBudgetTestCase):
+	def test_list(self):
+		with self.assertQueryBudget(4):
+			response = self.client.get(reverse("achievements:list"))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(response.context["page_obj"]), 12)
+
+	def test_list_filtered_by_area(self):
+		area = self.seed_area()
+		with self.assertQueryBudget(4):
+			response = self.client.get(reverse("achievements:list"), {"area": area, "page": 2})
+		self.assertEqual(response.status_code, 200)
+
+	def test_list_served_from_page_cache(self):
+		self.client.get(reverse("achievements:list"))
+		with self.assertQueryBudget(0):
+			response = self.client.get(reverse("achievements:list"))
+		self.assertEqual(response["X-Cache"], "HIT")
+
+	def seed_area(self) -> str:
+		from achievements.models import Achievement
+
+		return Achievement.objects.values_list("area", flat=True).first()
+
+
+class GeographyRenameTests(QueryBudgetTestCase):
+	def test_area_rename_moves_achievements_and_facets(self):
+		from achievements.facets import get_facets
+		from achievements.models import Achievement, Area
+
+		area = Area.objects.get(name=Achievement.objects.values_list("area", flat=True).first())
+		count = Achievement.objects.filter(area=area.name).count()
+		old_name = area.name
+		area.name = "مركز جديد"
+		with self.captureOnCommitCallbacks(execute=True):
+			area.save()
+		self.assertFalse(Achievement.objects.filter(area=old_name).exists())
+		self.assertEqual(Achievement.objects.filter(area="مركز جديد").count(), count)
+		facets = get_facets()
+		self.assertEqual(facets["areas"]["مركز جديد"], count)
+		self.assertNotIn(old_name, facets["areas"])
+
+	def test_village_rename_moves_achievements_and_facets(self):
+		from achievements.facets import get_facets
+		from achievements.models import Achievement, Village
+
+		village = Village.objects.select_related("area").first()
+		area = village.area.name
+		with self.captureOnCommitCallbacks(execute=True):
+			Achievement.objects.create(title="إنجاز القرية", description="وصف", area=area, village=village.name)
+		old_name = village.name
+		village.name = "قرية جديدة"
+		with self.captureOnCommitCallbacks(execute=True):
+			village.save()
+		self.assertEqual(Achievement.objects.get(title="إنجاز القرية").village, "قرية جديدة")
+		villages = get_facets()["villages"][area]
+		self.assertEqual(villages["قرية جديدة"], 1)
+		self.assertNotIn(old_name, villages)
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
-from django.core.paginator import Paginator
 
-from .models import Achievement, AREAS, VILLAGES
+from website.db_router import replica_reads
+from website.page_cache import public_page_cache
 
+from .caching import CACHE_TIMEOUT, CachedCountPaginator, get_content_version, versioned_key
+from .facets import get_facets, village_options
+from .geography import get_geography
+from .models import Achievement
 
+
+@public_page_cache
+@replica_reads
 def achievements_list_view(request: HttpRequest) -> HttpResponse:
 	area = request.GET.get("area")
 	village = request.GET.get("village")
@@ -23,22 +30,32 @@ def achievements_list_view(request: HttpRequest) -> HttpResponse:
 			achievements_qs = achievements_qs.filter(village=village)
 	
 	# Get available villages for selected area
+	# الأعداد من جدول الفلاتر المخزن في الكاش، والقرى بلا إنجازات لا تُعرض
+	facets = get_facets()
+	geography = get_geography()
 	available_villages = []
-	if area and area in VILLAGES:
-		available_villages = VILLAGES[area]
+	if area and geography.has_area(area):
+		available_villages = village_options(area, facets, village)
 	
 	# Paginate results
-	paginator = Paginator(achievements_qs, 12)
+	# العدد والجزء المعروض مخزنان حسب إصدار المحتوى، فاستعلام الصفحة لا يُنفذ
+	# إلا عند عدم وجود الجزء في الكاش (يُقيَّم داخل وسم cache في القالب)
+	version = get_content_version()
+	paginator = CachedCountPaginator(
+		achievements_qs, 12, count_key=versioned_key("achievements:count", version, area, area and village)
+	)
 	page_number = request.GET.get("page")
 	page_obj = paginator.get_page(page_number)
 	
 	context = {
+		"content_version": version,
+		"cache_timeout": CACHE_TIMEOUT,
 		"page_obj": page_obj,
-		"areas": [a for a, _ in AREAS],
+		"areas": [(a, facets["areas"].get(a, 0)) for a in geography.areas],
 		"villages": available_villages,
 		"selected_area": area,
 		"selected_village": village,
-		"village_choices": VILLAGES,
+		"village_choices": {a: village_options(a, facets) for a in geography.areas},
 	}
 	
 	return render(request, "achievements/list.html", context)
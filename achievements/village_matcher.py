@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from .geography import Geography, normalize_arabic
+
+
+# بادئات شائعة في أسماء القرى؛ الاسم بدونها مطابقة أضعف
+VILLAGE_PREFIXES = ("كفر ", "منشاه ", "عزبه ")
+# كلمات لا تكفي وحدها لتمييز قرية
+GENERIC_WORDS = {"كفر", "منشاه", "عزبه", "مدينه", "قريه", "الكبري", "الصغري", "البلد", "المحطه"}
+
+FULL_NAME = 1.0
+WITHOUT_PREFIX = 0.7
+SINGLE_WORD = 0.5
+# حرف عطف أو جر ملتصق بالاسم (وهيت، بطملاي)
+ATTACHED_PREFIX_FACTOR = 0.9
+
+
+def trie_pattern(words) -> str:
+	"""تعبير منتظم مُحلَّل كشجرة بادئات: كل حرف يُفحص مرة واحدة مهما كثرت الأسماء"""
+	trie: dict = {}
+	for word in words:
+		node = trie
+		for char in word:
+			node = node.setdefault(char, {})
+		node[""] = {}
+
+	def build(node: dict) -> str:
+		end = "" in node
+		branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+		if not branches:
+			return ""
+		body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+		if end:
+			# مع الأطول أولًا (الاسم الكامل قبل جزئه) يُفضَّل الأطول عند وجود الاثنين
+			return "(?:" + body + ")?"
+		return body
+
+	return build(trie)
+
+
+@dataclass(frozen=True)
+class VillageMatch:
+	village: str | None
+	confidence: float
+	# القرى الأخرى التي حصلت على نفس أعلى درجة
+	alternatives: tuple[str, ...] = ()
+
+	@property
+	def ambiguous(self) -> bool:
+		return bool(self.alternatives)
+
+
+class VillageMatcher:
+	"""مطابقة كل أسماء القرى في مرور واحد على النص بتعبير منتظم واحد
+
+	كل صيغة (الاسم كاملًا، بدون البادئة، كلمة مميزة واحدة) تُضاف للتعبير
+	مرة واحدة، ويُحدد لكل صيغة القرى والثقة المقابلة لها. قابل للـ pickle
+	حتى يُرسل لعمليات فرعية.
+	"""
+
+	def __init__(self, geography: Geography):
+		variants: dict[str, list[tuple[str, str, float]]] = {}
+
+		def add(text: str, area: str, code: str, confidence: float):
+			if len(text) >= 3:
+				variants.setdefault(text, []).append((area, code, confidence))
+
+		word_owners: dict[str, set[tuple[str, str]]] = {}
+		for area in geography.areas:
+			for code, name in geography.village_choices(area):
+				normalized = normalize_arabic(name)
+				add(normalized, area, code, FULL_NAME)
+				for prefix in VILLAGE_PREFIXES:
+					if normalized.startswith(prefix):
+						add(normalized[len(prefix):], area, code, WITHOUT_PREFIX)
+				words = normalized.split()
+				if len(words) > 1:
+					for word in words:
+						if word not in GENERIC_WORDS and len(word) >= 4:
+							word_owners.setdefault(word, set()).add((area, code))
+		full_names = set(variants)
+		for word, owners in word_owners.items():
+			# كلمة مشتركة بين أكثر من قرية، أو هي اسم قرية كاملًا، لا تُستخدم وحدها
+			if len(owners) == 1 and word not in full_names:
+				(area, code), = owners
+				add(word, area, code, SINGLE_WORD)
+
+		self.variants = variants
+		self.pattern = re.compile(rf"(?<!\w)(?P<prefix>[وبلف])?(?P<name>{trie_pattern(variants)})(?!\w)") if variants else None
+
+	def scores(self, description: str, area: str | None = None) -> dict[str, tuple[float, int]]:
+		"""{رمز القرية: (أعلى ثقة، موضع أول ظهور)} للقرى المذكورة في النص"""
+		found: dict[str, tuple[float, int]] = {}
+		if self.pattern is None or not description:
+			return found
+		for match in self.pattern.finditer(normalize_arabic(description)):
+			factor = ATTACHED_PREFIX_FACTOR if match.group("prefix") else 1.0
+			for village_area, code, confidence in self.variants[match.group("name")]:
+				if area and village_area != area:
+					continue
+				score = round(confidence * factor, 3)
+				best = found.get(code)
+				if best is None or score > best[0]:
+					found[code] = (score, best[1] if best else match.start())
+		return found
+
+	def match(self, description: str, area: str | None = None) -> VillageMatch:
+		found = self.scores(description, area)
+		if not found:
+			return VillageMatch(None, 0.0)
+		# أعلى ثقة، ثم الأسبق ذكرًا في النص
+		ranked = sorted(found.items(), key=lambda item: (-item[1][0], item[1][1]))
+		village, (confidence, _) = ranked[0]
+		alternatives = tuple(code for code, (score, _) in ranked[1:] if score == confidence)
+		return VillageMatch(village, confidence, alternatives)
+
+
+def match_rows(matcher: VillageMatcher, rows: list[tuple[int, str, str]]) -> list[tuple[int, VillageMatch]]:
+	"""rows من (id, area, description)؛ تعمل في العمليات الفرعية دون قاعدة بيانات"""
+	return [(pk, matcher.match(description, area)) for pk, area, description in rows]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from .models import ActivityLog
+from .models import ActivityLog, ExportJob
 
 
 @admin.register(ActivityLog)
@@ -23,3 +23,18 @@ class ActivityLogAdmin(admin.ModelAdmin):
 	)
 	ordering = ("-timestamp",)
 
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+	list_display = ("id", "kind", "file_format", "status", "progress", "total", "requested_by", "created_at", "expires_at")
+	list_filter = ("kind", "status")
+	list_select_related = ("requested_by",)
+	readonly_fields = (
+		"kind", "file_format", "params", "params_hash", "status", "progress", "total", "file", "size",
+		"requested_by", "run_after", "worker", "error", "created_at", "started_at", "finished_at", "expires_at",
+	)
+	ordering = ("-created_at",)
+
+	def has_add_permission(self, request):
+		return False
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from heapq import merge
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from achievements import exports as achievement_exports
+from achievements.caching import get_content_version
+from achievements.models import Achievement
+from chat_app.models import AdminMessage, Message
+from requests_app.models import Request, RequestAttachment
+from requests_app.projections import REQUEST_ROW, request_rows
+from website.db_router import read_from_replica
+
+from .models import ExportJob
+from .storage import get_export_storage
+
+
+# مهلة حجز المهمة؛ تُمدد مع كل تحديث للتقدم، وإذا توقف العامل تعود للطابور
+LEASE = timedelta(minutes=10)
+PROGRESS_EVERY = 500
+CHUNK_SIZE = 2000
+
+Progress = Callable[[int], None]
+
+
+@dataclass(frozen=True)
+class Exporter:
+	label: str
+	formats: tuple[str, ...]
+	# إصدار البيانات الحالي؛ تغيّره يعني أن الملف المخزن لم يعد مطابقًا
+	fingerprint: Callable[[dict], str]
+	count: Callable[[dict], int]
+	write: Callable[[str, str, dict, Progress], int]
+
+
+def _counted(rows: Iterable, progress: Progress) -> Iterator:
+	count = 0
+	for count, row in enumerate(rows, 1):
+		if count % PROGRESS_EVERY == 0:
+			progress(count)
+		yield row
+	progress(count)
+
+
+def _chunks(iterable: Iterable, size: int = CHUNK_SIZE) -> Iterator[list]:
+	iterator = iter(iterable)
+	return iter(lambda: list(islice(iterator, size)), [])
+
+
+def _write_records(path: str, fmt: str, columns: list[str], records: Iterable[dict]) -> int:
+	"""كتابة قواميس متدفقة بصيغة NDJSON أو CSV دون تجميعها في الذاكرة"""
+	count = 0
+	with open(path, "w", newline="", encoding="utf-8-sig" if fmt == "csv" else "utf-8") as f:
+		if fmt == "csv":
+			writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+			writer.writeheader()
+		for record in records:
+			count += 1
+			if fmt == "csv":
+				writer.writerow(record)
+			else:
+				f.write(json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n")
+	return count
+
+
+# ----- الإنجازات -----
+
+def _achievements(params: dict):
+	queryset = Achievement.objects.all()
+	if params.get("area"):
+		queryset = queryset.filter(area=params["area"])
+	return queryset
+
+
+def _achievements_fingerprint(params: dict) -> str:
+	return str(get_content_version())
+
+
+def _write_achievements(path: str, fmt: str, params: dict, progress: Progress) -> int:
+	rows = _counted(achievement_exports.iter_export_rows(_achievements(params)), progress)
+	if fmt == "xlsx":
+		return achievement_exports.write_xlsx(path, rows, embed_images=bool(params.get("embed_images")))
+	if fmt == "parquet":
+		return achievement_exports.write_parquet(path, rows)
+	return achievement_exports.write_csv(path, rows)
+
+
+# ----- الطلبات -----
+
+REQUEST_COLUMNS = [
+	"id", "tracking_number", "title", "description", "status_name",
+	"full_name", "phone", "address", "created_at", "attachments",
+]
+
+
+def _requests(params: dict):
+	queryset = Request.objects.all()
+	if params.get("status"):
+		queryset = queryset.filter(status__name=params["status"])
+	return queryset
+
+
+def _requests_fingerprint(params: dict) -> str:
+	stats = _requests(params).aggregate(n=Count("id"), changed=Max("updated_at"))
+	attachments = RequestAttachment.objects.aggregate(last=Max("id"))["last"]
+	return f"{stats['n']}:{stats['changed']}:{attachments}"
+
+
+def _write_requests(path: str, fmt: str, params: dict, progress: Progress) -> int:
+	queryset = REQUEST_ROW.values(_requests(params)).order_by("-created_at", "-id")
+
+	def records():
+		for chunk in _chunks(queryset.iterator(chunk_size=CHUNK_SIZE)):
+			for row in request_rows(chunk):
+				if fmt == "csv":
+					row["attachments"] = " | ".join(a["file_path"] or "" for a in row["attachments"])
+				yield row
+
+	return _write_records(path, fmt, REQUEST_COLUMNS, _counted(records(), progress))
+
+
+# ----- محادثات الدردشة -----
+
+CHAT_COLUMNS = ["chat_room", "user", "sender_type", "message_type", "content", "created_at"]
+
+
+def _chat_fingerprint(params: dict) -> str:
+	messages = Message.objects.aggregate(n=Count("id"), last=Max("created_at"))
+	admin = AdminMessage.objects.aggregate(n=Count("id"), last=Max("updated_at"))
+	return f"{messages['n']}:{messages['last']}:{admin['n']}:{admin['last']}"
+
+
+def _write_chat(path: str, fmt: str, params: dict, progress: Progress) -> int:
+	"""رسائل كل غرفة مدموجة مع الرسائل الإدارية بالترتيب الزمني؛ مؤشران متوازيان فالذاكرة لا تكبر مع حجم البيانات"""
+	fields = ("chat_room_id", "created_at", "message_type", "content", "chat_room__user__username")
+	ordering = ("chat_room_id", "created_at", "id")
+	# رسائل الإدارة مكررة في Message بنوع admin، فتُؤخذ من AdminMessage فقط
+	messages = Message.objects.exclude(message_type="admin").order_by(*ordering).values_list(*fields)
+	admin = AdminMessage.objects.order_by(*ordering).values_list(*fields)
+
+	def tagged(rows, admin_rows: bool):
+		for room_id, created_at, message_type, content, username in rows.iterator(chunk_size=CHUNK_SIZE):
+			sender_type = "admin" if admin_rows else "user" if message_type == "user" else "bot"
+			yield room_id, created_at, sender_type, message_type, content, username
+
+	def records():
+		# الاستعلامان مرتبان بنفس المفتاح (الغرفة ثم الوقت)، فيكفي دمج تدفقيهما
+		for room_id, created_at, sender_type, message_type, content, username in merge(
+			tagged(messages, False), tagged(admin, True), key=lambda m: (m[0], m[1])
+		):
+			yield {
+				"chat_room": str(room_id),
+				"user": username,
+				"sender_type": sender_type,
+				"message_type": message_type,
+				"content": content,
+				"created_at": created_at,
+			}
+
+	return _write_records(path, fmt, CHAT_COLUMNS, _counted(records(), progress))
+
+
+def _chat_count(params: dict) -> int:
+	return Message.objects.exclude(message_type="admin").count() + AdminMessage.objects.count()
+
+
+EXPORTERS: dict[str, Exporter] = {
+	ExportJob.ACHIEVEMENTS: Exporter(
+		"الإنجازات", ("xlsx", "csv", "parquet"),
+		_achievements_fingerprint, lambda params: _achievements(params).count(), _write_achievements,
+	),
+	ExportJob.REQUESTS: Exporter(
+		"الطلبات", ("csv", "ndjson"),
+		_requests_fingerprint, lambda params: _requests(params).count(), _write_requests,
+	),
+	ExportJob.CHAT: Exporter(
+		"محادثات الدردشة", ("csv", "ndjson"),
+		_chat_fingerprint, _chat_count, _write_chat,
+	),
+}
+
+
+def _clean_params(params: dict | None) -> dict:
+	return {key: value for key, value in sorted((params or {}).items()) if value not in (None, "", False)}
+
+
+def request_export(kind: str, file_format: str, params: dict | None = None, user=None) -> tuple[ExportJob, bool]:
+	"""إنشاء مهمة تصدير، أو إرجاع مهمة مطابقة جارية أو ملف جاهز لم تتغير بياناته
+
+	يُرجع (المهمة، هل أعيد استخدامها).
+	"""
+	exporter = EXPORTERS[kind]
+	if file_format not in exporter.formats:
+		raise ValueError(f"{kind} exports do not support {file_format}")
+	params = _clean_params(params)
+	source = json.dumps([kind, file_format, params, exporter.fingerprint(params)], sort_keys=True, default=str)
+	params_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+	now = timezone.now()
+	existing = (
+		ExportJob.objects.filter(params_hash=params_hash)
+		.filter(
+			Q(status__in=[ExportJob.PENDING, ExportJob.RUNNING])
+			| Q(status=ExportJob.DONE, expires_at__gt=now)
+		)
+		.order_by("-created_at")
+		.first()
+	)
+	if existing is not None:
+		return existing, True
+	job = ExportJob.objects.create(
+		kind=kind,
+		file_format=file_format,
+		params=params,
+		params_hash=params_hash,
+		requested_by=user if user is not None and user.is_authenticated else None,
+	)
+	return job, False
+
+
+def _claimable(now) -> Q:
+	return Q(run_after__lte=now) & (Q(status=ExportJob.PENDING) | Q(status=ExportJob.RUNNING))
+
+
+def claim_export_job(worker: str) -> ExportJob | None:
+	"""حجز أقدم مهمة متاحة بتحديث مشروط (نفس أسلوب طابور المقاسات)"""
+	now = timezone.now()
+	candidate = (
+		ExportJob.objects.filter(_claimable(now)).order_by("run_after", "id").values_list("id", flat=True).first()
+	)
+	if candidate is None:
+		return None
+	claimed = ExportJob.objects.filter(_claimable(now), pk=candidate).update(
+		status=ExportJob.RUNNING,
+		run_after=now + LEASE,
+		worker=worker,
+		progress=0,
+		started_at=now,
+		error="",
+	)
+	if not claimed:
+		return None
+	return ExportJob.objects.get(pk=candidate)
+
+
+def run_export_job(job: ExportJob, worker: str) -> bool:
+	exporter = EXPORTERS[job.kind]
+	storage = get_export_storage()
+	mine = ExportJob.objects.filter(pk=job.pk, worker=worker)
+
+	def progress(count: int):
+		mine.update(progress=count, run_after=timezone.now() + LEASE)
+
+	name = storage.get_available_name(f"exports/{job.kind}-{job.pk}-{job.params_hash[:8]}.{job.file_format}")
+	path = storage.path(name)
+	partial = f"{path}.part"
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	try:
+		# البيانات تُقرأ من النسخة المتماثلة، وتحديثات التقدم تُكتب على الأساسية
+		with read_from_replica():
+			mine.update(total=exporter.count(job.params))
+			rows = exporter.write(partial, job.file_format, job.params, progress)
+		# الملف لا يظهر باسمه النهائي إلا بعد اكتماله
+		os.replace(partial, path)
+	except Exception:
+		if os.path.exists(partial):
+			os.remove(partial)
+		now = timezone.now()
+		mine.update(status=ExportJob.FAILED, error=traceback.format_exc(limit=5)[-4000:], finished_at=now, run_after=now)
+		return False
+	now = timezone.now()
+	mine.update(
+		status=ExportJob.DONE,
+		file=name,
+		size=os.path.getsize(path),
+		progress=rows,
+		total=rows,
+		finished_at=now,
+		expires_at=now + settings.EXPORT_ARTIFACT_TTL,
+	)
+	return True
+
+
+def purge_expired() -> int:
+	"""حذف ملفات التصدير المنتهية؛ يبقى السجل بحالة منتهي"""
+	now = timezone.now()
+	storage = get_export_storage()
+	expired = list(
+		ExportJob.objects.filter(status=ExportJob.DONE, expires_at__lte=now).values_list("id", "file")
+	)
+	for _, name in expired:
+		if name and storage.exists(name):
+			storage.delete(name)
+	ExportJob.objects.filter(pk__in=[pk for pk, _ in expired]).update(status=ExportJob.EXPIRED, file="")
+	return len(expired)
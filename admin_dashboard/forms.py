@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import importlib.util
+
+from django import forms
+
+from achievements.geography import get_geography
+from requests_app.models import RequestStatus
+
+from .exports import EXPORTERS
+from .models import ExportJob
+
+
+FORMAT_LABELS = {
+	"xlsx": "Excel (xlsx)",
+	"csv": "CSV",
+	"ndjson": "NDJSON",
+	"parquet": "Parquet",
+}
+
+
+def format_available(file_format: str) -> bool:
+	# Parquet يتطلب pyarrow وهو اعتماد اختياري
+	return file_format != "parquet" or importlib.util.find_spec("pyarrow") is not None
+
+
+class ExportRequestForm(forms.Form):
+	kind = forms.ChoiceField(label="البيانات", choices=ExportJob.KINDS)
+	file_format = forms.ChoiceField(label="الصيغة")
+	area = forms.ChoiceField(label="المركز (للإنجازات)", required=False)
+	embed_images = forms.BooleanField(label="تضمين صور مصغرة (Excel)", required=False)
+	status = forms.ChoiceField(label="حالة الطلب (للطلبات)", required=False)
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		formats = dict.fromkeys(f for exporter in EXPORTERS.values() for f in exporter.formats if format_available(f))
+		self.fields["file_format"].choices = [(f, FORMAT_LABELS.get(f, f)) for f in formats]
+		self.fields["area"].choices = [("", "الكل")] + get_geography().area_choices()
+		self.fields["status"].choices = [("", "الكل")] + [
+			(name, name) for name in RequestStatus.objects.order_by("name").values_list("name", flat=True)
+		]
+
+	def clean(self):
+		cleaned = super().clean()
+		kind, file_format = cleaned.get("kind"), cleaned.get("file_format")
+		if kind and file_format and file_format not in EXPORTERS[kind].formats:
+			self.add_error("file_format", "هذه الصيغة غير متاحة لهذا النوع من البيانات")
+		return cleaned
+
+	def export_params(self) -> dict:
+		kind = self.cleaned_data["kind"]
+		if kind == ExportJob.ACHIEVEMENTS:
+			return {"area": self.cleaned_data["area"], "embed_images": self.cleaned_data["embed_images"]}
+		if kind == ExportJob.REQUESTS:
+			return {"status": self.cleaned_data["status"]}
+		return {}
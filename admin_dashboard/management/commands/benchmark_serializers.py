@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chat_app.models import ChatRoom, Message
+from chat_app.projections import MESSAGE_ROW
+from chat_app.serializers import MessageSerializer
+from requests_app.models import Request, RequestStatus
+from requests_app.projections import REQUEST_ROW, request_rows
+from requests_app.serializers import RequestSerializer
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+	help = (
+		"Compare read-path throughput of the DRF ModelSerializers against the "
+		".values() projections on generated rows. All data is rolled back."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--rows", type=int, default=10_000, help="Rows per model")
+		parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+
+	def handle(self, *args, **options):
+		rows: int = options["rows"]
+		repeat: int = options["repeat"]
+
+		with transaction.atomic():
+			room = self._seed(rows)
+
+			requests_qs = Request.objects.select_related("status", "user").prefetch_related("attachments")
+			self._compare(
+				"Request",
+				rows,
+				repeat,
+				lambda: RequestSerializer(requests_qs.all(), many=True).data,
+				lambda: request_rows(list(REQUEST_ROW.values(requests_qs.all()))),
+			)
+
+			messages_qs = Message.objects.filter(chat_room=room)
+			self._compare(
+				"Message",
+				rows,
+				repeat,
+				lambda: MessageSerializer(messages_qs.all(), many=True).data,
+				lambda: list(MESSAGE_ROW.rows(messages_qs.all())),
+			)
+
+			transaction.set_rollback(True)
+
+	def _seed(self, rows: int) -> ChatRoom:
+		user = User.objects.create(username=f"bench-{uuid.uuid4().hex[:8]}", phone="01000000000")
+		room, _ = ChatRoom.objects.get_or_create(user=user)
+		status = RequestStatus.objects.get_or_create(name="قيد المراجعة")[0]
+		Request.objects.bulk_create(
+			[
+				Request(
+					user=user,
+					title=f"طلب رقم {i}",
+					description="الشارع مظلم ليلاً ويحتاج إنارة",
+					full_name="مستخدم تجريبي",
+					phone="01000000000",
+					address="منوف",
+					status=status,
+					tracking_number=uuid.uuid4().hex[:12].upper(),
+				)
+				for i in range(rows)
+			],
+			batch_size=1000,
+		)
+		Message.objects.bulk_create(
+			[Message(chat_room=room, content=f"رسالة رقم {i}") for i in range(rows)],
+			batch_size=1000,
+		)
+		return room
+
+	def _compare(self, label, rows, repeat, baseline, fast):
+		baseline_time = self._best_of(repeat, baseline)
+		fast_time = self._best_of(repeat, fast)
+		self.stdout.write(f"{label} ({rows} rows)")
+		self.stdout.write(f"  ModelSerializer: {baseline_time:.3f}s  {rows / baseline_time:,.0f} rows/s")
+		self.stdout.write(f"  Projection:      {fast_time:.3f}s  {rows / fast_time:,.0f} rows/s")
+		self.stdout.write(self.style.SUCCESS(f"  Speedup: x{baseline_time / fast_time:.1f}"))
+
+	def _best_of(self, repeat, func) -> float:
+		best = float("inf")
+		for _ in range(repeat):
+			start = time.perf_counter()
+			func()
+			best = min(best, time.perf_counter() - start)
+		return best
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+SCHEMA = (
+	"CREATE TABLE room (id TEXT PRIMARY KEY, updated_at REAL NOT NULL)",
+	"CREATE TABLE message (id TEXT PRIMARY KEY, room_id TEXT NOT NULL REFERENCES room (id), content TEXT NOT NULL, created_at REAL NOT NULL)",
+	"CREATE INDEX message_room_created ON message (room_id, created_at)",
+	"CREATE TABLE notification (id TEXT PRIMARY KEY, room_id TEXT NOT NULL, message_id TEXT NOT NULL, created_at REAL NOT NULL)",
+)
+
+# (الاسم، أوامر PRAGMA، بداية المعاملة، مهلة القفل)
+PROFILES = (
+	("default", ("PRAGMA journal_mode=DELETE",), "BEGIN", 5.0),
+	("tuned", settings.SQLITE_PRAGMAS, "BEGIN IMMEDIATE", 20.0),
+)
+
+
+class Command(BaseCommand):
+	help = (
+		"Measure SQLite throughput for concurrent chat polling (readers) and "
+		"send_message-style writes, with the default journal versus the tuned "
+		"profile from settings.SQLITE_PRAGMAS. Uses temporary database files."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--readers", type=int, default=8, help="Polling threads")
+		parser.add_argument("--writers", type=int, default=4, help="Threads sending messages")
+		parser.add_argument("--seconds", type=float, default=5.0, help="Duration per profile")
+		parser.add_argument("--rooms", type=int, default=50)
+		parser.add_argument("--messages", type=int, default=20_000, help="Messages created before the run")
+
+	def handle(self, *args, **options):
+		self.stdout.write(
+			f"{options['readers']} readers, {options['writers']} writers, {options['seconds']:.0f}s per profile"
+		)
+		header = f"{'profile':<10}{'reads/s':>10}{'writes/s':>10}{'read p95':>11}{'write p95':>11}{'locked':>8}"
+		results = []
+		with tempfile.TemporaryDirectory() as directory:
+			for name, pragmas, begin, timeout in PROFILES:
+				path = Path(directory) / f"{name}.sqlite3"
+				rooms = self.prepare(path, pragmas, options)
+				results.append((name, self.run(path, pragmas, begin, timeout, rooms, options)))
+
+		self.stdout.write(header)
+		for name, r in results:
+			self.stdout.write(
+				f"{name:<10}{r['reads'] / options['seconds']:>10.0f}{r['writes'] / options['seconds']:>10.0f}"
+				f"{r['read_p95'] * 1000:>9.1f}ms{r['write_p95'] * 1000:>9.1f}ms{r['locked']:>8}"
+			)
+
+	def connect(self, path: Path, pragmas, timeout: float) -> sqlite3.Connection:
+		# isolation_level=None: المعاملات صريحة كما يفعل Django في وضع autocommit
+		connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+		for pragma in pragmas:
+			connection.execute(pragma)
+		return connection
+
+	def prepare(self, path: Path, pragmas, options) -> list[str]:
+		connection = self.connect(path, pragmas, 5.0)
+		for statement in SCHEMA:
+			connection.execute(statement)
+		rooms = [str(uuid.uuid4()) for _ in range(options["rooms"])]
+		now = time.time()
+		connection.execute("BEGIN")
+		connection.executemany("INSERT INTO room VALUES (?, ?)", [(room, now) for room in rooms])
+		connection.executemany(
+			"INSERT INTO message VALUES (?, ?, ?, ?)",
+			[(str(uuid.uuid4()), rooms[i % len(rooms)], "رسالة " * 10, now + i) for i in range(options["messages"])],
+		)
+		connection.execute("COMMIT")
+		connection.close()
+		return rooms
+
+	def run(self, path: Path, pragmas, begin: str, timeout: float, rooms: list[str], options) -> dict:
+		stop = threading.Event()
+		lock = threading.Lock()
+		stats = {"reads": 0, "writes": 0, "locked": 0, "read_times": [], "write_times": []}
+
+		def record(kind: str, elapsed: float):
+			with lock:
+				stats[f"{kind}s"] += 1
+				stats[f"{kind}_times"].append(elapsed)
+
+		def reader(index: int):
+			connection = self.connect(path, pragmas, timeout)
+			room = rooms[index % len(rooms)]
+			while not stop.is_set():
+				started = time.perf_counter()
+				try:
+					# مثل get_messages: مُحقِّق ETag ثم رسائل الغرفة
+					connection.execute("SELECT updated_at FROM room WHERE id = ?", (room,)).fetchone()
+					connection.execute(
+						"SELECT id, content, created_at FROM message WHERE room_id = ? ORDER BY created_at DESC LIMIT 50",
+						(room,),
+					).fetchall()
+				except sqlite3.OperationalError:
+					with lock:
+						stats["locked"] += 1
+					continue
+				record("read", time.perf_counter() - started)
+			connection.close()
+
+		def writer(index: int):
+			connection = self.connect(path, pragmas, timeout)
+			counter = 0
+			while not stop.is_set():
+				room = rooms[(index + counter) % len(rooms)]
+				counter += 1
+				message_id, now = str(uuid.uuid4()), time.time()
+				started = time.perf_counter()
+				try:
+					# مثل send_message: رسالة + تحديث الغرفة + إشعار في معاملة واحدة قصيرة
+					connection.execute(begin)
+					connection.execute("SELECT id FROM room WHERE id = ?", (room,)).fetchone()
+					connection.execute("INSERT INTO message VALUES (?, ?, ?, ?)", (message_id, room, "رسالة جديدة", now))
+					connection.execute("UPDATE room SET updated_at = ? WHERE id = ?", (now, room))
+					connection.execute(
+						"INSERT INTO notification VALUES (?, ?, ?, ?)", (str(uuid.uuid4()), room, message_id, now)
+					)
+					connection.execute("COMMIT")
+				except sqlite3.OperationalError:
+					if connection.in_transaction:
+						connection.execute("ROLLBACK")
+					with lock:
+						stats["locked"] += 1
+					continue
+				record("write", time.perf_counter() - started)
+			connection.close()
+
+		threads = [threading.Thread(target=reader, args=(i,)) for i in range(options["readers"])]
+		threads += [threading.Thread(target=writer, args=(i,)) for i in range(options["writers"])]
+		for thread in threads:
+			thread.start()
+		time.sleep(options["seconds"])
+		stop.set()
+		for thread in threads:
+			thread.join()
+
+		def p95(values):
+			return statistics.quantiles(values, n=20)[-1] if len(values) >= 20 else (max(values) if values else 0.0)
+
+		return {
+			"reads": stats["reads"],
+			"writes": stats["writes"],
+			"locked": stats["locked"],
+			"read_p95": p95(stats["read_times"]),
+			"write_p95": p95(stats["write_times"]),
+		}
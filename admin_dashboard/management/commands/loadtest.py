@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import secrets
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from chat_app.models import ChatRoom
+from users.models import User
+
+
+USER_PREFIX = "loadtest-"
+QUERIES_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class HttpClient:
+	"""عميل HTTP/1.1 بسيط فوق asyncio مع اتصال دائم (keep-alive)؛ يكفي لخادم محلي بدون مكتبات إضافية"""
+
+	def __init__(self, base_url: str, cookies: dict[str, str] | None = None, timeout: float = 30.0):
+		parts = urlsplit(base_url)
+		if parts.scheme != "http":
+			raise CommandError("Only plain http:// base URLs are supported")
+		self.host, self.port = parts.hostname, parts.port or 80
+		self.cookies = cookies or {}
+		self.timeout = timeout
+		self.reader = self.writer = None
+
+	async def close(self):
+		if self.writer is not None:
+			self.writer.close()
+			self.reader = self.writer = None
+
+	async def request(self, method: str, path: str, body: bytes = b"", headers: dict[str, str] | None = None):
+		for attempt in (1, 2):
+			try:
+				if self.writer is None:
+					self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+				return await asyncio.wait_for(self._exchange(method, path, body, headers or {}), self.timeout)
+			except (ConnectionError, asyncio.IncompleteReadError):
+				# الخادم أغلق الاتصال الدائم بين طلبين؛ نعيد المحاولة مرة على اتصال جديد
+				await self.close()
+				if attempt == 2:
+					raise
+
+	async def _exchange(self, method, path, body, headers):
+		lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+		if self.cookies:
+			lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+		lines += [f"{k}: {v}" for k, v in headers.items()]
+		self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+		await self.writer.drain()
+
+		status = int((await self.reader.readuntil(b"\r\n")).split()[1])
+		response_headers = {}
+		while (line := await self.reader.readuntil(b"\r\n")) != b"\r\n":
+			name, _, value = line.decode("latin-1").partition(":")
+			response_headers[name.strip().lower()] = value.strip()
+
+		if "content-length" in response_headers:
+			content = await self.reader.readexactly(int(response_headers["content-length"]))
+		elif response_headers.get("transfer-encoding") == "chunked":
+			content = b""
+			while size := int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16):
+				content += await self.reader.readexactly(size + 2)
+				content = content[:-2]
+			await self.reader.readuntil(b"\r\n")
+		elif status in (204, 304):
+			content = b""
+		else:
+			content = await self.reader.read()
+			await self.close()
+		if response_headers.get("connection", "").lower() == "close":
+			await self.close()
+		return status, response_headers, content
+
+
+@dataclass
+class Endpoint:
+	latencies: list[float] = field(default_factory=list)
+	queries: list[int] = field(default_factory=list)
+	statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+	errors: int = 0
+	cache_hits: int = 0
+
+
+class Recorder:
+	def __init__(self):
+		self.endpoints: dict[str, Endpoint] = defaultdict(Endpoint)
+		self.recording = False
+
+	async def call(self, name: str, client: HttpClient, method: str, path: str, **kwargs):
+		started = time.perf_counter()
+		try:
+			status, headers, content = await client.request(method, path, **kwargs)
+		except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+			if self.recording:
+				self.endpoints[name].errors += 1
+			await client.close()
+			return None, {}, b""
+		if self.recording:
+			endpoint = self.endpoints[name]
+			endpoint.latencies.append((time.perf_counter() - started) * 1000)
+			endpoint.statuses[status] += 1
+			if status >= 500:
+				endpoint.errors += 1
+			# متاح فقط إذا كان الخادم يشغّل InstrumentationMiddleware بنسبة عينات > 0
+			if match := QUERIES_RE.search(headers.get("server-timing", "")):
+				endpoint.queries.append(int(match.group(2)))
+			if headers.get("x-cache") == "HIT":
+				endpoint.cache_hits += 1
+		return status, headers, content
+
+
+def _percentile(values, q: float) -> float:
+	ordered = sorted(values)
+	return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class Command(BaseCommand):
+	help = (
+		"Load-test a running server (runserver, gunicorn or an ASGI server sharing this database) with "
+		"simulated citizens polling and sending chat messages, staff polling the chat dashboard APIs and "
+		"anonymous visitors browsing achievements. Writes throughput, latency percentiles and per-request "
+		"query counts to a JSON file; pass --compare to diff against an earlier run."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+		parser.add_argument("--citizens", type=int, default=50)
+		parser.add_argument("--staff", type=int, default=5)
+		parser.add_argument("--anonymous", type=int, default=20)
+		parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+		parser.add_argument("--warmup", type=float, default=5.0, help="Seconds before measuring starts")
+		parser.add_argument("--think", type=float, default=1.0, help="Mean pause between a user's requests")
+		parser.add_argument("--send-every", type=int, default=10, help="A citizen sends a message every N polls")
+		parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+		parser.add_argument("--label", default="", help="Free text stored with the results, e.g. a branch name")
+		parser.add_argument("--output", default=None, help="Results file (default loadtest-<timestamp>.json)")
+		parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+		parser.add_argument("--cleanup", action="store_true", help="Delete the loadtest users and their chat data")
+
+	def handle(self, *args, **options):
+		if options["cleanup"]:
+			deleted, _ = User.objects.filter(username__startswith=USER_PREFIX).delete()
+			self.stdout.write(f"Deleted {deleted} rows")
+			return
+
+		self.random = random.Random(options["seed"])
+		citizens, staff = self.prepare_users(options["citizens"], options["staff"])
+		sessions = {user.pk: self.login(user) for user in citizens + staff}
+		try:
+			recorder = asyncio.run(self.run(options, citizens, staff, sessions))
+		finally:
+			store = import_module(settings.SESSION_ENGINE).SessionStore
+			for session_key in sessions.values():
+				store(session_key).delete()
+
+		results = self.summarize(recorder, options)
+		output = Path(options["output"] or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+		output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+		self.report(results)
+		if options["compare"]:
+			self.compare(json.loads(Path(options["compare"]).read_text(encoding="utf-8")), results)
+		self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+	def prepare_users(self, citizen_count: int, staff_count: int):
+		"""مستخدمون ثابتو الأسماء يعاد استخدامهم بين التشغيلات، كل مواطن بغرفة دردشة"""
+		citizens = [
+			User.objects.get_or_create(
+				username=f"{USER_PREFIX}citizen-{i}", defaults={"full_name": f"مواطن تجريبي {i}", "phone": f"0199{i:07d}"}
+			)[0]
+			for i in range(citizen_count)
+		]
+		staff = [
+			User.objects.get_or_create(
+				username=f"{USER_PREFIX}staff-{i}", defaults={"is_staff": True, "phone": f"0198{i:07d}"}
+			)[0]
+			for i in range(staff_count)
+		]
+		existing = set(ChatRoom.objects.filter(user__in=citizens).values_list("user_id", flat=True))
+		ChatRoom.objects.bulk_create(ChatRoom(user=user) for user in citizens if user.pk not in existing)
+		return citizens, staff
+
+	def login(self, user: User) -> str:
+		# نفس ما يفعله Client.force_login: جلسة جاهزة بدون المرور بنموذج الدخول
+		session = import_module(settings.SESSION_ENGINE).SessionStore()
+		session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+		session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+		session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+		session.create()
+		return session.session_key
+
+	async def run(self, options, citizens, staff, sessions) -> Recorder:
+		recorder = Recorder()
+		deadline = time.perf_counter() + options["warmup"] + options["duration"]
+		csrf = secrets.token_hex(16)
+
+		def client(user=None) -> HttpClient:
+			cookies = {settings.SESSION_COOKIE_NAME: sessions[user.pk], settings.CSRF_COOKIE_NAME: csrf} if user else {}
+			return HttpClient(options["base_url"], cookies)
+
+		async def pause():
+			await asyncio.sleep(self.random.expovariate(1 / options["think"]) if options["think"] > 0 else 0)
+
+		async def citizen(user):
+			http, etag, polls = client(user), None, 0
+			while time.perf_counter() < deadline:
+				# المتصفح يعيد ETag آخر رد، فأغلب الاستطلاعات تنتهي بـ 304
+				headers = {"If-None-Match": etag} if etag else {}
+				status, response_headers, _ = await recorder.call(
+					"get_messages", http, "GET", reverse("chat:get_messages"), headers=headers
+				)
+				etag = response_headers.get("etag", etag)
+				polls += 1
+				if options["send_every"] and polls % options["send_every"] == 0:
+					body = json.dumps({"content": f"رسالة اختبار {polls}"}).encode()
+					await recorder.call(
+						"send_message", http, "POST", reverse("chat:send_message"), body=body,
+						headers={"Content-Type": "application/json", "X-CSRFToken": csrf},
+					)
+				await pause()
+			await http.close()
+
+		async def staff_member(user):
+			http = client(user)
+			while time.perf_counter() < deadline:
+				await recorder.call("get_chat_rooms", http, "GET", reverse("chat:admin_get_chat_rooms"))
+				await recorder.call("get_notifications", http, "GET", reverse("chat:admin_get_notifications"))
+				await pause()
+			await http.close()
+
+		async def visitor():
+			http = client()
+			while time.perf_counter() < deadline:
+				query = urlencode({"page": self.random.randint(1, 3)})
+				await recorder.call("achievements_list", http, "GET", f"{reverse('achievements:list')}?{query}")
+				await pause()
+			await http.close()
+
+		async def start_measuring():
+			await asyncio.sleep(options["warmup"])
+			recorder.recording = True
+			recorder.started = time.perf_counter()
+
+		tasks = [citizen(user) for user in citizens]
+		tasks += [staff_member(user) for user in staff]
+		tasks += [visitor() for _ in range(options["anonymous"])]
+		await asyncio.gather(start_measuring(), *tasks)
+		recorder.elapsed = time.perf_counter() - recorder.started
+		return recorder
+
+	def summarize(self, recorder: Recorder, options) -> dict:
+		elapsed = recorder.elapsed
+		endpoints = {}
+		for name, endpoint in sorted(recorder.endpoints.items()):
+			latencies = endpoint.latencies
+			endpoints[name] = {
+				"requests": len(latencies),
+				"errors": endpoint.errors,
+				"statuses": {str(status): count for status, count in sorted(endpoint.statuses.items())},
+				"rps": round(len(latencies) / elapsed, 1),
+				"latency_ms": {
+					"p50": round(_percentile(latencies, 0.5), 1),
+					"p90": round(_percentile(latencies, 0.9), 1),
+					"p95": round(_percentile(latencies, 0.95), 1),
+					"p99": round(_percentile(latencies, 0.99), 1),
+					"max": round(max(latencies, default=0.0), 1),
+				},
+				"cache_hits": endpoint.cache_hits,
+			}
+			if endpoint.queries:
+				endpoints[name]["queries"] = {
+					"sampled": len(endpoint.queries),
+					"mean": round(statistics.fmean(endpoint.queries), 2),
+					"max": max(endpoint.queries),
+				}
+
+		total = sum(e["requests"] for e in endpoints.values())
+		sampled = [(e["queries"]["mean"], e["rps"]) for e in endpoints.values() if "queries" in e]
+		return {
+			"label": options["label"],
+			"started_at": datetime.now().isoformat(timespec="seconds"),
+			"config": {
+				key: options[key]
+				for key in ("base_url", "citizens", "staff", "anonymous", "duration", "warmup", "think", "send_every", "seed")
+			},
+			"elapsed_s": round(elapsed, 2),
+			"totals": {
+				"requests": total,
+				"errors": sum(e["errors"] for e in endpoints.values()),
+				"rps": round(total / elapsed, 1),
+				# تقدير من متوسط الاستعلامات لكل طلب مُعاين × معدل طلبات المسار
+				"db_queries_per_s": round(sum(mean * rps for mean, rps in sampled), 1) if sampled else None,
+			},
+			"endpoints": endpoints,
+		}
+
+	def report(self, results: dict):
+		self.stdout.write(f"{'endpoint':<20}{'req':>8}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}{'q/req':>7}")
+		for name, e in results["endpoints"].items():
+			latency = e["latency_ms"]
+			queries = f"{e['queries']['mean']:.1f}" if "queries" in e else "-"
+			self.stdout.write(
+				f"{name:<20}{e['requests']:>8}{e['rps']:>8.1f}{latency['p50']:>7.1f}ms"
+				f"{latency['p95']:>7.1f}ms{latency['p99']:>7.1f}ms{e['errors']:>6}{queries:>7}"
+			)
+		totals = results["totals"]
+		self.stdout.write(
+			f"total: {totals['requests']} requests, {totals['rps']} req/s, {totals['errors']} errors"
+			+ (f", ~{totals['db_queries_per_s']} queries/s" if totals["db_queries_per_s"] is not None else "")
+		)
+		if totals["db_queries_per_s"] is None:
+			self.stdout.write("No query counts: run the server with DJANGO_INSTRUMENTATION_SAMPLE_RATE=1 to collect them.")
+
+	def compare(self, before: dict, after: dict):
+		self.stdout.write(f"\nCompared with {before.get('label') or before.get('started_at')}:")
+		for name, e in after["endpoints"].items():
+			old = before.get("endpoints", {}).get(name)
+			if not old:
+				continue
+			rps = e["rps"] - old["rps"]
+			p95 = e["latency_ms"]["p95"] - old["latency_ms"]["p95"]
+			self.stdout.write(f"{name:<20} rps {rps:+.1f}   p95 {p95:+.1f}ms")
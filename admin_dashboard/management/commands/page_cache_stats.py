@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from website.page_cache import page_cache_stats
+
+
+class Command(BaseCommand):
+	help = "Show hit/miss counters of the public page cache (shared by all server processes)."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--reset", action="store_true", help="Reset the counters after printing them")
+
+	def handle(self, *args, **options):
+		stats = page_cache_stats(reset=options["reset"])
+		served = stats["hit"] + stats["stale"] + stats["wait"]
+		total = served + stats["miss"]
+		for metric, value in stats.items():
+			self.stdout.write(f"{metric:<8}{value:>10}")
+		ratio = served / total * 100 if total else 0
+		self.stdout.write(self.style.SUCCESS(f"Served from cache: {ratio:.1f}% of {total} cacheable requests"))
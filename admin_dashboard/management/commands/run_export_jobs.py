@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+import socket
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from admin_dashboard.exports import claim_export_job, purge_expired, run_export_job
+
+
+class Command(BaseCommand):
+	help = (
+		"Build queued dashboard exports (achievements, requests, chat transcripts) "
+		"in the background and delete expired export files."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--once", action="store_true", help="Process the current queue and exit instead of polling")
+		parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when the queue is empty")
+
+	def handle(self, *args, **options):
+		worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+		done = failed = 0
+		while True:
+			purged = purge_expired()
+			if purged:
+				self.stdout.write(f"Deleted {purged} expired export files")
+			job = claim_export_job(worker)
+			if job is None:
+				if options["once"]:
+					break
+				time.sleep(options["sleep"])
+				continue
+
+			started = time.monotonic()
+			self.stdout.write(self.style.NOTICE(f"Export #{job.pk}: {job.kind} as {job.file_format}"))
+			if run_export_job(job, worker):
+				done += 1
+				job.refresh_from_db(fields=["progress", "size"])
+				self.stdout.write(self.style.SUCCESS(
+					f"Export #{job.pk} finished: {job.progress} rows, {job.size // 1024} KB in {time.monotonic() - started:.1f}s"
+				))
+			else:
+				failed += 1
+				job.refresh_from_db(fields=["error"])
+				self.stdout.write(self.style.WARNING(f"Export #{job.pk} failed: {job.error.strip().splitlines()[-1]}"))
+
+		self.stdout.write(self.style.SUCCESS(f"Done: {done} exports built, {failed} failed"))
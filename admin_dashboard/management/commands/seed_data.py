@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from achievements.facets import rebuild_facets
+from achievements.geography import get_geography
+from achievements.models import Achievement
+from chat_app.ai_service import LOCATION_KEYWORDS, NEGATIVE_WORDS, POSITIVE_WORDS, PROBLEM_KEYWORDS, SERVICE_KEYWORDS, URGENT_WORDS
+from chat_app.models import AdminMessage, ChatNotification, ChatRoom, Message
+from requests_app.models import DEFAULT_STATUSES, Request, RequestStatus
+from users.models import User
+
+
+USERNAME_PREFIX = "seed-"
+IMPORT_KEY_PREFIX = "seed:"
+PASSWORD = "seed-password"
+# توزيع الحالات قريب من الإنتاج: أغلب الطلبات مكتملة (الأسماء من requests_app حتى لا تنشأ حالة زائدة)
+STATUSES = tuple(zip(DEFAULT_STATUSES, (15, 10, 65, 10)))
+MESSAGE_TYPES = (("user", 45), ("bot", 40), ("admin", 10), ("system", 5))
+
+FIRST_NAMES = ("أحمد", "محمد", "محمود", "مصطفى", "علي", "حسن", "إبراهيم", "يوسف", "فاطمة", "مريم", "سارة", "نورا", "هبة", "آية")
+LAST_NAMES = ("عبد الله", "السيد", "عبد الرحمن", "الشافعي", "منصور", "عطية", "سالم", "شحاتة", "البنا", "زكي")
+GREETINGS = ("السلام عليكم", "مرحبا", "أهلا", "صباح الخير", "مساء الخير", "")
+REQUEST_OPENINGS = ("عندي", "في", "محتاج حل لـ", "أرجو حل", "لدينا")
+BOT_REPLIES = (
+	"تم استلام رسالتك وسيتم التواصل معك قريبًا.",
+	"هل تريد إنشاء طلب جديد بهذه المشكلة؟",
+	"يمكنك متابعة حالة طلبك برقم التتبع من صفحة طلباتي.",
+	"شكرًا لتواصلك معنا، نحن في خدمتك دائمًا.",
+)
+ADMIN_REPLIES = (
+	"تم تحويل طلبك للجهة المختصة.",
+	"فريق الصيانة في الطريق إلى موقعك.",
+	"نعتذر عن التأخير، جارٍ العمل على حل المشكلة.",
+	"تم حل المشكلة، برجاء التأكيد.",
+)
+SYSTEM_MESSAGES = ("تم إنشاء طلب جديد من المحادثة.", "تم تحديث حالة الطلب.")
+
+# يُملأ في كل عملية (العامل أو الأمر نفسه) قبل إدراج أي دفعة
+_context: dict = {}
+
+
+def _choose(rng: random.Random, weighted) -> str:
+	return rng.choices([value for value, _ in weighted], [weight for _, weight in weighted])[0]
+
+
+class TextGenerator:
+	"""نصوص عربية من نفس جداول كلمات AIService، فتمرّ الرسائل المولّدة بنفس فروع التحليل"""
+
+	def __init__(self, rng: random.Random):
+		self.rng = rng
+
+	def full_name(self) -> str:
+		return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+	def phone(self) -> str:
+		return f"01{self.rng.choice('0125')}{self.rng.randrange(10**8):08d}"
+
+	def address(self) -> str:
+		return f"شارع {self.rng.choice(LAST_NAMES)} - {self.rng.choice(LOCATION_KEYWORDS)}"
+
+	def problem(self) -> tuple[str, str, str]:
+		service = self.rng.choice(tuple(SERVICE_KEYWORDS))
+		problem = self.rng.choice(tuple(PROBLEM_KEYWORDS))
+		return service, self.rng.choice(SERVICE_KEYWORDS[service]), self.rng.choice(PROBLEM_KEYWORDS[problem])
+
+	def citizen_message(self) -> str:
+		_, service_word, problem_word = self.problem()
+		parts = [
+			self.rng.choice(GREETINGS),
+			self.rng.choice(REQUEST_OPENINGS),
+			f"{problem_word} في {service_word}",
+			f"في {self.rng.choice(LOCATION_KEYWORDS)}",
+		]
+		roll = self.rng.random()
+		if roll < 0.2:
+			parts.append(self.rng.choice(tuple(URGENT_WORDS)))
+		elif roll < 0.35:
+			parts.append(self.rng.choice(tuple(NEGATIVE_WORDS)))
+		elif roll < 0.5:
+			parts.append(self.rng.choice(tuple(POSITIVE_WORDS)))
+		if self.rng.random() < 0.3:
+			parts.append("متى سيتم الحل؟")
+		return " ".join(part for part in parts if part)
+
+	def request(self) -> tuple[str, str]:
+		service, service_word, problem_word = self.problem()
+		location = self.rng.choice(LOCATION_KEYWORDS)
+		title = f"طلب {service} - {problem_word} - {location}"
+		description = " ".join(self.citizen_message() for _ in range(self.rng.randint(1, 3)))
+		return title, description
+
+
+def _timestamp(rng: random.Random):
+	return _context["since"] + timedelta(seconds=rng.random() * _context["span"])
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+	return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _build_users(rng, text, start, stop):
+	return {
+		User: [
+			User(
+				username=f"{USERNAME_PREFIX}{i:07d}",
+				password=_context["password"],
+				full_name=text.full_name(),
+				phone=text.phone(),
+				address=text.address(),
+				date_joined=_timestamp(rng),
+			)
+			for i in range(start, stop)
+		]
+	}
+
+
+def _build_requests(rng, text, start, stop):
+	user_ids, statuses = _context["user_ids"], _context["statuses"]
+	rows = []
+	for i in range(start, stop):
+		title, description = text.request()
+		created = _timestamp(rng)
+		rows.append(
+			Request(
+				user_id=rng.choice(user_ids),
+				title=title,
+				description=description,
+				full_name=text.full_name(),
+				phone=text.phone(),
+				address=text.address(),
+				status_id=statuses[_choose(rng, STATUSES)],
+				tracking_number=f"SD{_context['seed']}-{i:09d}",
+				created_at=created,
+				updated_at=created + timedelta(hours=rng.randint(0, 24 * 30)),
+			)
+		)
+	return {Request: rows}
+
+
+def _build_rooms(rng, text, start, stop):
+	user_ids, room_ids, now = _context["user_ids"], _context["room_ids"], _context["now"]
+	return {
+		ChatRoom: [
+			ChatRoom(id=room_ids[j], user_id=user_ids[j], is_active=rng.random() < 0.9, created_at=_timestamp(rng), updated_at=now)
+			for j in range(start, stop)
+		]
+	}
+
+
+def _build_messages(rng, text, start, stop):
+	room_ids, staff_id = _context["room_ids"], _context["staff_id"]
+	messages, notifications, admin_messages = [], [], []
+	for _ in range(start, stop):
+		# توزيع منحرف: قلة من الغرف تحمل أغلب المحادثات كما في الواقع
+		room_id = room_ids[int(len(room_ids) * rng.random() ** 2)]
+		message_type = _choose(rng, MESSAGE_TYPES)
+		created = _timestamp(rng)
+		if message_type == "user":
+			content = text.citizen_message()
+		elif message_type == "bot":
+			content = rng.choice(BOT_REPLIES)
+		elif message_type == "admin":
+			content = rng.choice(ADMIN_REPLIES)
+		else:
+			content = rng.choice(SYSTEM_MESSAGES)
+		message = Message(
+			id=_uuid(rng), chat_room_id=room_id, message_type=message_type, content=content,
+			is_read=rng.random() < 0.8, created_at=created,
+		)
+		messages.append(message)
+		if message_type == "user" and rng.random() < _context["notification_ratio"]:
+			urgent = any(word in content for word in URGENT_WORDS)
+			notifications.append(
+				ChatNotification(
+					id=_uuid(rng), chat_room_id=room_id, message_id=message.id,
+					notification_type="urgent_message" if urgent else "new_message",
+					priority=rng.randint(7, 10) if urgent else rng.randint(1, 6),
+					is_read=rng.random() < 0.7, created_at=created,
+				)
+			)
+		elif message_type == "admin":
+			# الردود الإدارية مخزنة في الجدولين كما يفعل send_admin_message
+			admin_messages.append(
+				AdminMessage(
+					id=_uuid(rng), chat_room_id=room_id, admin_user_id=staff_id, content=content,
+					is_read_by_user=message.is_read, is_important=rng.random() < 0.1,
+					created_at=created, updated_at=created,
+				)
+			)
+	return {Message: messages, ChatNotification: notifications, AdminMessage: admin_messages}
+
+
+def _build_achievements(rng, text, start, stop):
+	areas, villages = _context["areas"], _context["villages"]
+	rows = []
+	for i in range(start, stop):
+		service, _, _ = text.problem()
+		area = rng.choice(areas)
+		choices = villages.get(area, ())
+		rows.append(
+			Achievement(
+				title=f"تطوير {service} في {area}",
+				description=" ".join(rng.choice(BOT_REPLIES + ADMIN_REPLIES) for _ in range(4)),
+				area=area,
+				village=rng.choice(choices)[0] if choices and rng.random() < 0.7 else None,
+				import_key=f"{IMPORT_KEY_PREFIX}{_context['seed']}:{i}",
+				created_at=_timestamp(rng),
+			)
+		)
+	return {Achievement: rows}
+
+
+PHASES = {
+	"users": _build_users,
+	"requests": _build_requests,
+	"rooms": _build_rooms,
+	"messages": _build_messages,
+	"achievements": _build_achievements,
+}
+
+
+def _allow_explicit_timestamps() -> list:
+	"""إيقاف auto_now/auto_now_add مؤقتًا حتى تُحفظ تواريخ موزعة على الفترة بدل لحظة التشغيل"""
+	changed = []
+	for model in (Request, ChatRoom, Message, ChatNotification, AdminMessage, Achievement):
+		for field in model._meta.concrete_fields:
+			for flag in ("auto_now", "auto_now_add"):
+				if getattr(field, flag, False):
+					setattr(field, flag, False)
+					changed.append((field, flag))
+	return changed
+
+
+def _init_worker(context: dict):
+	if not apps.ready:
+		import django
+
+		django.setup()
+	_context.update(context)
+	_allow_explicit_timestamps()
+
+
+def _insert_chunk(task) -> int:
+	phase, chunk, start, stop = task
+	# بذرة لكل (مرحلة، دفعة): نفس البيانات مهما كان عدد العمال أو ترتيب تنفيذهم
+	rng = random.Random(f"{_context['seed']}:{phase}:{chunk}")
+	rows = PHASES[phase](rng, TextGenerator(rng), start, stop)
+	with transaction.atomic():
+		for model, objects in rows.items():
+			model.objects.bulk_create(objects, batch_size=_context["batch_size"])
+	return sum(len(objects) for objects in rows.values())
+
+
+class Command(BaseCommand):
+	help = (
+		"Generate a large synthetic dataset (users, requests, chat rooms, messages, notifications, "
+		"achievements) with bulk inserts in parallel workers. Output is deterministic for a given --seed. "
+		"Use --scale for a smaller copy, e.g. --scale 0.01."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--users", type=int, default=100_000)
+		parser.add_argument("--requests", type=int, default=1_000_000)
+		parser.add_argument("--rooms", type=int, default=None, help="Chat rooms (default: half the users)")
+		parser.add_argument("--messages", type=int, default=10_000_000)
+		parser.add_argument("--achievements", type=int, default=5_000)
+		parser.add_argument("--notification-ratio", type=float, default=0.3, help="Share of citizen messages that notify staff")
+		parser.add_argument("--scale", type=float, default=1.0, help="Multiply every volume by this factor")
+		parser.add_argument("--days", type=int, default=365, help="Spread timestamps over this many past days")
+		parser.add_argument("--seed", type=int, default=1)
+		parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+		parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per transaction and per worker task")
+		parser.add_argument("--flush", action="store_true", help="Delete previously seeded rows first")
+		parser.add_argument("--force", action="store_true", help="Allow running with DEBUG off")
+
+	def handle(self, *args, **options):
+		if not settings.DEBUG and not options["force"]:
+			raise CommandError("Refusing to seed with DEBUG off; pass --force if this really is a test database.")
+		if options["flush"]:
+			self.flush()
+		elif User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+			raise CommandError("Seeded data already exists; pass --flush to replace it.")
+
+		scale = options["scale"]
+		counts = {
+			"users": int(options["users"] * scale),
+			"requests": int(options["requests"] * scale),
+			"messages": int(options["messages"] * scale),
+			"achievements": int(options["achievements"] * scale),
+		}
+		counts["rooms"] = min(counts["users"], int(options["rooms"] * scale) if options["rooms"] is not None else counts["users"] // 2)
+
+		now = timezone.now()
+		geography = get_geography()
+		context = {
+			"seed": options["seed"],
+			"batch_size": options["batch_size"],
+			"notification_ratio": options["notification_ratio"],
+			"now": now,
+			"since": now - timedelta(days=options["days"]),
+			"span": options["days"] * 86400,
+			# تجزئة واحدة لكل المستخدمين؛ PBKDF2 لكل صف وحده يستغرق ساعات
+			"password": make_password(PASSWORD),
+			"statuses": {name: RequestStatus.objects.get_or_create(name=name)[0].pk for name, _ in STATUSES},
+			"staff_id": User.objects.get_or_create(
+				username=f"{USERNAME_PREFIX}staff", defaults={"is_staff": True, "phone": "01000000000"}
+			)[0].pk,
+			"areas": geography.areas or LOCATION_KEYWORDS,
+			"villages": geography.villages,
+		}
+		started = time.perf_counter()
+		restore = _allow_explicit_timestamps()
+		try:
+			self.run_phase("users", counts["users"], context, options)
+			context["user_ids"] = list(
+				User.objects.filter(username__startswith=USERNAME_PREFIX)
+				.exclude(pk=context["staff_id"])
+				.order_by("username")
+				.values_list("pk", flat=True)
+			)
+			rng = random.Random(f"{options['seed']}:room-ids")
+			context["room_ids"] = [_uuid(rng) for _ in range(counts["rooms"])]
+			if context["user_ids"]:
+				self.run_phase("requests", counts["requests"], context, options)
+			self.run_phase("rooms", counts["rooms"], context, options)
+			if context["room_ids"]:
+				self.run_phase("messages", counts["messages"], context, options)
+			self.run_phase("achievements", counts["achievements"], context, options)
+		finally:
+			for field, flag in restore:
+				setattr(field, flag, True)
+		rebuild_facets()
+		self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.0f}s"))
+
+	def run_phase(self, phase: str, total: int, context: dict, options):
+		if total <= 0:
+			return
+		size = options["batch_size"]
+		tasks = [(phase, chunk, start, min(start + size, total)) for chunk, start in enumerate(range(0, total, size))]
+		started = time.perf_counter()
+		inserted = 0
+		if options["workers"] <= 1:
+			_context.update(context)
+			results = map(_insert_chunk, tasks)
+			inserted = self.consume(phase, results, len(tasks))
+		else:
+			# لا يرث العمال اتصال قاعدة البيانات المفتوح؛ كل عامل يفتح اتصاله
+			connections.close_all()
+			with multiprocessing.Pool(options["workers"], _init_worker, (context,)) as pool:
+				inserted = self.consume(phase, pool.imap_unordered(_insert_chunk, tasks), len(tasks))
+		elapsed = time.perf_counter() - started
+		self.stdout.write(f"{phase:<13}{inserted:>12,} rows {elapsed:>8.1f}s {inserted / elapsed:>10,.0f} rows/s")
+
+	def consume(self, phase: str, results, chunks: int) -> int:
+		inserted, step = 0, max(1, chunks // 10)
+		for done, count in enumerate(results, 1):
+			inserted += count
+			if done % step == 0 and done < chunks:
+				self.stdout.write(f"  {phase}: {done}/{chunks} batches")
+		return inserted
+
+	def flush(self):
+		# من الأوراق إلى الجذور حتى لا يجمع Django ملايين الصفوف المرتبطة في الذاكرة
+		seeded = {"chat_room__user__username__startswith": USERNAME_PREFIX}
+		for queryset in (
+			ChatNotification.objects.filter(**seeded),
+			AdminMessage.objects.filter(**seeded),
+			Message.objects.filter(**seeded),
+			ChatRoom.objects.filter(user__username__startswith=USERNAME_PREFIX),
+			Request.objects.filter(user__username__startswith=USERNAME_PREFIX),
+			User.objects.filter(username__startswith=USERNAME_PREFIX),
+			Achievement.objects.filter(import_key__startswith=IMPORT_KEY_PREFIX),
+		):
+			deleted, _ = queryset.delete()
+			self.stdout.write(f"Deleted {deleted:,} {queryset.model._meta.verbose_name_plural}")
+		rebuild_facets()
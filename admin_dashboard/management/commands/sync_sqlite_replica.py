@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from website.db_router import REPLICA
+
+
+class Command(BaseCommand):
+	help = (
+		"Copy the SQLite database to the read replica configured by DJANGO_SQLITE_REPLICA_PATH "
+		"using SQLite's online backup. Intended for testing replica routing locally."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = copy once)")
+
+	def handle(self, *args, **options):
+		replica = settings.DATABASES.get(REPLICA)
+		primary = settings.DATABASES["default"]
+		if replica is None or "sqlite3" not in primary["ENGINE"]:
+			raise CommandError("Set DJANGO_SQLITE_REPLICA_PATH (SQLite only) to configure a local replica")
+
+		while True:
+			started = time.monotonic()
+			source = sqlite3.connect(primary["NAME"])
+			target = sqlite3.connect(replica["NAME"])
+			try:
+				# نسخة متسقة حتى أثناء الكتابة على الأساسية
+				source.backup(target)
+			finally:
+				target.close()
+				source.close()
+			self.stdout.write(f"Replica synced in {(time.monotonic() - started) * 1000:.0f}ms")
+			if not options["interval"]:
+				break
+			time.sleep(options["interval"])
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+from .storage import get_export_storage
 
 
 class ActivityLog(models.Model):
@@ -12,3 +15,78 @@ class ActivityLog(models.Model):
 	def __str__(self) -> str:
 		return f"{self.user} - {self.action}"
 
+
+
+class ExportJob(models.Model):
+	"""تصدير يُبنى في الخلفية (run_export_jobs) ويبقى ملفه متاحًا حتى expires_at"""
+
+	ACHIEVEMENTS = "achievements"
+	REQUESTS = "requests"
+	CHAT = "chat"
+	KINDS = (
+		(ACHIEVEMENTS, "الإنجازات"),
+		(REQUESTS, "الطلبات"),
+		(CHAT, "محادثات الدردشة"),
+	)
+
+	PENDING = "pending"
+	RUNNING = "running"
+	DONE = "done"
+	FAILED = "failed"
+	EXPIRED = "expired"
+	STATUSES = (
+		(PENDING, "في الانتظار"),
+		(RUNNING, "قيد التنفيذ"),
+		(DONE, "جاهز"),
+		(FAILED, "فشل"),
+		(EXPIRED, "منتهي"),
+	)
+
+	kind = models.CharField(max_length=20, choices=KINDS)
+	file_format = models.CharField(max_length=10)
+	params = models.JSONField(blank=True, default=dict)
+	# بصمة (النوع، الصيغة، المعاملات، إصدار البيانات) لإعادة استخدام ملف مطابق
+	params_hash = models.CharField(max_length=64, db_index=True)
+	status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+	progress = models.PositiveIntegerField(default=0)
+	total = models.PositiveIntegerField(default=0)
+	file = models.FileField(upload_to="exports/", storage=get_export_storage, blank=True)
+	size = models.PositiveBigIntegerField(default=0)
+	requested_by = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="export_jobs",
+	)
+	# للمهام الجارية: نهاية مهلة الحجز، تُمدد مع كل تحديث للتقدم
+	run_after = models.DateTimeField(default=timezone.now)
+	worker = models.CharField(max_length=64, blank=True, default="")
+	error = models.TextField(blank=True, default="")
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+	expires_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ("-created_at",)
+		indexes = [
+			models.Index(fields=["status", "run_after"], name="export_job_claim_idx"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.get_kind_display()} ({self.file_format}) - {self.get_status_display()}"
+
+	@property
+	def percent(self) -> int:
+		if self.status == self.DONE:
+			return 100
+		return min(99, self.progress * 100 // self.total) if self.total else 0
+
+	@property
+	def is_downloadable(self) -> bool:
+		return (
+			self.status == self.DONE
+			and bool(self.file)
+			and (self.expires_at is None or self.expires_at > timezone.now())
+		)
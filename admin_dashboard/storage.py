@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class ExportStorage(FileSystemStorage):
+	"""مخزن خاص في EXPORTS_ROOT خارج MEDIA_ROOT؛ لا يُخدم عبر رابط مباشر"""
+
+	def __init__(self):
+		super().__init__(base_url=None)
+
+	@cached_property
+	def base_location(self):
+		return self._value_or_setting(self._location, settings.EXPORTS_ROOT)
+
+	def _clear_cached_properties(self, setting, **kwargs):
+		super()._clear_cached_properties(setting, **kwargs)
+		if setting == "EXPORTS_ROOT":
+			self.__dict__.pop("base_location", None)
+			self.__dict__.pop("location", None)
+
+
+_storage = None
+
+
+def get_export_storage():
+	"""callable لحقل FileField حتى لا تتغير الترحيلات مع الإعدادات"""
+	global _storage
+	if _storage is None:
+		_storage = ExportStorage()
+	return _storage
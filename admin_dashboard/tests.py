@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from django.urls import reverse
+
+from chat_app.ai_service import AIService
+from chat_app.profiling import ai_profile_summary, sampling
+from website.testing import QueryBudgetTestCase
+
+
+class DashboardTests(QueryBudgetTestCase):
+	def test_dashboard(self):
+		self.client.force_login(self.seed.superuser)
+		with self.assertQueryBudget(7):
+			response = self.client.get(reverse("admin_dashboard:index"), HTTP_ACCEPT="text/html")
+		self.assertEqual(response.status_code, 200)
+
+	def test_dashboard_requires_superuser(self):
+		self.client.force_login(self.seed.staff)
+		response = self.client.get(reverse("admin_dashboard:index"))
+		self.assertEqual(response.status_code, 403)
+
+	def test_metrics_for_staff(self):
+		self.client.force_login(self.seed.staff)
+		response = self.client.get(reverse("admin_dashboard:metrics"))
+		self.assertEqual(response.status_code, 200)
+		self.assertIn("views", response.json())
+
+	def test_ai_profile_for_staff(self):
+		with sampling(1.0):
+			AIService().process_message(self.seed.room, "مرحبا")
+		self.client.force_login(self.seed.staff)
+		data = self.client.get(reverse("admin_dashboard:ai_profile")).json()
+		self.assertEqual(data["stages"]["total"]["count"], 1)
+		self.assertIn("greeting", data["intents"])
+		self.client.post(reverse("admin_dashboard:ai_profile"))
+		self.assertEqual(ai_profile_summary()["stages"], {})
+
+	def test_ai_profile_requires_staff(self):
+		self.client.force_login(self.seed.citizen)
+		response = self.client.get(reverse("admin_dashboard:ai_profile"))
+		self.assertEqual(response.status_code, 403)
+
+
+class ChatExportTests(QueryBudgetTestCase):
+	def test_chat_export_streams_rooms_in_order(self):
+		import csv
+		import tempfile
+		from pathlib import Path
+
+		from admin_dashboard.exports import _chat_count, _write_chat
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = str(Path(directory) / "chat.csv")
+			# مؤشران للرسائل ورسائل الإدارة مهما كان عدد الغرف
+			with self.assertQueryBudget(2):
+				count = _write_chat(path, "csv", {}, lambda n: None)
+			with open(path, encoding="utf-8-sig") as f:
+				rows = list(csv.DictReader(f))
+		self.assertEqual(count, _chat_count({}))
+		self.assertEqual(len(rows), count)
+		keys = [(row["chat_room"], row["created_at"]) for row in rows]
+		self.assertEqual(keys, sorted(keys))
+		self.assertIn("admin", {row["sender_type"] for row in rows})
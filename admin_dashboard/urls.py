@@ -2,12 +2,16 @@ from __future__ import annotations
 
 from django.urls import path
 
-from .views import dashboard_view
+from .views import ai_profile_view, dashboard_view, export_download_view, export_status_view, exports_view, request_metrics_view
 
 
 app_name = "admin_dashboard"
 
 urlpatterns = [
 	path("", dashboard_view, name="index"),
+	path("exports/", exports_view, name="exports"),
+	path("exports/<int:pk>/status/", export_status_view, name="export_status"),
+	path("exports/<int:pk>/download/", export_download_view, name="export_download"),
+	path("metrics/", request_metrics_view, name="metrics"),
+	path("metrics/ai/", ai_profile_view, name="ai_profile"),
 ]
-
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from django.shortcuts import render
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
 
 from achievements.models import Achievement
+from chat_app.profiling import ai_profile_captures, ai_profile_summary, reset_ai_profile
 from requests_app.models import Request
 from users.models import User
+from website.db_router import replica_reads
+from website.instrumentation import request_metrics, reset_request_metrics
+from website.page_cache import page_cache_stats
 
+from .exports import request_export
+from .forms import ExportRequestForm
+from .models import ExportJob
 
+
+@replica_reads
 @staff_member_required
 def dashboard_view(request):
 	stats = {
@@ -19,3 +33,78 @@ def dashboard_view(request):
 	latest_requests = Request.objects.select_related("status", "user").order_by("-created_at")[:10]
 	return render(request, "dashboard/index.html", {"stats": stats, "latest_requests": latest_requests})
 
+
+def _job_status(job: ExportJob) -> dict:
+	return {
+		"id": job.pk,
+		"status": job.status,
+		"status_display": job.get_status_display(),
+		"progress": job.progress,
+		"total": job.total,
+		"percent": job.percent,
+		"download_url": reverse("admin_dashboard:export_download", args=[job.pk]) if job.is_downloadable else None,
+		"error": job.error.strip().splitlines()[-1] if job.error.strip() else "",
+	}
+
+
+@staff_member_required
+def exports_view(request):
+	"""طلب تصدير جديد وعرض آخر التصديرات؛ البناء نفسه في أمر run_export_jobs"""
+	if request.method == "POST":
+		form = ExportRequestForm(request.POST)
+		if form.is_valid():
+			job, reused = request_export(
+				form.cleaned_data["kind"], form.cleaned_data["file_format"], form.export_params(), request.user
+			)
+			if reused and job.status == ExportJob.DONE:
+				messages.success(request, "يوجد ملف مطابق جاهز للتحميل ولم تتغير البيانات منذ إنشائه")
+			elif reused:
+				messages.info(request, "يوجد تصدير مطابق قيد التنفيذ بالفعل")
+			else:
+				messages.success(request, "تمت إضافة التصدير إلى الطابور")
+			return redirect("admin_dashboard:exports")
+	else:
+		form = ExportRequestForm()
+	jobs = ExportJob.objects.select_related("requested_by")[:50]
+	return render(request, "dashboard/exports.html", {"form": form, "jobs": jobs})
+
+
+@staff_member_required
+def export_status_view(request, pk: int):
+	return JsonResponse(_job_status(get_object_or_404(ExportJob, pk=pk)))
+
+
+@staff_member_required
+def export_download_view(request, pk: int):
+	job = get_object_or_404(ExportJob, pk=pk)
+	if not job.is_downloadable:
+		raise Http404("Export is not available")
+	filename = f"{job.kind}-{job.created_at:%Y%m%d-%H%M}.{job.file_format}"
+	return FileResponse(job.file.open("rb"), as_attachment=True, filename=filename)
+
+
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def request_metrics_view(request):
+	"""ملخص زمن الطلبات واستعلاماتها لكل مسار من العينات المقيسة؛ POST يصفّر العينات"""
+	if request.method == "POST":
+		reset_request_metrics()
+	return JsonResponse({
+		"sample_rate": settings.INSTRUMENTATION_SAMPLE_RATE,
+		"views": request_metrics(),
+		"page_cache": page_cache_stats(),
+	}, json_dumps_params={"ensure_ascii": False})
+
+
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def ai_profile_view(request):
+	"""مدرجات زمن مراحل AIService وآخر لقطات cProfile؛ POST يصفّرها"""
+	if request.method == "POST":
+		reset_ai_profile()
+	return JsonResponse({
+		"sample_rate": settings.AI_PROFILE_SAMPLE_RATE,
+		"cprofile_rate": settings.AI_PROFILE_CPROFILE_RATE,
+		**ai_profile_summary(),
+		"captures": ai_profile_captures(),
+	}, json_dumps_params={"ensure_ascii": False})
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.apps import AppConfig
+
+
+class BlobstoreConfig(AppConfig):
+	default_auto_field = "django.db.models.BigAutoField"
+	name = "blobstore"
+
+	def ready(self):
+		from . import refs
+
+		refs.connect_signals()
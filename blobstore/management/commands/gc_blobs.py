@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blobstore.models import StoredBlob
+from blobstore.refs import recount
+from blobstore.storage import BLOB_PREFIX, get_blob_storage
+
+
+SHA_PREFIX_RE = re.compile(r"^([0-9a-f]{64})\.")
+
+
+class Command(BaseCommand):
+	help = "Delete content-addressed blobs (and their derived renditions) that no record references"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+		parser.add_argument("--recount", action="store_true", help="Recompute reference counts from the database first")
+		parser.add_argument("--grace-hours", type=float, default=24.0, help="Never delete files modified more recently than this")
+
+	def handle(self, *args, **options):
+		dry_run = options["dry_run"]
+		storage = get_blob_storage()
+		cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+		cutoff_ts = time.time() - options["grace_hours"] * 3600
+
+		if options["recount"]:
+			changed = recount()
+			self.stdout.write(self.style.NOTICE(f"Recounted references: {changed} blobs corrected"))
+
+		unreferenced = set(
+			StoredBlob.objects.filter(refcount=0, updated_at__lt=cutoff).values_list("pk", flat=True)
+		)
+		live = set(StoredBlob.objects.exclude(pk__in=unreferenced).values_list("pk", flat=True))
+
+		root = storage.path(BLOB_PREFIX)
+		deleted_files = freed = 0
+		deleted_blobs: set[str] = set()
+		for directory, _, files in os.walk(root, topdown=False):
+			for filename in files:
+				match = SHA_PREFIX_RE.match(filename + ".")
+				sha = match.group(1) if match else None
+				full_path = os.path.join(directory, filename)
+				if sha in live and not filename.endswith(".tmp"):
+					continue
+				try:
+					stat = os.stat(full_path)
+				except FileNotFoundError:
+					continue
+				# ملف حديث قد يكون رفعًا لم يُسجل بعد
+				if stat.st_mtime > cutoff_ts:
+					continue
+				if sha:
+					deleted_blobs.add(sha)
+				deleted_files += 1
+				freed += stat.st_size
+				if not dry_run:
+					os.remove(full_path)
+			if not dry_run and directory != root and not os.listdir(directory):
+				os.rmdir(directory)
+
+		stale_rows = unreferenced & deleted_blobs
+		if not dry_run and stale_rows:
+			StoredBlob.objects.filter(pk__in=stale_rows, refcount=0).delete()
+
+		prefix = "[dry-run] Would delete" if dry_run else "Deleted"
+		self.stdout.write(self.style.SUCCESS(
+			f"{prefix} {deleted_files} files ({freed / (1024 * 1024):.1f} MB) for {len(deleted_blobs)} blobs"
+		))
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class StoredBlob(models.Model):
+	"""ملف مخزن مرة واحدة حسب بصمة SHA-256 لمحتواه، مع عدد السجلات التي تشير إليه"""
+
+	sha256 = models.CharField(max_length=64, primary_key=True)
+	name = models.CharField(max_length=255, unique=True)
+	size = models.PositiveBigIntegerField(default=0)
+	refcount = models.PositiveIntegerField(default=0)
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["refcount", "updated_at"], name="blob_gc_idx"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.name} ({self.refcount})"
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator
+
+from django.apps import apps
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import StoredBlob
+from .storage import get_blob_storage, parse_blob_name
+
+
+# الحقول التي تستخدم مخزن المحتوى؛ كل سجل يشير لملف يزيد عدّاده بواحد
+BLOB_FIELDS = (
+	("achievements", "AchievementImage", "image"),
+	("requests_app", "RequestAttachment", "file_path"),
+)
+
+
+# أسماء حقول الملفات لكل نموذج، تُبنى مرة في connect_signals عند جاهزية التطبيقات؛
+# post_init يعمل لكل سجل يُحمَّل (القوائم والتصدير) فلا يبحث عن النماذج في كل مرة
+_FIELDS_BY_MODEL: dict[type, tuple[str, ...]] = {}
+
+
+def blob_fields() -> Iterator[tuple[type, str]]:
+	for app_label, model_name, field_name in BLOB_FIELDS:
+		yield apps.get_model(app_label, model_name), field_name
+
+
+def _grouped(names: Iterable[str]) -> dict[int, list[str]]:
+	"""تجميع البصمات حسب عدد التكرار حتى يكفي تحديث واحد لكل مجموعة"""
+	counts = Counter(sha for sha in map(parse_blob_name, names) if sha)
+	groups: dict[int, list[str]] = defaultdict(list)
+	for sha, count in counts.items():
+		groups[count].append(sha)
+	return groups
+
+
+def _ensure_rows(names: Iterable[str]) -> None:
+	by_sha = {parse_blob_name(name): name for name in names}
+	by_sha.pop(None, None)
+	existing = set(StoredBlob.objects.filter(pk__in=by_sha).values_list("pk", flat=True))
+	storage = get_blob_storage()
+	missing = []
+	for sha, name in by_sha.items():
+		if sha in existing:
+			continue
+		size = storage.size(name) if storage.exists(name) else 0
+		missing.append(StoredBlob(sha256=sha, name=name, size=size))
+	StoredBlob.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def incref(names: Iterable[str]) -> None:
+	names = [name for name in names if parse_blob_name(name)]
+	if not names:
+		return
+	_ensure_rows(names)
+	for count, shas in _grouped(names).items():
+		StoredBlob.objects.filter(pk__in=shas).update(refcount=F("refcount") + count, updated_at=timezone.now())
+
+
+def decref(names: Iterable[str]) -> None:
+	for count, shas in _grouped(names).items():
+		# بدون طرح مباشر حتى لا ينزل العدّاد تحت الصفر (عمود unsigned في MySQL)
+		StoredBlob.objects.filter(pk__in=shas).update(
+			refcount=Case(When(refcount__gt=count, then=F("refcount") - count), default=Value(0)),
+			updated_at=timezone.now(),
+		)
+
+
+def recount() -> int:
+	"""إعادة حساب العدّادات من السجلات الفعلية؛ يُرجع عدد الملفات التي تغير عدّادها"""
+	counts: Counter[str] = Counter()
+	names: dict[str, str] = {}
+	for model, field_name in blob_fields():
+		rows = (
+			model._default_manager.filter(**{f"{field_name}__startswith": "blobs/"})
+			.values(field_name)
+			.annotate(n=Count("pk"))
+			.order_by()
+		)
+		for row in rows:
+			sha = parse_blob_name(row[field_name])
+			if sha:
+				counts[sha] += row["n"]
+				names[sha] = row[field_name]
+	_ensure_rows(names.values())
+
+	changed = 0
+	for blob in StoredBlob.objects.only("pk", "refcount").iterator(chunk_size=1000):
+		if blob.refcount != counts.get(blob.pk, 0):
+			StoredBlob.objects.filter(pk=blob.pk).update(refcount=counts.get(blob.pk, 0), updated_at=timezone.now())
+			changed += 1
+	return changed
+
+
+def _loaded_name(instance, field_name: str) -> str | None:
+	# القراءة من __dict__ حتى لا يُحمَّل حقل مؤجَّل (only/defer) باستعلام إضافي
+	if field_name not in instance.__dict__:
+		return None
+	value = instance.__dict__[field_name]
+	return (getattr(value, "name", value) or "") if value is not None else ""
+
+
+def _remember(sender, instance, **kwargs):
+	instance._blob_names = {field_name: _loaded_name(instance, field_name) for field_name in _FIELDS_BY_MODEL[sender]}
+
+
+def _on_save(sender, instance, created, **kwargs):
+	previous = {} if created else getattr(instance, "_blob_names", {})
+	added, removed = [], []
+	for field_name in _FIELDS_BY_MODEL[sender]:
+		current = _loaded_name(instance, field_name)
+		old = "" if created else previous.get(field_name)
+		# قيمة غير معروفة (حقل مؤجَّل) تُترك لـ gc_blobs --recount
+		if current is None or old is None or current == old:
+			continue
+		added.append(current)
+		removed.append(old)
+	incref(added)
+	decref(removed)
+	_remember(sender, instance)
+
+
+def _on_delete(sender, instance, **kwargs):
+	decref(_loaded_name(instance, field_name) or "" for field_name in _FIELDS_BY_MODEL[sender])
+
+
+def connect_signals() -> None:
+	fields: dict[type, list[str]] = defaultdict(list)
+	for model, field_name in blob_fields():
+		fields[model].append(field_name)
+	_FIELDS_BY_MODEL.update({model: tuple(names) for model, names in fields.items()})
+	for model in _FIELDS_BY_MODEL:
+		uid = f"blobstore:{model._meta.label}"
+		post_init.connect(_remember, sender=model, weak=False, dispatch_uid=f"{uid}:init")
+		post_save.connect(_on_save, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+		post_delete.connect(_on_delete, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+BLOB_PREFIX = "blobs"
+BLOB_NAME_RE = re.compile(r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(?P<ext>\.[a-z0-9]{1,10})?$")
+
+
+def blob_name(sha256: str, ext: str = "") -> str:
+	return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def parse_blob_name(name: str) -> str | None:
+	"""بصمة الملف إن كان الاسم من مخزن المحتوى، وإلا None (الملفات القديمة)"""
+	match = BLOB_NAME_RE.match(name or "")
+	return match.group("sha256") if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+	"""تخزين حسب المحتوى: blobs/ab/cd/<sha256>.<ext>
+
+	الاسم المقترح عند الرفع يُستخدم للامتداد فقط، فالملفات المتطابقة تُخزن
+	مرة واحدة. الأسماء القديمة خارج blobs/ تبقى قابلة للقراءة كما هي.
+	"""
+
+	def get_available_name(self, name, max_length=None):
+		# الاسم النهائي يُحدد في _save حسب المحتوى
+		return name
+
+	def _save(self, name, content):
+		digest = hashlib.sha256()
+		if hasattr(content, "seek"):
+			content.seek(0)
+		for chunk in content.chunks():
+			digest.update(chunk)
+		if hasattr(content, "seek"):
+			content.seek(0)
+
+		ext = posixpath.splitext(name)[1].lower()
+		if not re.fullmatch(r"\.[a-z0-9]{1,10}", ext):
+			ext = ""
+		target = blob_name(digest.hexdigest(), ext)
+		if self.exists(target):
+			# تحديث وقت التعديل يحمي الملف من gc_blobs خلال مهلة السماح
+			os.utime(self.path(target))
+			return target
+		# كتابة لاسم مؤقت ثم إعادة تسمية ذرية، فلا يُقرأ ملف مكتوب جزئيًا
+		# ولا يتعارض رفعان متزامنان لنفس المحتوى
+		temporary = super()._save(f"{target}.{uuid.uuid4().hex}.tmp", content)
+		os.replace(self.path(temporary), self.path(target))
+		return target
+
+
+_storage = None
+
+
+def get_blob_storage():
+	"""callable لحقول FileField حتى لا تتغير الترحيلات مع إعدادات MEDIA_ROOT"""
+	global _storage
+	if _storage is None:
+		_storage = ContentAddressedStorage()
+	return _storage
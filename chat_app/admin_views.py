@@ -3,17 +3,24 @@ from __future__ import annotations
 import json
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse, HttpRequest, HttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import Q, Count, Max, OuterRef, Subquery
 from django.core.paginator import Paginator
 
 from .models import ChatRoom, Message, AdminMessage, ChatNotification
+from .projections import NOTIFICATION_ROW, merged_messages
 from users.models import User
+from website.conditional import hashed_etag
+from website.db_router import replica_reads
 
 
+@replica_reads
 @staff_member_required
 def admin_chat_dashboard(request: HttpRequest) -> HttpResponse:
     """لوحة تحكم الإدارة للدردشة"""
@@ -30,18 +37,18 @@ def admin_chat_dashboard(request: HttpRequest) -> HttpResponse:
     # آخر الرسائل
     recent_messages = Message.objects.filter(
         message_type='user'
-    ).order_by('-created_at')[:10]
+    ).select_related('chat_room__user').order_by('-created_at')[:10]
     
     # الإشعارات العاجلة
     urgent_notifications_list = ChatNotification.objects.filter(
         is_read=False,
         priority__gte=8
-    ).order_by('-created_at')[:5]
+    ).select_related('chat_room__user', 'message').order_by('-created_at')[:5]
     
     # غرف الدردشة النشطة
     active_chats = ChatRoom.objects.filter(
         is_active=True
-    ).annotate(
+    ).select_related('user').annotate(
         message_count=Count('messages'),
         unread_count=Count('messages', filter=Q(messages__is_read=False))
     ).order_by('-updated_at')[:10]
@@ -63,19 +70,20 @@ def admin_chat_dashboard(request: HttpRequest) -> HttpResponse:
 @staff_member_required
 def admin_chat_room(request: HttpRequest, chat_room_id: str) -> HttpResponse:
     """عرض غرفة دردشة محددة للإدارة"""
-    chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
+    chat_room = get_object_or_404(ChatRoom.objects.select_related('user'), id=chat_room_id)
     
     # الحصول على جميع الرسائل باستثناء رسائل الإدارة لتجنب التكرار
     messages = chat_room.messages.exclude(message_type='admin').order_by('created_at')
     
     # الحصول على الرسائل الإدارية
-    admin_messages = chat_room.admin_messages.all().order_by('created_at')
+    admin_messages = chat_room.admin_messages.select_related('admin_user').order_by('created_at')
     
-    # تحديث الإشعارات كمقروءة
-    ChatNotification.objects.filter(
+    # تحديث الإشعارات كمقروءة؛ عدد غير المقروء جزء من قائمة الغرف فتُحدَّث الغرفة معه
+    if ChatNotification.objects.filter(
         chat_room=chat_room,
         is_read=False
-    ).update(is_read=True)
+    ).update(is_read=True):
+        ChatRoom.touch(chat_room.id)
     
     context = {
         'chat_room': chat_room,
@@ -102,21 +110,25 @@ def send_admin_message(request: HttpRequest) -> JsonResponse:
         
         chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
         
-        # إنشاء الرسالة الإدارية
-        admin_message = AdminMessage.objects.create(
-            chat_room=chat_room,
-            admin_user=request.user,
-            content=content,
-            message_type=message_type,
-            is_important=is_important
-        )
-        
-        # إنشاء رسالة عادية في الدردشة
-        message = Message.objects.create(
-            chat_room=chat_room,
-            message_type='admin',
-            content=content
-        )
+        with transaction.atomic():
+            # إنشاء الرسالة الإدارية
+            admin_message = AdminMessage.objects.create(
+                chat_room=chat_room,
+                admin_user=request.user,
+                content=content,
+                message_type=message_type,
+                is_important=is_important
+            )
+
+            # إنشاء رسالة عادية في الدردشة
+            message = Message.objects.create(
+                chat_room=chat_room,
+                message_type='admin',
+                content=content
+            )
+
+            # auto_now: مُحقِّق الاستطلاع يتغير مرة واحدة للطلب
+            chat_room.save(update_fields=['updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -141,7 +153,50 @@ def send_admin_message(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _room_counts(room_ids) -> dict:
+    """عدادات غرف الصفحة باستعلام مجمّع لكل جدول بدل ضرب جداول الرسائل والإشعارات في بعضها"""
+    counts = {room_id: {} for room_id in room_ids}
+    messages = Message.objects.filter(chat_room_id__in=room_ids).values('chat_room_id').annotate(
+        message_count=Count('id'),
+        unread_count=Count('id', filter=Q(is_read=False)),
+    )
+    admin_messages = AdminMessage.objects.filter(chat_room_id__in=room_ids).values('chat_room_id').annotate(
+        admin_message_count=Count('id'),
+    )
+    notifications = ChatNotification.objects.filter(chat_room_id__in=room_ids, is_read=False).values('chat_room_id').annotate(
+        notification_count=Count('id'),
+    )
+    for rows in (messages, admin_messages, notifications):
+        for row in rows.order_by():
+            counts[row.pop('chat_room_id')].update(row)
+    return counts
+
+
+def _last_messages(room_ids) -> dict:
+    """آخر رسالة لكل غرفة في استعلام واحد"""
+    latest = Message.objects.filter(chat_room=OuterRef('pk')).order_by('-created_at').values('id')[:1]
+    message_ids = ChatRoom.objects.filter(id__in=room_ids).annotate(last_id=Subquery(latest)).values_list('id', 'last_id')
+    messages = Message.objects.in_bulk([message_id for _, message_id in message_ids if message_id])
+    return {room_id: messages[message_id] for room_id, message_id in message_ids if message_id in messages}
+
+
+def _chat_rooms_etag(request: HttpRequest):
+    # قيمتان من فهرسين بدل المرور على كل الغرف والإشعارات: كل كتابة في غرفة (رسالة،
+    # قراءة إشعار) تحدّث updated_at، وأحدث إشعار يغطي الإشعارات الجديدة
+    latest_notification = ChatNotification.objects.order_by('-created_at').values('created_at')[:1]
+    validators = (
+        ChatRoom.objects.order_by('-updated_at')
+        .annotate(latest_notification=Subquery(latest_notification))
+        .values_list('updated_at', 'latest_notification')
+        .first()
+    )
+    return hashed_etag(request, *(validators or ()))
+
+
+@replica_reads
 @staff_member_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_chat_rooms_etag)
 def get_chat_rooms(request: HttpRequest) -> JsonResponse:
     """الحصول على قائمة غرف الدردشة"""
     try:
@@ -150,13 +205,8 @@ def get_chat_rooms(request: HttpRequest) -> JsonResponse:
         status_filter = request.GET.get('status', '')
         priority_filter = request.GET.get('priority', '')
         
-        # بناء الاستعلام
-        chat_rooms = ChatRoom.objects.annotate(
-            message_count=Count('messages'),
-            unread_count=Count('messages', filter=Q(messages__is_read=False)),
-            admin_message_count=Count('admin_messages'),
-            notification_count=Count('notifications', filter=Q(notifications__is_read=False))
-        ).order_by('-updated_at')
+        # بناء الاستعلام؛ العدادات وآخر رسالة تُحسب لغرف الصفحة فقط بعد التصفح
+        chat_rooms = ChatRoom.objects.select_related('user').order_by('-updated_at')
         
         # تطبيق الفلاتر
         if search:
@@ -182,10 +232,14 @@ def get_chat_rooms(request: HttpRequest) -> JsonResponse:
         paginator = Paginator(chat_rooms, 20)
         page_obj = paginator.get_page(page)
         
+        room_ids = [chat_room.id for chat_room in page_obj]
+        counts = _room_counts(room_ids)
+        last_messages = _last_messages(room_ids)
+
         chat_rooms_data = []
         for chat_room in page_obj:
-            # الحصول على آخر رسالة
-            last_message = chat_room.messages.last()
+            room_counts = counts.get(chat_room.id, {})
+            last_message = last_messages.get(chat_room.id)
             last_message_data = None
             if last_message:
                 last_message_data = {
@@ -202,10 +256,10 @@ def get_chat_rooms(request: HttpRequest) -> JsonResponse:
                     'email': chat_room.user.email
                 },
                 'is_active': chat_room.is_active,
-                'message_count': chat_room.message_count,
-                'unread_count': chat_room.unread_count,
-                'admin_message_count': chat_room.admin_message_count,
-                'notification_count': chat_room.notification_count,
+                'message_count': room_counts.get('message_count', 0),
+                'unread_count': room_counts.get('unread_count', 0),
+                'admin_message_count': room_counts.get('admin_message_count', 0),
+                'notification_count': room_counts.get('notification_count', 0),
                 'last_message': last_message_data,
                 'created_at': chat_room.created_at.isoformat(),
                 'updated_at': chat_room.updated_at.isoformat()
@@ -227,16 +281,26 @@ def get_chat_rooms(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _notifications_etag(request: HttpRequest):
+    validators = ChatNotification.objects.aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+        latest=Max('created_at'),
+    )
+    return hashed_etag(request, *validators.values())
+
+
+@replica_reads
 @staff_member_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_notifications_etag)
 def get_notifications(request: HttpRequest) -> JsonResponse:
     """الحصول على الإشعارات"""
     try:
         notification_type = request.GET.get('type', '')
         is_read = request.GET.get('is_read', '')
         
-        notifications = ChatNotification.objects.select_related(
-            'chat_room__user', 'message'
-        ).order_by('-priority', '-created_at')
+        notifications = ChatNotification.objects.order_by('-priority', '-created_at')
         
         # تطبيق الفلاتر
         if notification_type:
@@ -248,22 +312,22 @@ def get_notifications(request: HttpRequest) -> JsonResponse:
             notifications = notifications.filter(is_read=False)
         
         notifications_data = []
-        for notification in notifications[:50]:  # آخر 50 إشعار
+        for row in NOTIFICATION_ROW.rows(notifications[:50]):  # آخر 50 إشعار
             notifications_data.append({
-                'id': str(notification.id),
+                'id': row['id'],
                 'chat_room': {
-                    'id': str(notification.chat_room.id),
-                    'user': notification.chat_room.user.username
+                    'id': row['chat_room_id'],
+                    'user': row['chat_room_user']
                 },
                 'message': {
-                    'id': str(notification.message.id),
-                    'content': notification.message.content[:100] + '...' if len(notification.message.content) > 100 else notification.message.content,
-                    'message_type': notification.message.message_type
+                    'id': row['message_id'],
+                    'content': row['message_content'],
+                    'message_type': row['message_type']
                 },
-                'notification_type': notification.notification_type,
-                'priority': notification.priority,
-                'is_read': notification.is_read,
-                'created_at': notification.created_at.isoformat()
+                'notification_type': row['notification_type'],
+                'priority': row['priority'],
+                'is_read': row['is_read'],
+                'created_at': row['created_at']
             })
         
         return JsonResponse({
@@ -286,6 +350,7 @@ def mark_notification_read(request: HttpRequest) -> JsonResponse:
         notification = get_object_or_404(ChatNotification, id=notification_id)
         notification.is_read = True
         notification.save()
+        ChatRoom.touch(notification.chat_room_id)
         
         return JsonResponse({
             'success': True,
@@ -296,46 +361,27 @@ def mark_notification_read(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _chat_messages_etag(request: HttpRequest, chat_room_id: str):
+    try:
+        updated_at = ChatRoom.objects.filter(id=chat_room_id).values_list('updated_at', flat=True).first()
+    except ValidationError:
+        return None
+    if updated_at is None:
+        return None
+    return hashed_etag(request, updated_at.isoformat())
+
+
+@replica_reads
 @staff_member_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_chat_messages_etag)
 def get_chat_messages(request: HttpRequest, chat_room_id: str) -> JsonResponse:
     """الحصول على رسائل غرفة دردشة محددة"""
     try:
-        chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
-        
-        # الحصول على الرسائل العادية باستثناء رسائل الإدارة لتجنب التكرار
-        messages = chat_room.messages.exclude(message_type='admin').order_by('created_at')
-        
-        # الحصول على الرسائل الإدارية
-        admin_messages = chat_room.admin_messages.all().order_by('created_at')
-        
-        messages_data = []
-        
-        # إضافة الرسائل العادية
-        for message in messages:
-            messages_data.append({
-                'id': str(message.id),
-                'content': message.content,
-                'message_type': message.message_type,
-                'is_read': message.is_read,
-                'created_at': message.created_at.isoformat(),
-                'sender_type': 'user' if message.message_type == 'user' else 'bot'
-            })
-        
-        # إضافة الرسائل الإدارية
-        for admin_message in admin_messages:
-            messages_data.append({
-                'id': str(admin_message.id),
-                'content': admin_message.content,
-                'message_type': admin_message.message_type,
-                'is_read': admin_message.is_read_by_user,
-                'created_at': admin_message.created_at.isoformat(),
-                'sender_type': 'admin',
-                'admin_user': admin_message.admin_user.username,
-                'is_important': admin_message.is_important
-            })
+        chat_room = get_object_or_404(ChatRoom.objects.select_related('user'), id=chat_room_id)
         
-        # ترتيب حسب التاريخ
-        messages_data.sort(key=lambda x: x['created_at'])
+        # الرسائل العادية باستثناء رسائل الإدارة لتجنب التكرار، مع الرسائل الإدارية
+        messages_data = merged_messages(chat_room, non_admin_sender='bot')
         
         return JsonResponse({
             'success': True,
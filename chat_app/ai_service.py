@@ -8,6 +8,53 @@ from django.conf import settings
 from django.utils import timezone
 from requests_app.models import Request, RequestStatus
 from .models import ChatRoom, Message
+from .profiling import profile_message, stage
+
+
+# جداول الكلمات المفتاحية على مستوى الوحدة: تُبنى مرة واحدة بدل كل رسالة،
+# ويستخدمها أيضًا أمر seed_data لتوليد نصوص واقعية
+POSITIVE_WORDS = {
+    'شكرا': 3, 'ممتاز': 3, 'رائع': 3, 'جيد': 2, 'حلو': 2, 'مشكور': 3, 'أشكرك': 3,
+    'ممتازة': 3, 'رائعة': 3, 'جميل': 2, 'حبيت': 2, 'عجبني': 2, 'مشكورة': 3,
+    'أشكركم': 3, 'بارك الله فيكم': 4, 'جزاكم الله خيراً': 4, 'الله يبارك': 3
+}
+
+NEGATIVE_WORDS = {
+    'مشكلة': 2, 'عطل': 2, 'تلف': 2, 'سيء': 3, 'مش راضي': 3, 'مش عاجبني': 3,
+    'غاضب': 4, 'زعلان': 3, 'مضايق': 3, 'مشكلة كبيرة': 4,
+    'مشكلة خطيرة': 4, 'مشكلة مزعجة': 3, 'مشكلة صعبة': 3, 'مشكلة معقدة': 3
+}
+
+URGENT_WORDS = {
+    'عاجل': 4, 'فوري': 4, 'سريع': 3, 'مستعجل': 4, 'ضروري': 3, 'مشكلة عاجلة': 5,
+    'مشكلة فورية': 5, 'مشكلة سريعة': 4, 'مشكلة مستعجلة': 5, 'مشكلة ضرورية': 4,
+    'مشكلة خطيرة': 4, 'مشكلة كبيرة': 3, 'مشكلة مزعجة': 2
+}
+
+LOCATION_KEYWORDS = (
+    'منوف', 'السادات', 'سرس الليان', 'طملاي', 'شبشير', 'برهيم',
+    'جزي', 'غمرين', 'بالمشط', 'كفر السنابسه', 'صنصفط', 'دمليج',
+    'زاوية رزين', 'سدود', 'بهواش', 'كمشوش', 'فيشا', 'هيت',
+    'سروهيت', 'دبركي', 'تتا', 'منشأة سلطان', 'سنجرج', 'شبرا بلوله',
+    'الحامول', 'كفر العامره', 'كفر رماح', 'ميت ربيعه'
+)
+
+SERVICE_KEYWORDS = {
+    'مياه': ('مياه', 'ماء', 'شبكة المياه', 'خط المياه'),
+    'كهرباء': ('كهرباء', 'تيار', 'شبكة الكهرباء', 'خط الكهرباء'),
+    'طرق': ('طرق', 'شوارع', 'رصف', 'إسفلت', 'طريق'),
+    'صرف': ('صرف', 'صرف صحي', 'مجاري', 'شبكة الصرف'),
+    'إنارة': ('إنارة', 'أعمدة', 'أضواء', 'إضاءة'),
+    'نظافة': ('نظافة', 'قمامة', 'نفايات', 'تنظيف'),
+}
+
+PROBLEM_KEYWORDS = {
+    'عطل': ('عطل', 'توقف', 'لا يعمل', 'مش شغال'),
+    'تلف': ('تلف', 'مكسور', 'مشوه', 'متهالك'),
+    'انسداد': ('انسداد', 'مسدود', 'مش بيعدي'),
+    'تسريب': ('تسريب', 'يقطر', 'مش بيقف'),
+    'انقطاع': ('انقطاع', 'مقطوع', 'مش بيوصل'),
+}
 
 
 class AIService:
@@ -22,40 +69,52 @@ class AIService:
         
     def process_message(self, chat_room: ChatRoom, content: str) -> Dict:
         """معالجة الرسالة باستخدام الذكاء الاصطناعي"""
-        user_id = str(chat_room.user.id)
-        
-        # الحصول على تاريخ المحادثة
-        conversation_history = self.get_conversation_history(chat_room)
-        
-        # تحليل الرسالة
-        analysis = self.analyze_message(content, conversation_history)
-        
-        # إنشاء رد ذكي
-        response = self.generate_intelligent_response(
-            chat_room, content, analysis, conversation_history
-        )
-        
-        # حفظ السياق
-        self.update_context(user_id, content, analysis)
-        
+        with profile_message() as profile:
+            user_id = str(chat_room.user.id)
+
+            # الحصول على تاريخ المحادثة
+            with stage('history'):
+                conversation_history = self.get_conversation_history(chat_room)
+
+            # تحليل الرسالة
+            analysis = self.analyze_message(content, conversation_history)
+            profile.intent = analysis['intent']
+
+            # إنشاء رد ذكي
+            response = self.generate_intelligent_response(
+                chat_room, content, analysis, conversation_history
+            )
+
+            # حفظ السياق
+            with stage('update_context'):
+                self.update_context(user_id, content, analysis)
+
+            # تحديث واحد للغرفة لكل رسالة مهما كان عدد ما كتبه الرد
+            ChatRoom.touch(chat_room.id)
+
         return response
     
     def analyze_message(self, content: str, history: List[Dict]) -> Dict:
         """تحليل ذكي للرسالة"""
-        content_lower = content.lower()
-        
+        with stage('normalize'):
+            content_lower = content.lower()
+
         # تحليل المشاعر
-        sentiment = self.analyze_sentiment(content)
-        
+        with stage('sentiment'):
+            sentiment = self.analyze_sentiment(content)
+
         # تحليل النية
-        intent = self.analyze_intent(content, history)
-        
+        with stage('intent'):
+            intent = self.analyze_intent(content, history)
+
         # استخراج الكيانات
-        entities = self.extract_entities(content)
-        
+        with stage('entities'):
+            entities = self.extract_entities(content)
+
         # تحليل الأولوية
-        priority = self.analyze_priority(content, entities)
-        
+        with stage('priority'):
+            priority = self.analyze_priority(content, entities)
+
         return {
             'sentiment': sentiment,
             'intent': intent,
@@ -70,33 +129,12 @@ class AIService:
     
     def analyze_sentiment(self, content: str) -> str:
         """تحليل مشاعر متقدم للرسالة"""
-        # كلمات إيجابية متقدمة
-        positive_words = {
-            'شكرا': 3, 'ممتاز': 3, 'رائع': 3, 'جيد': 2, 'حلو': 2, 'مشكور': 3, 'أشكرك': 3,
-            'ممتازة': 3, 'رائعة': 3, 'جميل': 2, 'حبيت': 2, 'عجبني': 2, 'مشكورة': 3,
-            'أشكركم': 3, 'بارك الله فيكم': 4, 'جزاكم الله خيراً': 4, 'الله يبارك': 3
-        }
-        
-        # كلمات سلبية متقدمة
-        negative_words = {
-            'مشكلة': 2, 'عطل': 2, 'تلف': 2, 'سيء': 3, 'مش راضي': 3, 'مش عاجبني': 3, 
-            'غاضب': 4, 'زعلان': 3, 'مضايق': 3, 'مش راضي': 3, 'مش عاجبني': 3, 'مشكلة كبيرة': 4,
-            'مشكلة خطيرة': 4, 'مشكلة مزعجة': 3, 'مشكلة صعبة': 3, 'مشكلة معقدة': 3
-        }
-        
-        # كلمات عاجلة متقدمة
-        urgent_words = {
-            'عاجل': 4, 'فوري': 4, 'سريع': 3, 'مستعجل': 4, 'ضروري': 3, 'مشكلة عاجلة': 5,
-            'مشكلة فورية': 5, 'مشكلة سريعة': 4, 'مشكلة مستعجلة': 5, 'مشكلة ضرورية': 4,
-            'مشكلة خطيرة': 4, 'مشكلة كبيرة': 3, 'مشكلة مزعجة': 2
-        }
-        
         content_lower = content.lower()
         
         # حساب النقاط
-        positive_score = sum(score for word, score in positive_words.items() if word in content_lower)
-        negative_score = sum(score for word, score in negative_words.items() if word in content_lower)
-        urgent_score = sum(score for word, score in urgent_words.items() if word in content_lower)
+        positive_score = sum(score for word, score in POSITIVE_WORDS.items() if word in content_lower)
+        negative_score = sum(score for word, score in NEGATIVE_WORDS.items() if word in content_lower)
+        urgent_score = sum(score for word, score in URGENT_WORDS.items() if word in content_lower)
         
         # تحليل متقدم
         if urgent_score >= 4:
@@ -162,15 +200,7 @@ class AIService:
         locations = []
         content_lower = content.lower()
         
-        location_keywords = [
-            'منوف', 'السادات', 'سرس الليان', 'طملاي', 'شبشير', 'برهيم',
-            'جزي', 'غمرين', 'بالمشط', 'كفر السنابسه', 'صنصفط', 'دمليج',
-            'زاوية رزين', 'سدود', 'بهواش', 'كمشوش', 'فيشا', 'هيت',
-            'سروهيت', 'دبركي', 'تتا', 'منشأة سلطان', 'سنجرج', 'شبرا بلوله',
-            'الحامول', 'كفر العامره', 'كفر رماح', 'ميت ربيعه'
-        ]
-        
-        for location in location_keywords:
+        for location in LOCATION_KEYWORDS:
             if location in content_lower:
                 locations.append(location)
         
@@ -181,16 +211,7 @@ class AIService:
         services = []
         content_lower = content.lower()
         
-        service_keywords = {
-            'مياه': ['مياه', 'ماء', 'شبكة المياه', 'خط المياه'],
-            'كهرباء': ['كهرباء', 'تيار', 'شبكة الكهرباء', 'خط الكهرباء'],
-            'طرق': ['طرق', 'شوارع', 'رصف', 'إسفلت', 'طريق'],
-            'صرف': ['صرف', 'صرف صحي', 'مجاري', 'شبكة الصرف'],
-            'إنارة': ['إنارة', 'أعمدة', 'أضواء', 'إضاءة'],
-            'نظافة': ['نظافة', 'قمامة', 'نفايات', 'تنظيف'],
-        }
-        
-        for service, keywords in service_keywords.items():
+        for service, keywords in SERVICE_KEYWORDS.items():
             if any(keyword in content_lower for keyword in keywords):
                 services.append(service)
         
@@ -201,15 +222,7 @@ class AIService:
         problems = []
         content_lower = content.lower()
         
-        problem_keywords = {
-            'عطل': ['عطل', 'توقف', 'لا يعمل', 'مش شغال'],
-            'تلف': ['تلف', 'مكسور', 'مشوه', 'متهالك'],
-            'انسداد': ['انسداد', 'مسدود', 'مش بيعدي'],
-            'تسريب': ['تسريب', 'يقطر', 'مش بيقف'],
-            'انقطاع': ['انقطاع', 'مقطوع', 'مش بيوصل'],
-        }
-        
-        for problem, keywords in problem_keywords.items():
+        for problem, keywords in PROBLEM_KEYWORDS.items():
             if any(keyword in content_lower for keyword in keywords):
                 problems.append(problem)
         
@@ -246,25 +259,27 @@ class AIService:
         entities = analysis['entities']
         
         # تحليل السياق المتقدم
-        context_analysis = self.analyze_conversation_context(history, analysis)
-        
-        # إنشاء رد ذكي مع السياق
-        if intent == 'create_request':
-            return self.handle_create_request_advanced(chat_room, content, analysis, entities, context_analysis)
-        elif intent == 'check_status':
-            return self.handle_check_status_advanced(chat_room, analysis, entities, context_analysis)
-        elif intent == 'search_request':
-            return self.handle_search_request_advanced(chat_room, entities, context_analysis)
-        elif intent == 'help':
-            return self.handle_help_request_advanced(analysis, entities, context_analysis)
-        elif intent == 'greeting':
-            return self.handle_greeting_advanced(chat_room, analysis, context_analysis)
-        elif intent == 'thanks':
-            return self.handle_thanks_advanced(analysis, context_analysis)
-        elif intent == 'complaint':
-            return self.handle_complaint_advanced(chat_room, content, analysis, context_analysis)
-        else:
-            return self.handle_general_query_advanced(chat_room, content, analysis, entities, context_analysis)
+        with stage('context'):
+            context_analysis = self.analyze_conversation_context(history, analysis)
+
+        # إنشاء رد ذكي مع السياق (يشمل وقت كتابة الرد وأي طلب مقترح في قاعدة البيانات)
+        with stage('response'):
+            if intent == 'create_request':
+                return self.handle_create_request_advanced(chat_room, content, analysis, entities, context_analysis)
+            elif intent == 'check_status':
+                return self.handle_check_status(chat_room, analysis, entities)
+            elif intent == 'search_request':
+                return self.handle_search_request(chat_room, entities)
+            elif intent == 'help':
+                return self.handle_help_request(analysis, entities)
+            elif intent == 'greeting':
+                return self.handle_greeting_advanced(chat_room, analysis, context_analysis)
+            elif intent == 'thanks':
+                return self.handle_thanks_advanced(analysis, context_analysis)
+            elif intent == 'complaint':
+                return self.handle_complaint_advanced(chat_room, content, analysis, context_analysis)
+            else:
+                return self.handle_general_query_advanced(chat_room, content, analysis, entities, context_analysis)
     
     def analyze_conversation_context(self, history: List[Dict], analysis: Dict) -> Dict:
         """تحليل سياق المحادثة المتقدم"""
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from chat_app.ai_service import AIService
+from chat_app.models import ChatRoom, Message
+from chat_app.profiling import (
+    BUCKETS,
+    ai_profile_captures,
+    ai_profile_summary,
+    reset_ai_profile,
+    sampling,
+)
+
+
+# تُستخدم مع --run إذا لم توجد رسائل مواطنين في قاعدة البيانات
+SAMPLE_MESSAGES = (
+    'السلام عليكم',
+    'عندي مشكلة في شبكة المياه في منوف مش بيوصل',
+    'ما حالة طلباتي؟',
+    'أريد البحث عن رقم التتبع',
+    'محتاج مساعدة في خدمات الكهرباء',
+    'شكرا ليكم ممتاز',
+    'مش راضي عن الخدمة',
+    'متى يتم رصف الطريق في السادات؟ عاجل',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Show per-stage timing histograms for AIService.process_message collected from sampled '
+        'messages (DJANGO_AI_PROFILE_SAMPLE_RATE), stored cProfile captures, or profile a local '
+        'run over recent citizen messages with --run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the collected histograms and captures')
+        parser.add_argument('--histogram', metavar='STAGE', help='Print the bucket histogram of one stage')
+        parser.add_argument('--captures', action='store_true', help='Print stored cProfile captures')
+        parser.add_argument('--run', type=int, metavar='N', help='Process N messages locally, rolled back afterwards')
+        parser.add_argument('--room', help='Chat room id for --run (default: the busiest room)')
+        parser.add_argument('--cprofile', action='store_true', help='With --run, profile the whole run with cProfile')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_ai_profile()
+            self.stdout.write('Profiling data cleared')
+            return
+        if options['run']:
+            self.run(options)
+        if options['captures']:
+            self.print_captures()
+        elif options['histogram']:
+            self.print_histogram(options['histogram'])
+        else:
+            self.print_summary()
+
+    def run(self, options):
+        room = self.room(options['room'])
+        contents = list(
+            Message.objects.filter(message_type='user')
+            .order_by('-created_at')
+            .values_list('content', flat=True)[:options['run']]
+        ) or list(SAMPLE_MESSAGES)
+        messages = [contents[i % len(contents)] for i in range(options['run'])]
+        service = AIService()
+        profiler = cProfile.Profile() if options['cprofile'] else None
+
+        started = time.perf_counter()
+        # الردود والطلبات المقترحة تُكتب فعلًا ثم تُلغى، فتُقاس كتابات قاعدة البيانات كما في الإنتاج
+        with transaction.atomic(), sampling(1.0):
+            if profiler is not None:
+                profiler.enable()
+            for content in messages:
+                service.process_message(room, content)
+            if profiler is not None:
+                profiler.disable()
+            transaction.set_rollback(True)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Processed {len(messages)} messages in {elapsed:.2f}s ({len(messages) / elapsed:.0f} msg/s)\n'
+        )
+        if profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(30)
+            self.stdout.write(stream.getvalue())
+
+    def room(self, room_id):
+        if room_id:
+            room = ChatRoom.objects.select_related('user').filter(pk=room_id).first()
+            if room is None:
+                raise CommandError(f'No chat room {room_id}')
+            return room
+        room = ChatRoom.objects.select_related('user').annotate(n=Count('messages')).order_by('-n').first()
+        if room is None:
+            raise CommandError('No chat rooms; create one or run seed_data first')
+        return room
+
+    def print_summary(self):
+        summary = ai_profile_summary()
+        if not summary['stages']:
+            self.stdout.write('No samples yet: set DJANGO_AI_PROFILE_SAMPLE_RATE or use --run N')
+            return
+        header = f"{'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'share':>8}"
+        for title, rows in (('Stages', summary['stages']), ('By intent (total)', summary['intents'])):
+            self.stdout.write(f'{title}\n{header}')
+            for name, row in rows.items():
+                self.stdout.write(
+                    f"{name:<16}{row['count']:>8}{row['mean_ms']:>8.3f}ms{row['p50_ms']:>8.3f}ms"
+                    f"{row['p95_ms']:>8.3f}ms{row['p99_ms']:>8.3f}ms{row['max_ms']:>8.3f}ms{row['share']:>8.1%}"
+                )
+            self.stdout.write('')
+        self.stdout.write('db_reads/db_writes overlap history and response; share is of summed total time.')
+
+    def print_histogram(self, name):
+        row = ai_profile_summary()['stages'].get(name)
+        if row is None:
+            raise CommandError(f'No samples for stage {name!r}')
+        peak = max(row['histogram'].values())
+        for bucket in [f'<={bound}' for bound in BUCKETS] + [f'>{BUCKETS[-1]}']:
+            count = row['histogram'].get(bucket, 0)
+            self.stdout.write(f"{bucket + 'ms':>10} {count:>8} {'#' * round(40 * count / peak)}")
+
+    def print_captures(self):
+        captures = ai_profile_captures()
+        if not captures:
+            self.stdout.write('No captures: set DJANGO_AI_PROFILE_CPROFILE_RATE to capture sampled messages')
+        for capture in captures:
+            self.stdout.write(
+                f"--- {capture['at']} intent={capture['intent']} total={capture['total_ms']}ms "
+                f"queries={capture['queries']}\n{capture['stats']}"
+            )
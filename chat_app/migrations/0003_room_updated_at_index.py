@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat_app', '0002_adminmessage_chatnotification'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatnotification',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='تاريخ الإنشاء'),
+        ),
+        migrations.AlterField(
+            model_name='chatroom',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='تاريخ التحديث'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from requests_app.models import Request
 
 User = get_user_model()
@@ -19,7 +20,8 @@ class ChatRoom(models.Model):
     )
     is_active = models.BooleanField(default=True, verbose_name="نشط")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
-    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+    # يُحدَّث مرة واحدة لكل عرض يكتب في الغرفة؛ مفهرس لأنه مُحقِّق قائمة الغرف وترتيبها
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="تاريخ التحديث")
 
     class Meta:
         verbose_name = "غرفة الدردشة"
@@ -28,6 +30,11 @@ class ChatRoom(models.Model):
     def __str__(self):
         return f"دردشة {self.user.username}"
 
+    @classmethod
+    def touch(cls, chat_room_id):
+        """تحديث updated_at للغرفة ليكون مُحقِّقاً (validator) رخيصاً لطلبات الاستطلاع"""
+        cls.objects.filter(pk=chat_room_id).update(updated_at=timezone.now())
+
 
 class Message(models.Model):
     """رسالة في الدردشة"""
@@ -199,7 +206,7 @@ class ChatNotification(models.Model):
     )
     is_read = models.BooleanField(default=False, verbose_name="تم القراءة")
     priority = models.IntegerField(default=1, verbose_name="الأولوية")  # 1-10
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="تاريخ الإنشاء")
 
     class Meta:
         verbose_name = "إشعار دردشة"
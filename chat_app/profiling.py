@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import random
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+
+# حدود أعمدة المدرج بالمللي ثانية (لوغاريتمية)، وعمود أخير لما يتجاوز آخر حد
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+# ترتيب العرض؛ db_reads/db_writes متداخلة مع history وresponse وليست مراحل منفصلة
+STAGES = (
+    'normalize', 'history', 'sentiment', 'intent', 'entities', 'priority',
+    'context', 'response', 'update_context', 'db_reads', 'db_writes', 'total',
+)
+HISTOGRAMS_KEY = 'ai_profile:histograms'
+CAPTURES_KEY = 'ai_profile:captures'
+MAX_CAPTURES = 10
+CAPTURE_LINES = 40
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'SAVEPOINT', 'RELEASE')
+
+_current: ContextVar[MessageProfile | None] = ContextVar('ai_profile', default=None)
+# (نسبة العينات، نسبة cProfile) تتجاوز الإعدادات داخل sampling()
+_override: ContextVar[tuple[float, float] | None] = ContextVar('ai_profile_override', default=None)
+_NOOP = nullcontext()
+
+
+@dataclass
+class MessageProfile:
+    timings: dict[str, float] = field(default_factory=dict)
+    intent: str = ''
+    queries: int = 0
+
+    def add(self, name: str, ms: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+
+
+class _Timer:
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile: MessageProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def stage(name: str):
+    """قياس مرحلة من معالجة الرسالة؛ خارج الرسائل المُعاينة يعيد سياقًا فارغًا مشتركًا بلا تكلفة تُذكر"""
+    profile = _current.get()
+    return _NOOP if profile is None else _Timer(profile, name)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if profile is not None:
+            name = 'db_writes' if sql.lstrip().upper().startswith(WRITE_PREFIXES) else 'db_reads'
+            profile.add(name, (time.perf_counter() - started) * 1000)
+            profile.queries += 1
+
+
+@contextmanager
+def sampling(rate: float = 1.0, capture_rate: float = 0.0):
+    """تجاوز AI_PROFILE_SAMPLE_RATE وAI_PROFILE_CPROFILE_RATE مؤقتًا (أمر ai_profile والاختبارات)"""
+    token = _override.set((rate, capture_rate))
+    try:
+        yield
+    finally:
+        _override.reset(token)
+
+
+@contextmanager
+def profile_message():
+    """
+    يغلّف معالجة رسالة واحدة: نسبة AI_PROFILE_SAMPLE_RATE من الرسائل تُقاس مراحلها واستعلاماتها،
+    ونسبة AI_PROFILE_CPROFILE_RATE من المُعاينة تُسجَّل تحت cProfile.
+    """
+    rate, capture_rate = _override.get() or (settings.AI_PROFILE_SAMPLE_RATE, settings.AI_PROFILE_CPROFILE_RATE)
+    # رسالة غير مُعاينة أو متداخلة داخل رسالة مُعاينة: لا قياس إضافي
+    if _current.get() is not None or not rate or random.random() >= rate:
+        yield MessageProfile()
+        return
+
+    profile = MessageProfile()
+    token = _current.set(profile)
+    wrappers = [connection.execute_wrapper(_record_query) for connection in connections.all()]
+    profiler = cProfile.Profile() if capture_rate and random.random() < capture_rate else None
+    started = time.perf_counter()
+    try:
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # مُحلِّل آخر يعمل بالفعل في هذا الخيط
+                profiler = None
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+        _current.reset(token)
+    profile.timings['total'] = (time.perf_counter() - started) * 1000
+    _store(profile)
+    if profiler is not None:
+        _store_capture(profile, profiler)
+
+
+def _empty_histogram() -> dict:
+    return {'buckets': [0] * (len(BUCKETS) + 1), 'count': 0, 'sum': 0.0, 'max': 0.0}
+
+
+def _add(histogram: dict, ms: float) -> None:
+    histogram['buckets'][bisect_left(BUCKETS, ms)] += 1
+    histogram['count'] += 1
+    histogram['sum'] += ms
+    histogram['max'] = max(histogram['max'], ms)
+
+
+def _store(profile: MessageProfile) -> None:
+    # قراءة ثم كتابة غير ذرية كما في website.instrumentation: قد تضيع عينة تحت الضغط
+    histograms = cache.get(HISTOGRAMS_KEY) or {'stages': {}, 'intents': {}}
+    for name, ms in profile.timings.items():
+        _add(histograms['stages'].setdefault(name, _empty_histogram()), ms)
+    _add(histograms['intents'].setdefault(profile.intent or 'unknown', _empty_histogram()), profile.timings['total'])
+    cache.set(HISTOGRAMS_KEY, histograms, None)
+
+
+def _store_capture(profile: MessageProfile, profiler: cProfile.Profile) -> None:
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(CAPTURE_LINES)
+    captures = cache.get(CAPTURES_KEY) or []
+    captures.append({
+        'at': timezone.now().isoformat(),
+        'intent': profile.intent,
+        'total_ms': round(profile.timings['total'], 2),
+        'queries': profile.queries,
+        'stats': stream.getvalue(),
+    })
+    cache.set(CAPTURES_KEY, captures[-MAX_CAPTURES:], None)
+
+
+def histogram_percentile(histogram: dict, q: float) -> float:
+    """تقدير المئين q بالاستيفاء الخطي داخل العمود الذي يقع فيه (مثل histogram_quantile في Prometheus)"""
+    target = q * histogram['count']
+    seen, lower = 0, 0.0
+    for bound, count in zip(BUCKETS + (None,), histogram['buckets']):
+        upper = histogram['max'] if bound is None else min(bound, histogram['max'])
+        if count and seen + count >= target:
+            return round(lower + (upper - lower) * (target - seen) / count, 3)
+        seen += count
+        lower = upper if bound is None else bound
+    return 0.0
+
+
+def _summarize(histogram: dict, total_sum: float) -> dict:
+    count = histogram['count']
+    return {
+        'count': count,
+        'mean_ms': round(histogram['sum'] / count, 3) if count else 0.0,
+        'p50_ms': histogram_percentile(histogram, 0.5),
+        'p95_ms': histogram_percentile(histogram, 0.95),
+        'p99_ms': histogram_percentile(histogram, 0.99),
+        'max_ms': round(histogram['max'], 3),
+        'share': round(histogram['sum'] / total_sum, 3) if total_sum else 0.0,
+        'histogram': {
+            f'<={bound}' if bound is not None else f'>{BUCKETS[-1]}': n
+            for bound, n in zip(BUCKETS + (None,), histogram['buckets'])
+            if n
+        },
+    }
+
+
+def ai_profile_summary() -> dict:
+    """المراحل بترتيب المعالجة مع نصيب كل منها من الزمن الكلي، والزمن الكلي حسب نية الرسالة"""
+    histograms = cache.get(HISTOGRAMS_KEY) or {'stages': {}, 'intents': {}}
+    stages, intents = histograms['stages'], histograms['intents']
+    total_sum = stages.get('total', {}).get('sum', 0.0)
+    order = {name: i for i, name in enumerate(STAGES)}
+    return {
+        'stages': {
+            name: _summarize(stages[name], total_sum)
+            for name in sorted(stages, key=lambda name: order.get(name, len(order)))
+        },
+        'intents': {
+            name: _summarize(histogram, total_sum)
+            for name, histogram in sorted(intents.items(), key=lambda item: item[1]['sum'], reverse=True)
+        },
+    }
+
+
+def ai_profile_captures() -> list[dict]:
+    return cache.get(CAPTURES_KEY) or []
+
+
+def reset_ai_profile() -> None:
+    cache.delete_many([HISTOGRAMS_KEY, CAPTURES_KEY])
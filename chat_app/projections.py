@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from website.projections import Projection
+
+from .models import AdminMessage, ChatNotification, Message
+
+
+MESSAGE_ROW = Projection(
+    Message,
+    ('id', 'content', 'created_at', 'message_type', 'is_read'),
+)
+
+ADMIN_MESSAGE_ROW = Projection(
+    AdminMessage,
+    (
+        'id',
+        'content',
+        'created_at',
+        'message_type',
+        ('is_read', 'is_read_by_user'),
+        ('admin_user', 'admin_user__username'),
+        'is_important',
+    ),
+)
+
+
+def _preview(content: str) -> str:
+    return content[:100] + '...' if len(content) > 100 else content
+
+
+NOTIFICATION_ROW = Projection(
+    ChatNotification,
+    (
+        'id',
+        ('chat_room_id', 'chat_room'),
+        ('chat_room_user', 'chat_room__user__username'),
+        ('message_id', 'message'),
+        ('message_content', 'message__content'),
+        ('message_type', 'message__message_type'),
+        'notification_type',
+        'priority',
+        'is_read',
+        'created_at',
+    ),
+    encoders={'message_content': _preview},
+)
+
+
+def merged_messages(chat_room, non_admin_sender: str) -> list[dict]:
+    """رسائل الغرفة (باستثناء رسائل الإدارة المكررة) مع الرسائل الإدارية مرتبة بالتاريخ"""
+    messages_data = []
+    for row in MESSAGE_ROW.rows(chat_room.messages.exclude(message_type='admin').order_by('created_at')):
+        row['sender_type'] = 'user' if row['message_type'] == 'user' else non_admin_sender
+        messages_data.append(row)
+    for row in ADMIN_MESSAGE_ROW.rows(chat_room.admin_messages.order_by('created_at')):
+        row['sender_type'] = 'admin'
+        messages_data.append(row)
+    messages_data.sort(key=lambda x: x['created_at'])
+    return messages_data
@@ -1,3 +1,241 @@
-from django.test import TestCase
+from __future__ import annotations
 
-# Create your tests here.
+import json
+
+from django.urls import reverse
+
+from website.testing import QueryBudgetTestCase
+
+from .ai_service import AIService
+from .models import ChatNotification, Message
+from .profiling import ai_profile_captures, ai_profile_summary, histogram_percentile, sampling
+
+
+class ChatUserViewsTests(QueryBudgetTestCase):
+    """صفحة الدردشة واستعلامات المواطن الدورية"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.seed.citizen)
+
+    def test_chat_view(self):
+        with self.assertQueryBudget(5):
+            response = self.client.get(reverse('chat:chat'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_messages(self):
+        with self.assertQueryBudget(6):
+            response = self.client.get(reverse('chat:get_messages'))
+        self.assertEqual(response.status_code, 200)
+        # رسائل الإدارة من جدول Message مستبعدة لأنها مكررة في AdminMessage
+        volume = self.volume
+        expected = volume.messages_per_room - volume.messages_per_room // 4 + volume.admin_messages_per_room
+        self.assertEqual(len(response.json()['messages']), expected)
+
+    def test_get_messages_not_modified(self):
+        etag = self.client.get(reverse('chat:get_messages'))['ETag']
+        with self.assertQueryBudget(3):
+            response = self.client.get(reverse('chat:get_messages'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_send_message_changes_etag(self):
+        etag = self.client.get(reverse('chat:get_messages'))['ETag']
+        self.client.post(
+            reverse('chat:send_message'),
+            data=json.dumps({'content': 'رسالة جديدة'}),
+            content_type='application/json',
+        )
+        response = self.client.get(reverse('chat:get_messages'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_user_stats(self):
+        with self.assertQueryBudget(6):
+            response = self.client.get(reverse('chat:get_user_stats'))
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['stats']
+        self.assertEqual(stats['total_requests'], self.volume.requests_per_citizen)
+        self.assertEqual(
+            stats['completed_requests'] + stats['pending_requests'] + stats['in_progress_requests'],
+            self.volume.requests_per_citizen,
+        )
+        self.assertEqual(stats['total_messages'], self.volume.messages_per_room)
+
+    def test_send_message(self):
+        with self.assertQueryBudget(8):
+            response = self.client.post(
+                reverse('chat:send_message'),
+                data=json.dumps({'content': 'أريد الاستفسار عن طلبي'}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+class ChatAdminViewsTests(QueryBudgetTestCase):
+    """لوحة دردشة الإدارة وواجهاتها؛ عدد الاستعلامات لا يتغير مع عدد الغرف أو الرسائل"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.seed.staff)
+
+    def test_admin_chat_dashboard(self):
+        with self.assertQueryBudget(10):
+            response = self.client.get(reverse('chat:admin_dashboard'), HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_chat_room(self):
+        # +1: قراءة الإشعارات تحدّث الغرفة
+        with self.assertQueryBudget(7):
+            response = self.client.get(
+                reverse('chat:admin_chat_room', args=[self.seed.room.id]), HTTP_ACCEPT='text/html'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ChatNotification.objects.filter(chat_room=self.seed.room, is_read=False).exists())
+
+    def test_send_admin_message(self):
+        with self.assertQueryBudget(9):
+            response = self.client.post(
+                reverse('chat:admin_send_message'),
+                data=json.dumps({'chat_room_id': str(self.seed.room.id), 'content': 'تم استلام طلبك'}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_chat_rooms(self):
+        with self.assertQueryBudget(10):
+            response = self.client.get(reverse('chat:admin_get_chat_rooms'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['chat_rooms']), 20)
+        self.assertEqual(data['pagination']['total_count'], self.volume.rooms)
+
+    def test_get_chat_rooms_counts(self):
+        room = self.seed.room
+        response = self.client.get(reverse('chat:admin_get_chat_rooms'), {'search': room.user.username})
+        entry = next(r for r in response.json()['chat_rooms'] if r['id'] == str(room.id))
+        self.assertEqual(entry['message_count'], self.volume.messages_per_room)
+        self.assertEqual(entry['unread_count'], self.volume.messages_per_room - self.volume.messages_per_room // 2)
+        self.assertEqual(entry['admin_message_count'], self.volume.admin_messages_per_room)
+        self.assertEqual(
+            entry['notification_count'], ChatNotification.objects.filter(chat_room=room, is_read=False).count()
+        )
+        latest = room.messages.order_by('-created_at').first().created_at
+        self.assertIn(entry['last_message']['content'], set(room.messages.filter(created_at=latest).values_list('content', flat=True)))
+
+    def test_get_chat_rooms_etag(self):
+        url = reverse('chat:admin_get_chat_rooms')
+        etag = self.client.get(url)['ETag']
+        with self.assertQueryBudget(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # قراءة إشعار تغيّر عدد غير المقروء في القائمة
+        notification = ChatNotification.objects.filter(is_read=False).first()
+        self.client.post(
+            reverse('chat:admin_mark_notification_read'),
+            data=json.dumps({'notification_id': str(notification.id)}),
+            content_type='application/json',
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_message_save_does_not_touch_room(self):
+        # الغرفة تُحدَّث مرة واحدة في العرض وليس مع كل رسالة (الزرع والردود الآلية)
+        with self.assertNumQueries(1):
+            Message.objects.create(chat_room=self.seed.room, message_type='bot', content='رد')
+
+    def test_get_chat_rooms_filtered(self):
+        with self.assertQueryBudget(10):
+            response = self.client.get(
+                reverse('chat:admin_get_chat_rooms'), {'priority': 8, 'search': 'citizen', 'status': 'active'}
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_notifications(self):
+        with self.assertQueryBudget(4):
+            response = self.client.get(reverse('chat:admin_get_notifications'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['notifications']), 50)
+
+    def test_mark_notification_read(self):
+        notification = ChatNotification.objects.filter(is_read=False).first()
+        with self.assertQueryBudget(5):
+            response = self.client.post(
+                reverse('chat:admin_mark_notification_read'),
+                data=json.dumps({'notification_id': str(notification.id)}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_read)
+
+    def test_get_chat_messages(self):
+        with self.assertQueryBudget(6):
+            response = self.client.get(reverse('chat:admin_get_chat_messages', args=[self.seed.room.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['chat_room']['user']['username'], self.seed.room.user.username)
+
+    def test_admin_api_requires_staff(self):
+        self.client.force_login(self.seed.citizen)
+        with self.assertQueryBudget(2):
+            response = self.client.get(reverse('chat:admin_get_chat_rooms'))
+        self.assertEqual(response.status_code, 403)
+
+
+class AIServiceTests(QueryBudgetTestCase):
+    """توجيه كل نية إلى معالج موجود"""
+
+    def test_every_intent_has_a_handler(self):
+        messages = {
+            'check_status': 'متابعة الحالة',
+            'search_request': 'أريد البحث برقم',
+            'help': 'محتاج مساعدة',
+            'greeting': 'مرحبا',
+            'thanks': 'شكرا',
+            'complaint': 'مش راضي',
+            'general': 'كلام عام',
+        }
+        service = AIService()
+        for intent, content in messages.items():
+            self.assertEqual(service.analyze_intent(content, []), intent)
+            self.assertEqual(service.process_message(self.seed.room, content)['message_type'], 'bot', intent)
+
+
+class AIProfilingTests(QueryBudgetTestCase):
+    """قياس مراحل AIService.process_message"""
+
+    def test_unsampled_messages_record_nothing(self):
+        AIService().process_message(self.seed.room, 'عندي مشكلة في المياه')
+        self.assertEqual(ai_profile_summary()['stages'], {})
+
+    def test_sampled_message_records_every_stage(self):
+        with sampling(1.0):
+            response = AIService().process_message(self.seed.room, 'عندي مشكلة في شبكة المياه في منوف')
+        self.assertTrue(response['show_approval_buttons'])
+        summary = ai_profile_summary()
+        for name in ('normalize', 'history', 'sentiment', 'intent', 'entities', 'priority',
+                     'context', 'response', 'update_context', 'db_reads', 'db_writes', 'total'):
+            self.assertEqual(summary['stages'][name]['count'], 1, name)
+        self.assertEqual(list(summary['intents']), ['create_request'])
+        self.assertEqual(summary['stages']['total']['share'], 1.0)
+
+    def test_intents_are_recorded(self):
+        with sampling(1.0):
+            for content in ('متابعة الحالة', 'مرحبا', 'شكرا'):
+                AIService().process_message(self.seed.room, content)
+        self.assertEqual(set(ai_profile_summary()['intents']), {'check_status', 'greeting', 'thanks'})
+
+    def test_cprofile_capture(self):
+        with sampling(1.0, capture_rate=1.0):
+            AIService().process_message(self.seed.room, 'مرحبا')
+        captures = ai_profile_captures()
+        self.assertEqual(len(captures), 1)
+        self.assertEqual(captures[0]['intent'], 'greeting')
+        self.assertIn('generate_intelligent_response', captures[0]['stats'])
+
+    def test_histogram_percentile(self):
+        # 10 قيم في عمود (0.5, 1] و10 في (1, 2.5]
+        histogram = {'buckets': [0] * 17, 'count': 20, 'sum': 25.0, 'max': 2.0}
+        histogram['buckets'][6] = 10
+        histogram['buckets'][7] = 10
+        self.assertEqual(histogram_percentile(histogram, 0.5), 1.0)
+        self.assertEqual(histogram_percentile(histogram, 0.25), 0.75)
+        self.assertEqual(histogram_percentile(histogram, 1.0), 2.0)
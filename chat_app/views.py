@@ -4,11 +4,18 @@ import json
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpRequest, HttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from users.models import User
+from website.conditional import hashed_etag
+from website.db_router import replica_reads
 
 from .models import ChatRoom, Message, ChatRequest, AdminMessage, ChatNotification
+from .projections import merged_messages
 from requests_app.models import Request, RequestStatus
 
 
@@ -57,20 +64,25 @@ def send_message(request: HttpRequest) -> JsonResponse:
         # الحصول على غرفة الدردشة
         chat_room = get_object_or_404(ChatRoom, user=request.user)
         
-        # حفظ رسالة المستخدم
-        user_message = Message.objects.create(
-            chat_room=chat_room,
-            message_type='user',
-            content=content
-        )
-        
-        # إنشاء إشعار للإدارة
-        ChatNotification.objects.create(
-            chat_room=chat_room,
-            message=user_message,
-            notification_type='new_message',
-            priority=1
-        )
+        # الرسالة والإشعار وتحديث الغرفة في معاملة قصيرة واحدة (commit واحد بدل ثلاثة)
+        with transaction.atomic():
+            # حفظ رسالة المستخدم
+            user_message = Message.objects.create(
+                chat_room=chat_room,
+                message_type='user',
+                content=content
+            )
+
+            # إنشاء إشعار للإدارة
+            ChatNotification.objects.create(
+                chat_room=chat_room,
+                message=user_message,
+                notification_type='new_message',
+                priority=1
+            )
+
+            # auto_now: مُحقِّق الاستطلاع يتغير مرة واحدة للطلب
+            chat_room.save(update_fields=['updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -86,43 +98,23 @@ def send_message(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _messages_etag(request: HttpRequest):
+    updated_at = ChatRoom.objects.filter(user=request.user).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return hashed_etag(request, updated_at.isoformat())
+
+
+@replica_reads
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_messages_etag)
 def get_messages(request: HttpRequest) -> JsonResponse:
     """الحصول على الرسائل"""
     try:
         chat_room = get_object_or_404(ChatRoom, user=request.user)
         # استبعاد رسائل الإدارة من جدول Message لتجنب الازدواج مع AdminMessage
-        messages = chat_room.messages.exclude(message_type='admin').order_by('created_at')
-        admin_messages = chat_room.admin_messages.all().order_by('created_at')
-        
-        messages_data = []
-        
-        # إضافة الرسائل العادية
-        for message in messages:
-            messages_data.append({
-                'id': str(message.id),
-                'content': message.content,
-                'created_at': message.created_at.isoformat(),
-                'message_type': message.message_type,
-                'is_read': message.is_read,
-                'sender_type': 'user' if message.message_type == 'user' else 'system'
-            })
-        
-        # إضافة الرسائل الإدارية
-        for admin_message in admin_messages:
-            messages_data.append({
-                'id': str(admin_message.id),
-                'content': admin_message.content,
-                'created_at': admin_message.created_at.isoformat(),
-                'message_type': admin_message.message_type,
-                'is_read': admin_message.is_read_by_user,
-                'sender_type': 'admin',
-                'admin_user': admin_message.admin_user.username,
-                'is_important': admin_message.is_important
-            })
-        
-        # ترتيب حسب التاريخ
-        messages_data.sort(key=lambda x: x['created_at'])
+        messages_data = merged_messages(chat_room, non_admin_sender='system')
         
         return JsonResponse({
             'success': True,
@@ -133,33 +125,40 @@ def get_messages(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _user_stats_etag(request: HttpRequest):
+    # استعلام واحد صغير: عدد الطلبات وآخر تحديث لها وآخر نشاط في غرفة الدردشة
+    validators = User.objects.filter(pk=request.user.pk).aggregate(
+        requests_count=Count('requests'),
+        requests_updated=Max('requests__updated_at'),
+        room_updated=Max('chat_room__updated_at'),
+    )
+    return hashed_etag(request, *validators.values())
+
+
+@replica_reads
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_user_stats_etag)
 def get_user_stats(request: HttpRequest) -> JsonResponse:
     """الحصول على إحصائيات المستخدم"""
     try:
-        # إحصائيات الطلبات
-        total_requests = Request.objects.filter(user=request.user).count()
-        completed_requests = Request.objects.filter(
-            user=request.user, 
-            status__name="مكتمل"
-        ).count()
-        pending_requests = Request.objects.filter(
-            user=request.user, 
-            status__name="قيد المراجعة"
-        ).count()
-        in_progress_requests = Request.objects.filter(
-            user=request.user, 
-            status__name="قيد التنفيذ"
-        ).count()
+        # إحصائيات الطلبات في استعلام واحد
+        request_stats = Request.objects.filter(user=request.user).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status__name="مكتمل")),
+            pending=Count('id', filter=Q(status__name="قيد المراجعة")),
+            in_progress=Count('id', filter=Q(status__name="قيد التنفيذ")),
+        )
+        total_requests = request_stats['total']
+        completed_requests = request_stats['completed']
+        pending_requests = request_stats['pending']
+        in_progress_requests = request_stats['in_progress']
         
         # إحصائيات الدردشة
-        chat_room = ChatRoom.objects.filter(user=request.user).first()
-        total_messages = 0
-        if chat_room:
-            total_messages = chat_room.messages.count()
+        total_messages = Message.objects.filter(chat_room__user=request.user).count()
         
         # آخر طلب
-        last_request = Request.objects.filter(user=request.user).order_by('-created_at').first()
+        last_request = Request.objects.filter(user=request.user).select_related('status').order_by('-created_at').first()
         last_request_data = None
         if last_request:
             last_request_data = {
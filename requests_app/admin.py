@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 
 from .models import Request, RequestAttachment, RequestStatus
+from .search import search_requests
 
 
 @admin.register(RequestStatus)
@@ -34,9 +36,11 @@ class RequestAdmin(admin.ModelAdmin):
     list_display = ("tracking_number", "title", "user", "full_name", "status", "status_display", "created_at", "updated_at")
     list_display_links = ("tracking_number", "title")
     list_filter = ("status", "created_at", "updated_at", "user")
-    search_fields = ("title", "tracking_number", "full_name", "phone", "user__username", "user__email")
+    # العنوان والوصف ورقم التتبع والهاتف يغطيها search_requests؛ هنا حقول الشخص فقط
+    search_fields = ("full_name", "=user__username", "=user__email")
     readonly_fields = ("tracking_number", "created_at", "updated_at")
     date_hierarchy = "created_at"
+    show_full_result_count = False
     
     fieldsets = (
         ("معلومات الطلب", {
@@ -63,35 +67,42 @@ class RequestAdmin(admin.ModelAdmin):
         return obj.status.name if obj.status else "غير محدد"
     status_display.short_description = "عرض الحالة"
     
+    def get_search_results(self, request, queryset, search_term):
+        # البحث باسم المواطن أو اسم المستخدم أو البريد، أو بالبحث المفهرس المشترك مع واجهة API
+        by_person, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term.strip():
+            return by_person, may_have_duplicates
+        return by_person | search_requests(queryset, search_term), may_have_duplicates
+    
     actions = ["mark_as_received", "mark_as_reviewing", "mark_as_in_progress", "mark_as_completed", "mark_as_rejected"]
     
     def mark_as_received(self, request, queryset):
         status = RequestStatus.objects.get(name="تم استلام الطلب")
-        updated = queryset.update(status=status)
+        updated = queryset.update(status=status, updated_at=timezone.now())
         self.message_user(request, f"تم تحديث {updated} طلب إلى حالة 'تم استلام الطلب'")
     mark_as_received.short_description = "تحديث إلى: تم استلام الطلب"
     
     def mark_as_reviewing(self, request, queryset):
         status = RequestStatus.objects.get(name="قيد المراجعة")
-        updated = queryset.update(status=status)
+        updated = queryset.update(status=status, updated_at=timezone.now())
         self.message_user(request, f"تم تحديث {updated} طلب إلى حالة 'قيد المراجعة'")
     mark_as_reviewing.short_description = "تحديث إلى: قيد المراجعة"
     
     def mark_as_in_progress(self, request, queryset):
         status = RequestStatus.objects.get(name="قيد التنفيذ")
-        updated = queryset.update(status=status)
+        updated = queryset.update(status=status, updated_at=timezone.now())
         self.message_user(request, f"تم تحديث {updated} طلب إلى حالة 'قيد التنفيذ'")
     mark_as_in_progress.short_description = "تحديث إلى: قيد التنفيذ"
     
     def mark_as_completed(self, request, queryset):
         status = RequestStatus.objects.get(name="مكتمل")
-        updated = queryset.update(status=status)
+        updated = queryset.update(status=status, updated_at=timezone.now())
         self.message_user(request, f"تم تحديث {updated} طلب إلى حالة 'مكتمل'")
     mark_as_completed.short_description = "تحديث إلى: مكتمل"
     
     def mark_as_rejected(self, request, queryset):
         status = RequestStatus.objects.get(name="مرفوض")
-        updated = queryset.update(status=status)
+        updated = queryset.update(status=status, updated_at=timezone.now())
         self.message_user(request, f"تم تحديث {updated} طلب إلى حالة 'مرفوض'")
     mark_as_rejected.short_description = "تحديث إلى: مرفوض"
 
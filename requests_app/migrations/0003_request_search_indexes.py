@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def add_fulltext_index(apps, schema_editor):
+    # فهرس FULLTEXT مدعوم فقط على MySQL؛ باقي القواعد تعتمد على البحث بالكلمات
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'CREATE FULLTEXT INDEX request_title_desc_ft ON requests_app_request (title, description)'
+    )
+
+
+def remove_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('DROP INDEX request_title_desc_ft ON requests_app_request')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests_app', '0002_requeststatus_color_requeststatus_description'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['created_at'], name='request_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status', 'created_at'], name='request_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['user', 'created_at'], name='request_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['phone'], name='request_phone_idx'),
+        ),
+        migrations.RunPython(add_fulltext_index, remove_fulltext_index),
+    ]
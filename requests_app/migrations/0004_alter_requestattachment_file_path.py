@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:16
+
+import blobstore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests_app', '0003_request_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestattachment',
+            name='file_path',
+            field=models.FileField(storage=blobstore.storage.get_blob_storage, upload_to='request_attachments/%Y/%m/%d/', verbose_name='الملف المرفق'),
+        ),
+    ]
@@ -4,8 +4,13 @@ import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from blobstore.storage import get_blob_storage
+
 User = get_user_model()
 
+# الحالات التي تُنشأ بعد migrate ويعتمد عليها الكود بأسمائها (الإحصائيات وردود البوت)
+DEFAULT_STATUSES = ("قيد المراجعة", "قيد التنفيذ", "مكتمل", "مرفوض")
+
 
 class RequestStatus(models.Model):
     name = models.CharField(max_length=100, verbose_name="اسم الحالة")
@@ -53,6 +58,12 @@ class Request(models.Model):
         verbose_name = "طلب"
         verbose_name_plural = "الطلبات"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="request_created_idx"),
+            models.Index(fields=["status", "created_at"], name="request_status_created_idx"),
+            models.Index(fields=["user", "created_at"], name="request_user_created_idx"),
+            models.Index(fields=["phone"], name="request_phone_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.tracking_number}"
@@ -72,6 +83,7 @@ class RequestAttachment(models.Model):
     )
     file_path = models.FileField(
         upload_to="request_attachments/%Y/%m/%d/",
+        storage=get_blob_storage,
         verbose_name="الملف المرفق"
     )
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الرفع")
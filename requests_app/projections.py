@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from website.projections import Projection
+
+from .models import Request, RequestAttachment
+
+
+# نفس شكل RequestSerializer، بما في ذلك تمثيل DRF للتاريخ بالمنطقة الزمنية الحالية
+REQUEST_ROW = Projection(
+	Request,
+	(
+		"id",
+		"user",
+		"full_name",
+		"phone",
+		"address",
+		"title",
+		"description",
+		"status",
+		("status_name", "status__name"),
+		"tracking_number",
+		"created_at",
+	),
+	encoders={"created_at": serializers.DateTimeField().to_representation},
+)
+
+ATTACHMENT_ROW = Projection(RequestAttachment, ("id", "request_id", "file_path"))
+
+
+def attach_attachments(rows: list[dict], http_request=None) -> list[dict]:
+	"""إضافة المرفقات لكل صف باستعلام واحد بدلاً من استعلام لكل طلب"""
+	by_request: dict[int, list[dict]] = defaultdict(list)
+	if rows:
+		attachments = RequestAttachment.objects.filter(request_id__in=[row["id"] for row in rows])
+		for attachment in ATTACHMENT_ROW.rows(attachments):
+			name = attachment["file_path"]
+			url = None
+			if name:
+				url = default_storage.url(name)
+				if http_request is not None:
+					url = http_request.build_absolute_uri(url)
+			by_request[attachment["request_id"]].append({"id": attachment["id"], "file_path": url})
+	for row in rows:
+		row["attachments"] = by_request.get(row["id"], [])
+	return rows
+
+
+def request_rows(rows, http_request=None) -> list[dict]:
+	return attach_attachments(REQUEST_ROW.encode_many(rows), http_request)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.db import connections
+from django.db.models import FloatField, Func, Q, QuerySet
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+
+# أرقام التتبع تُولد من أول 8 أحرف من UUID بأحرف كبيرة
+TRACKING_NUMBER_RE = re.compile(r"^[0-9A-Fa-f-]{4,50}$")
+PHONE_RE = re.compile(r"^\+?\d{3,20}$")
+
+# محارف لها معنى خاص في وضع BOOLEAN MODE في MySQL
+_BOOLEAN_MODE_CHARS = re.compile(r'[+\-<>()~*"@]')
+
+
+class MatchAgainst(Func):
+	"""MATCH (...) AGAINST (... IN BOOLEAN MODE) على MySQL مع فهرس FULLTEXT"""
+
+	output_field = FloatField()
+
+	def __init__(self, query: str, *expressions, **extra):
+		self.query = query
+		super().__init__(*expressions, **extra)
+
+	def as_sql(self, compiler, connection, **extra_context):
+		raise NotImplementedError("MatchAgainst is only supported on MySQL")
+
+	def as_mysql(self, compiler, connection, **extra_context):
+		columns, params = [], []
+		for expression in self.get_source_expressions():
+			sql, expression_params = compiler.compile(expression)
+			columns.append(sql)
+			params.extend(expression_params)
+		return f"MATCH ({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)", (*params, self.query)
+
+
+def _terms(text: str) -> list[str]:
+	return [t for t in _BOOLEAN_MODE_CHARS.sub(" ", text).split() if t]
+
+
+def full_text_q(text: str, using: str = "default") -> Q:
+	"""شرط البحث النصي في العنوان والوصف
+
+	على MySQL يستخدم فهرس FULLTEXT المركب (title, description)، وعلى باقي
+	قواعد البيانات يطابق كل كلمة في العنوان أو الوصف.
+	"""
+	terms = _terms(text)
+	if not terms:
+		return Q()
+	if connections[using].vendor == "mysql":
+		query = " ".join(f"+{term}*" for term in terms)
+		return Q(GreaterThan(MatchAgainst(query, "title", "description"), 0))
+	condition = Q()
+	for term in terms:
+		condition &= Q(title__icontains=term) | Q(description__icontains=term)
+	return condition
+
+
+def search_requests(queryset: QuerySet, text: str) -> QuerySet:
+	"""البحث الحر المشترك بين لوحة الإدارة وواجهة API"""
+	text = (text or "").strip()
+	if not text:
+		return queryset
+	condition = full_text_q(text, queryset.db)
+	if TRACKING_NUMBER_RE.match(text):
+		condition |= Q(tracking_number=text.upper())
+	if PHONE_RE.match(text):
+		condition |= Q(phone__startswith=text)
+	return queryset.filter(condition)
+
+
+def _start_of_day(value) -> datetime:
+	return timezone.make_aware(datetime.combine(value, time.min))
+
+
+class RequestSearchForm(forms.Form):
+	q = forms.CharField(required=False, max_length=200)
+	tracking_number = forms.CharField(required=False, max_length=50)
+	phone = forms.CharField(required=False, max_length=20)
+	status = forms.IntegerField(required=False, min_value=1)
+	created_from = forms.DateField(required=False)
+	created_to = forms.DateField(required=False)
+
+	def clean(self):
+		cleaned_data = super().clean()
+		created_from = cleaned_data.get("created_from")
+		created_to = cleaned_data.get("created_to")
+		if created_from and created_to and created_from > created_to:
+			raise forms.ValidationError("تاريخ البداية يجب أن يكون قبل تاريخ النهاية")
+		return cleaned_data
+
+	def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+		data = self.cleaned_data
+		queryset = search_requests(queryset, data.get("q"))
+
+		# رقم التتبع والهاتف: مطابقة البادئة تستفيد من الفهرس (وتشمل المطابقة التامة)
+		if data.get("tracking_number"):
+			queryset = queryset.filter(tracking_number__startswith=data["tracking_number"].strip().upper())
+		if data.get("phone"):
+			queryset = queryset.filter(phone__startswith=data["phone"].strip())
+		if data.get("status"):
+			queryset = queryset.filter(status_id=data["status"])
+
+		# نطاق التاريخ كنطاق datetime حتى يُستخدم فهرس created_at
+		if data.get("created_from"):
+			queryset = queryset.filter(created_at__gte=_start_of_day(data["created_from"]))
+		if data.get("created_to"):
+			queryset = queryset.filter(created_at__lt=_start_of_day(data["created_to"] + timedelta(days=1)))
+		return queryset
+
+
+class RequestSearchFilter(BaseFilterBackend):
+	"""فلتر DRF يعتمد على RequestSearchForm"""
+
+	def filter_queryset(self, request, queryset, view):
+		form = RequestSearchForm(request.query_params)
+		if not form.is_valid():
+			raise serializers.ValidationError(form.errors)
+		return form.filter_queryset(queryset)
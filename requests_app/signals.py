@@ -3,11 +3,11 @@ from __future__ import annotations
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 
-from .models import RequestStatus
+from .models import DEFAULT_STATUSES, RequestStatus
 
 
 @receiver(post_migrate)
 def ensure_default_statuses(sender, **kwargs):
-	for name in ("قيد المراجعة", "قيد التنفيذ", "مكتمل", "مرفوض"):
+	for name in DEFAULT_STATUSES:
 		RequestStatus.objects.get_or_create(name=name)
 
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from django.urls import reverse
+
+from website.testing import QueryBudgetTestCase
+
+from users.models import User
+
+from .models import Request
+
+
+class RequestApiTests(QueryBudgetTestCase):
+	def test_list_for_citizen(self):
+		self.client.force_login(self.seed.citizen)
+		with self.assertQueryBudget(4):
+			response = self.client.get(reverse("requests:request-list"))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(response.json()["results"]), self.volume.requests_per_citizen)
+
+	def test_list_for_staff(self):
+		# المشرف يرى كل الطلبات؛ الصفحة الكاملة بنفس عدد الاستعلامات
+		self.client.force_login(self.seed.staff)
+		with self.assertQueryBudget(4):
+			response = self.client.get(reverse("requests:request-list"))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(response.json()["results"]), 50)
+
+	def test_detail(self):
+		self.client.force_login(self.seed.citizen)
+		with self.assertQueryBudget(4):
+			response = self.client.get(reverse("requests:request-detail", args=[self.seed.request.pk]))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.json()["tracking_number"], self.seed.request.tracking_number)
+
+
+class RequestPageTests(QueryBudgetTestCase):
+	def setUp(self):
+		super().setUp()
+		self.client.force_login(self.seed.citizen)
+
+	def test_list(self):
+		with self.assertQueryBudget(3):
+			response = self.client.get(reverse("requests:list"))
+		self.assertEqual(response.status_code, 200)
+
+	def test_detail(self):
+		with self.assertQueryBudget(5):
+			response = self.client.get(reverse("requests:detail", args=[self.seed.request.tracking_number]))
+		self.assertEqual(response.status_code, 200)
+
+	def test_create_form(self):
+		with self.assertQueryBudget(2):
+			response = self.client.get(reverse("requests:create"))
+		self.assertEqual(response.status_code, 200)
+
+	def test_create(self):
+		with self.assertQueryBudget(4):
+			response = self.client.post(
+				reverse("requests:create"), {"title": "إنارة الشارع", "description": "الشارع الرئيسي بدون إنارة منذ أسبوع"}
+			)
+		self.assertRedirects(response, reverse("requests:list"), fetch_redirect_response=False)
+		self.assertTrue(Request.objects.filter(user=self.seed.citizen, title="إنارة الشارع").exists())
+
+
+class RequestAdminSearchTests(QueryBudgetTestCase):
+	def setUp(self):
+		super().setUp()
+		self.client.force_login(self.seed.superuser)
+		self.citizen = self.seed.citizen
+		User.objects.filter(pk=self.citizen.pk).update(email="citizen0@example.com")
+
+	def search(self, term: str) -> set[int]:
+		response = self.client.get(reverse("admin:requests_app_request_changelist"), {"q": term})
+		self.assertEqual(response.status_code, 200)
+		return {obj.pk for obj in response.context["cl"].result_list}
+
+	def own_requests(self, username: str | None = None) -> set[int]:
+		username = username or self.citizen.username
+		return set(Request.objects.filter(user__username=username).values_list("pk", flat=True))
+
+	def test_search_by_username(self):
+		self.assertEqual(self.search(self.citizen.username), self.own_requests())
+
+	def test_search_by_email(self):
+		self.assertEqual(self.search("CITIZEN0@example.com"), self.own_requests())
+
+	def test_search_by_full_name(self):
+		self.assertEqual(self.search("رقم 17"), self.own_requests("citizen17"))
+
+	def test_search_by_tracking_number(self):
+		Request.objects.filter(pk=self.seed.request.pk).update(tracking_number="A1B2C3D4")
+		self.assertEqual(self.search("a1b2c3d4"), {self.seed.request.pk})
+
+	def test_search_by_title_text(self):
+		expected = Request.objects.get(title="طلب 3 للمواطن 17").pk
+		self.assertEqual(self.search("طلب 3 للمواطن 17"), {expected})
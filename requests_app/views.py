@@ -1,22 +1,71 @@
 from __future__ import annotations
 
+import json
+
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from rest_framework import permissions, routers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from .models import Request, RequestAttachment, RequestStatus
+from .projections import REQUEST_ROW, request_rows
+from .search import RequestSearchFilter
 from .serializers import RequestSerializer
 
 
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _ndjson_lines(rows):
+	for row in rows:
+		yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n"
+
+
 class RequestViewSet(viewsets.ModelViewSet):
-	queryset = Request.objects.select_related("status", "user").all()
+	queryset = Request.objects.select_related("status", "user").prefetch_related("attachments")
 	serializer_class = RequestSerializer
 	permission_classes = [permissions.IsAuthenticated]
+	filter_backends = [RequestSearchFilter]
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		# المواطن يرى طلباته فقط، والمشرفون يرون كل الطلبات
+		if not self.request.user.is_staff:
+			queryset = queryset.filter(user=self.request.user)
+		return queryset
 
 	def perform_create(self, serializer):
 		serializer.save(user=self.request.user)
 
+	def list(self, request, *args, **kwargs):
+		# مسار القراءة السريع: صفوف .values() بدلاً من ModelSerializer لكل كائن
+		queryset = REQUEST_ROW.values(self.filter_queryset(self.get_queryset()))
+		page = self.paginate_queryset(queryset)
+		if page is None:
+			return Response(request_rows(list(queryset), request))
+		return self.get_paginated_response(request_rows(page, request))
+
+	@action(detail=False, methods=["get"], permission_classes=[permissions.IsAdminUser])
+	def export(self, request):
+		"""تصدير الطلبات بصيغة NDJSON على دفعات بذاكرة ثابتة"""
+		queryset = REQUEST_ROW.values(self.filter_queryset(self.get_queryset())).order_by("-created_at", "-id")
+
+		def rows():
+			chunk = []
+			for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+				chunk.append(row)
+				if len(chunk) == EXPORT_CHUNK_SIZE:
+					yield from _ndjson_lines(request_rows(chunk, request))
+					chunk = []
+			yield from _ndjson_lines(request_rows(chunk, request))
+
+		response = StreamingHttpResponse(rows(), content_type="application/x-ndjson; charset=utf-8")
+		response["Content-Disposition"] = 'attachment; filename="requests.ndjson"'
+		return response
+
 
 router = routers.DefaultRouter()
 router.register(r"api", RequestViewSet, basename="request")
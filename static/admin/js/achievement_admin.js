@@ -1,5 +1,14 @@
 // Achievement Admin JavaScript
-function updateVillageChoices(selectedArea) {
+function getVillageChoices() {
+    const areaField = document.getElementById('id_area');
+    // Villages per area are rendered by the admin form on the area select
+    if (areaField && areaField.dataset.villages) {
+        return JSON.parse(areaField.dataset.villages);
+    }
+    return window.villageChoices || {};
+}
+
+function updateVillageChoices(selectedArea, preselectedVillage) {
     const villageField = document.getElementById('id_village');
     if (!villageField) return;
     
@@ -7,7 +16,7 @@ function updateVillageChoices(selectedArea) {
     villageField.innerHTML = '<option value="">---------</option>';
     
     // Get villages for selected area
-    const villages = window.villageChoices[selectedArea] || [];
+    const villages = getVillageChoices()[selectedArea] || [];
     
     // Add new options
     villages.forEach(village => {
@@ -17,20 +26,25 @@ function updateVillageChoices(selectedArea) {
         villageField.appendChild(option);
     });
     
-    // Clear current village selection
-    villageField.value = '';
+    // Keep the saved village when the form is first shown, clear it on area change
+    villageField.value = preselectedVillage || '';
 }
 
 // Initialize village choices when page loads
 document.addEventListener('DOMContentLoaded', function() {
     const areaField = document.getElementById('id_area');
-    if (areaField) {
+    const villageField = document.getElementById('id_village');
+    if (areaField && villageField && areaField.value) {
         // Set initial village choices
-        updateVillageChoices(areaField.value);
-        
-        // Add change event listener
-        areaField.addEventListener('change', function() {
-            updateVillageChoices(this.value);
-        });
+        const currentVillage = villageField.value;
+        updateVillageChoices(areaField.value, currentVillage);
+        if (currentVillage && villageField.value !== currentVillage) {
+            // Village not in the list for this area: keep it selectable
+            const option = document.createElement('option');
+            option.value = currentVillage;
+            option.textContent = currentVillage;
+            villageField.appendChild(option);
+            villageField.value = currentVillage;
+        }
     }
 });
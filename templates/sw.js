@@ -0,0 +1,128 @@
+// Generated per deploy by website.views.service_worker_view; do not cache-bust by hand.
+const VERSION = '{{ version }}';
+const PRECACHE = 'precache-' + VERSION;
+// v2: pages-v1 could hold signed-in pages and JSON; activate deletes it.
+const PAGES_CACHE = 'pages-v2';
+const IMAGES_CACHE = 'images-v1';
+const CURRENT_CACHES = [PRECACHE, PAGES_CACHE, IMAGES_CACHE];
+const IMAGES_CACHE_LIMIT = 200;
+
+// [{url, revision}] for project static assets only (no HTML, no user data).
+const PRECACHE_MANIFEST = {{ manifest|safe }};
+const PRECACHE_URLS = new Set(PRECACHE_MANIFEST.map(function(entry) { return entry.url; }));
+
+self.addEventListener('install', function(event) {
+  event.waitUntil(
+    caches.open(PRECACHE)
+      .then(function(cache) { return cache.addAll(Array.from(PRECACHE_URLS)); })
+      .then(function() { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener('activate', function(event) {
+  event.waitUntil(
+    caches.keys()
+      .then(function(names) {
+        return Promise.all(names.map(function(name) {
+          if (!CURRENT_CACHES.includes(name)) {
+            return caches.delete(name);
+          }
+        }));
+      })
+      .then(function() { return self.clients.claim(); })
+  );
+});
+
+function isCacheable(response) {
+  return response && response.ok && response.type === 'basic' && !response.redirected;
+}
+
+// The server marks every response sent with a session cookie as private
+// (website.middleware.PrivateResponseMiddleware); those never enter Cache Storage.
+function isShareable(response) {
+  const cacheControl = response.headers.get('Cache-Control') || '';
+  return !cacheControl.includes('private') && !cacheControl.includes('no-store');
+}
+
+function isImage(url) {
+  return url.pathname.startsWith('/media/achievements/') ||
+    url.pathname.startsWith('/static/images/') ||
+    url.pathname.startsWith('/imgs/');
+}
+
+
+function trimCache(cacheName, maxEntries) {
+  return caches.open(cacheName).then(function(cache) {
+    return cache.keys().then(function(keys) {
+      if (keys.length > maxEntries) {
+        return cache.delete(keys[0]).then(function() { return trimCache(cacheName, maxEntries); });
+      }
+    });
+  });
+}
+
+function cacheFirst(request) {
+  return caches.match(request, {cacheName: PRECACHE}).then(function(cached) {
+    return cached || fetch(request);
+  });
+}
+
+function staleWhileRevalidate(event, cacheName, maxEntries) {
+  const request = event.request;
+  return caches.open(cacheName).then(function(cache) {
+    return cache.match(request).then(function(cached) {
+      const network = fetch(request).then(function(response) {
+        if (isCacheable(response)) {
+          return cache.put(request, response.clone())
+            .then(function() { return maxEntries ? trimCache(cacheName, maxEntries) : null; })
+            .then(function() { return response; });
+        }
+        return response;
+      });
+      if (cached) {
+        event.waitUntil(network.catch(function() {}));
+        return cached;
+      }
+      return network;
+    });
+  });
+}
+
+// Anonymous pages only, kept as an offline fallback.
+function networkFirst(request, cacheName) {
+  return fetch(request)
+    .then(function(response) {
+      if (isCacheable(response) && isShareable(response)) {
+        const copy = response.clone();
+        caches.open(cacheName).then(function(cache) { cache.put(request, copy); });
+      }
+      return response;
+    })
+    .catch(function() {
+      return caches.match(request, {cacheName: cacheName}).then(function(cached) {
+        return cached || Response.error();
+      });
+    });
+}
+
+self.addEventListener('fetch', function(event) {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (request.method !== 'GET') {
+    return;
+  }
+
+  if (PRECACHE_URLS.has(url.pathname)) {
+    event.respondWith(cacheFirst(request));
+  } else if (isImage(url)) {
+    event.respondWith(staleWhileRevalidate(event, IMAGES_CACHE, IMAGES_CACHE_LIMIT));
+  } else if (request.mode === 'navigate') {
+    // Always from the network first: a stored page may be for another auth state.
+    // JSON polling endpoints are left to the HTTP cache (ETag + no-cache).
+    event.respondWith(networkFirst(request, PAGES_CACHE));
+  }
+});
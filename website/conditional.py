@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import hashlib
+
+
+def hashed_etag(request, *validators) -> str:
+	"""ETag من المسار والمستخدم وقيم تحقق رخيصة (updated_at، عدّادات...)"""
+	raw = "|".join([request.get_full_path(), str(request.user.pk), *map(str, validators)])
+	return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
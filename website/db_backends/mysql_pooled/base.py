@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+
+from django.db.backends.mysql import base as mysql
+from django.utils.asyncio import async_unsafe
+
+from ..pool import ConnectionPool, PooledConnectionMixin, PoolTimeout
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(conn_params: dict):
+	# نفس ما يفعله DatabaseWrapper.get_new_connection في Django
+	connection = mysql.Database.connect(**conn_params)
+	if connection.encoders.get(bytes) is bytes:
+		connection.encoders.pop(bytes)
+	return connection
+
+
+def _ping(connection) -> bool:
+	try:
+		connection.ping()
+	except mysql.Database.Error:
+		return False
+	return True
+
+
+class DatabaseWrapper(PooledConnectionMixin, mysql.DatabaseWrapper):
+	"""MySQL مع مجمّع اتصالات داخل العملية
+
+	مناسب لـ ASGI حيث لا يُعاد استخدام الاتصالات الدائمة (CONN_MAX_AGE) بين الطلبات
+	لأن كل طلب يعمل في خيط مختلف. هنا close() في نهاية الطلب تُعيد الاتصال للمجمّع
+	بدل إغلاقه، فلا يُفتح اتصال جديد لكل طلب. الإعدادات في OPTIONS["pool"]:
+	{"max_size": 10, "timeout": 10}.
+	"""
+
+	def get_connection_params(self):
+		params = super().get_connection_params()
+		self.pool_options = params.pop("pool", None) or {}
+		return params
+
+	def _pool(self, conn_params: dict) -> ConnectionPool:
+		settings_dict = self.settings_dict
+		key = (self.alias, settings_dict["HOST"], settings_dict["PORT"], settings_dict["NAME"], settings_dict["USER"])
+		with _pools_lock:
+			pool = _pools.get(key)
+			if pool is None:
+				pool = _pools[key] = ConnectionPool(
+					lambda: _connect(conn_params),
+					max_size=self.pool_options.get("max_size", 10),
+					timeout=self.pool_options.get("timeout", 10.0),
+					check=_ping,
+				)
+		return pool
+
+	@async_unsafe
+	def get_new_connection(self, conn_params):
+		self._connection_pool = self._pool(conn_params)
+		try:
+			return self._connection_pool.acquire()
+		except PoolTimeout as exc:
+			# يصل للمستدعي كـ django.db.OperationalError مثل أي فشل اتصال
+			raise mysql.Database.OperationalError(str(exc)) from exc
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+
+class PoolTimeout(Exception):
+	pass
+
+
+class ConnectionPool:
+	"""مجمّع اتصالات مشترك بين كل الخيوط في العملية
+
+	الاتصال المُعاد يُستخدم من أي خيط لاحقًا (واحد في كل مرة). الاتصال الخامل
+	أكثر من `recycle_after` يُفحص بـ `check` قبل إعادة استخدامه، ويُستبدل إن
+	انقطع (مثلًا بعد wait_timeout في MySQL).
+	"""
+
+	def __init__(
+		self,
+		connect: Callable[[], Any],
+		max_size: int = 10,
+		timeout: float = 10.0,
+		check: Callable[[Any], bool] | None = None,
+		recycle_after: float = 30.0,
+	):
+		self.connect = connect
+		self.max_size = max_size
+		self.timeout = timeout
+		self.check = check
+		self.recycle_after = recycle_after
+		# LIFO: الاتصالات الأحدث استخدامًا أقل عرضة لانتهاء المهلة على الخادم
+		self._idle: queue.LifoQueue = queue.LifoQueue()
+		self._lock = threading.Lock()
+		self._size = 0
+
+	@property
+	def size(self) -> int:
+		return self._size
+
+	@property
+	def idle(self) -> int:
+		return self._idle.qsize()
+
+	def _create(self):
+		try:
+			return self.connect()
+		except Exception:
+			with self._lock:
+				self._size -= 1
+			raise
+
+	def acquire(self):
+		deadline = time.monotonic() + self.timeout
+		while True:
+			try:
+				connection, released_at = self._idle.get_nowait()
+			except queue.Empty:
+				with self._lock:
+					can_create = self._size < self.max_size
+					if can_create:
+						self._size += 1
+				if can_create:
+					return self._create()
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					raise PoolTimeout(f"No database connection available within {self.timeout}s (max_size={self.max_size})")
+				try:
+					connection, released_at = self._idle.get(timeout=remaining)
+				except queue.Empty:
+					continue
+			if self.check is None or time.monotonic() - released_at < self.recycle_after or self.check(connection):
+				return connection
+			self.discard(connection)
+
+	def release(self, connection) -> None:
+		self._idle.put((connection, time.monotonic()))
+
+	def discard(self, connection) -> None:
+		with self._lock:
+			self._size -= 1
+		try:
+			connection.close()
+		except Exception:
+			pass
+
+	def close_all(self) -> None:
+		while True:
+			try:
+				connection, _ = self._idle.get_nowait()
+			except queue.Empty:
+				return
+			self.discard(connection)
+
+
+class PooledConnectionMixin:
+	"""الجزء المستقل عن قاعدة البيانات من DatabaseWrapper مع المجمّع
+
+	get_new_connection في الصنف الفعلي يضع `_connection_pool` ويستعير منه.
+	"""
+
+	def init_connection_state(self):
+		# SET SESSION ... مرة واحدة لكل اتصال فعلي وليس في كل استعارة من المجمّع
+		if getattr(self.connection, "_django_initialized", False):
+			return
+		super().init_connection_state()
+		self.connection._django_initialized = True
+
+	def _close(self):
+		pool = getattr(self, "_connection_pool", None)
+		if self.connection is None or pool is None:
+			return super()._close()
+		# اتصال داخل معاملة أو بعد خطأ لا يُعاد للمجمّع
+		if self.in_atomic_block or self.errors_occurred or not self.autocommit:
+			pool.discard(self.connection)
+		else:
+			pool.release(self.connection)
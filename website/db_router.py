@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA = "replica"
+PIN_COOKIE = "db_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# لكل طلب/مهمة على حدة (خيوط WSGI ومهام ASGI)، والافتراضي القراءة من الأساسية
+_reads_from_replica: ContextVar[bool] = ContextVar("reads_from_replica", default=False)
+
+
+def replica_configured() -> bool:
+	return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica(enabled: bool = True):
+	"""القراءات داخل هذه الكتلة تذهب للنسخة المتماثلة إن كانت معرّفة"""
+	token = _reads_from_replica.set(enabled)
+	try:
+		yield
+	finally:
+		_reads_from_replica.reset(token)
+
+
+class ReplicaRouter:
+	"""الكتابة دائمًا على الأساسية، والقراءة من النسخة المتماثلة فقط داخل read_from_replica"""
+
+	def db_for_read(self, model, **hints):
+		if not _reads_from_replica.get() or not replica_configured():
+			return DEFAULT_DB_ALIAS
+		# داخل معاملة على الأساسية يجب أن ترى القراءة ما كُتب فيها
+		if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+			return DEFAULT_DB_ALIAS
+		return REPLICA
+
+	def db_for_write(self, model, **hints):
+		# حتى الكائنات المقروءة من النسخة المتماثلة تُحفظ على الأساسية
+		return DEFAULT_DB_ALIAS
+
+	def allow_relation(self, obj1, obj2, **hints):
+		return True
+
+	def allow_migrate(self, db, app_label, model_name=None, **hints):
+		return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def tracking_writes():
+	"""state["wrote"] يصبح True إذا نُفذ أي استعلام كتابة على الأساسية داخل الكتلة"""
+	state = {"wrote": False}
+
+	def track(execute, sql, params, many, context):
+		if not state["wrote"] and sql.lstrip().upper().startswith(WRITE_PREFIXES):
+			state["wrote"] = True
+		return execute(sql, params, many, context)
+
+	with connections[DEFAULT_DB_ALIAS].execute_wrapper(track):
+		yield state
+
+
+def pinned_to_primary(request) -> bool:
+	try:
+		return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+	except ValueError:
+		return False
+
+
+def pin_to_primary(response) -> None:
+	"""بعد الكتابة يقرأ المستخدم من الأساسية لبضع ثوانٍ حتى يرى ما كتبه رغم تأخر النسخة المتماثلة"""
+	seconds = settings.REPLICA_PIN_SECONDS
+	response.set_cookie(
+		PIN_COOKIE, f"{time.time() + seconds:.0f}", max_age=seconds, httponly=True, samesite="Lax"
+	)
+
+
+def replica_reads(view):
+	"""طلبات GET في هذا العرض تقرأ من النسخة المتماثلة ما لم يكن المستخدم مثبتًا على الأساسية"""
+
+	@wraps(view)
+	def wrapper(request, *args, **kwargs):
+		if request.method not in SAFE_METHODS or pinned_to_primary(request):
+			return view(request, *args, **kwargs)
+		with read_from_replica():
+			return view(request, *args, **kwargs)
+
+	return wrapper
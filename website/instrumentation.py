@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+
+
+# عدد آخر العينات المحفوظة لكل مسار (لحساب p50/p95)
+WINDOW = 500
+SAMPLES_KEY = "instrumentation:samples:{}"
+VIEWS_KEY = "instrumentation:views"
+# نفس الاستعلام يتكرر بهذا العدد أو أكثر في طلب واحد = غالبًا N+1
+DUPLICATE_THRESHOLD = 3
+
+_current: ContextVar[RequestStats | None] = ContextVar("instrumentation_stats", default=None)
+_MISSING = object()
+
+
+@dataclass
+class RequestStats:
+	started: float = field(default_factory=time.perf_counter)
+	view_started: float | None = None
+	view_name: str = ""
+	queries: int = 0
+	db_time: float = 0.0
+	cache_hits: int = 0
+	cache_misses: int = 0
+	# نص SQL بعلامات %s هو بصمة الاستعلام، فالقيم المختلفة لا تغيّرها
+	signatures: Counter = field(default_factory=Counter)
+
+	def duplicates(self) -> dict[str, int]:
+		return {sql: n for sql, n in self.signatures.most_common(5) if n >= DUPLICATE_THRESHOLD}
+
+
+def _record_query(execute, sql, params, many, context):
+	stats = _current.get()
+	started = time.perf_counter()
+	try:
+		return execute(sql, params, many, context)
+	finally:
+		if stats is not None:
+			stats.queries += 1
+			stats.db_time += time.perf_counter() - started
+			stats.signatures[sql] += 1
+
+
+def _instrument_cache(backend) -> None:
+	"""تغليف get/get_many لنسخة الكاش الخاصة بهذا الخيط مرة واحدة؛ لا تسجّل إلا داخل طلب مُعاين"""
+	if getattr(backend, "_instrumented", False):
+		return
+	get, get_many = backend.get, backend.get_many
+
+	def instrumented_get(key, default=None, version=None):
+		stats = _current.get()
+		if stats is None:
+			return get(key, default, version)
+		value = get(key, _MISSING, version)
+		if value is _MISSING:
+			stats.cache_misses += 1
+			return default
+		stats.cache_hits += 1
+		return value
+
+	def instrumented_get_many(keys, version=None):
+		found = get_many(keys, version)
+		stats = _current.get()
+		if stats is not None:
+			keys = list(keys)
+			stats.cache_hits += len(found)
+			stats.cache_misses += len(keys) - len(found)
+		return found
+
+	backend.get, backend.get_many = instrumented_get, instrumented_get_many
+	backend._instrumented = True
+
+
+def _percentile(values: list[float], q: float) -> float:
+	ordered = sorted(values)
+	return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _store_sample(stats: RequestStats, total: float, view: float) -> None:
+	# قراءة ثم كتابة غير ذرية: قد تضيع عينة تحت الضغط، وهذا مقبول لمتوسط متحرك
+	key = SAMPLES_KEY.format(stats.view_name)
+	samples = cache.get(key) or []
+	samples.append((total, view, stats.db_time * 1000, stats.queries, stats.cache_hits, stats.cache_misses, stats.duplicates()))
+	cache.set(key, samples[-WINDOW:], None)
+	views = cache.get(VIEWS_KEY) or set()
+	if stats.view_name not in views:
+		cache.set(VIEWS_KEY, views | {stats.view_name}, None)
+
+
+def request_metrics() -> dict[str, dict]:
+	"""ملخص العينات لكل اسم مسار، الأبطأ (p95) أولًا"""
+	views = sorted(cache.get(VIEWS_KEY) or ())
+	stored = cache.get_many([SAMPLES_KEY.format(name) for name in views])
+	summary = {}
+	for name in views:
+		samples = stored.get(SAMPLES_KEY.format(name))
+		if not samples:
+			continue
+		totals, view_times, db_times, queries, hits, misses, duplicates = zip(*samples)
+		signatures = Counter()
+		for found in duplicates:
+			signatures.update(found)
+		summary[name] = {
+			"samples": len(samples),
+			"total_ms": {"p50": round(_percentile(totals, 0.5), 1), "p95": round(_percentile(totals, 0.95), 1)},
+			"view_ms": {"p50": round(_percentile(view_times, 0.5), 1), "p95": round(_percentile(view_times, 0.95), 1)},
+			"db_ms": {"p50": round(_percentile(db_times, 0.5), 1), "p95": round(_percentile(db_times, 0.95), 1)},
+			"queries": {"p50": _percentile(queries, 0.5), "p95": _percentile(queries, 0.95), "max": max(queries)},
+			"cache": {"hits": sum(hits), "misses": sum(misses)},
+			"duplicate_queries": dict(signatures.most_common(5)),
+		}
+	return dict(sorted(summary.items(), key=lambda item: item[1]["total_ms"]["p95"], reverse=True))
+
+
+def reset_request_metrics() -> None:
+	views = cache.get(VIEWS_KEY) or ()
+	cache.delete_many([SAMPLES_KEY.format(name) for name in views] + [VIEWS_KEY])
+
+
+class InstrumentationMiddleware:
+	"""
+	قياس نسبة من الطلبات (INSTRUMENTATION_SAMPLE_RATE): عدد الاستعلامات ومدتها والمكرر منها،
+	وإصابات الكاش، وزمن العرض. النتائج في ترويسة Server-Timing وفي ملخص متحرك لكل مسار.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		rate = settings.INSTRUMENTATION_SAMPLE_RATE
+		if not rate or random.random() >= rate:
+			return self.get_response(request)
+
+		stats = RequestStats()
+		token = _current.set(stats)
+		_instrument_cache(caches["default"])
+		wrappers = [connection.execute_wrapper(_record_query) for connection in connections.all()]
+		try:
+			for wrapper in wrappers:
+				wrapper.__enter__()
+			response = self.get_response(request)
+		finally:
+			for wrapper in reversed(wrappers):
+				wrapper.__exit__(None, None, None)
+			_current.reset(token)
+
+		ended = time.perf_counter()
+		total = (ended - stats.started) * 1000
+		view = (ended - stats.view_started) * 1000 if stats.view_started else 0.0
+		duplicates = stats.duplicates()
+		timing = [
+			f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+			f'cache;desc="{stats.cache_hits} hit / {stats.cache_misses} miss"',
+			f"view;dur={view:.1f}",
+			f"total;dur={total:.1f}",
+		]
+		if duplicates:
+			timing.append(f'dup;desc="{len(duplicates)} repeated queries, {sum(duplicates.values())} runs"')
+		response["Server-Timing"] = ", ".join(timing)
+		if stats.view_name:
+			_store_sample(stats, total, view)
+		return response
+
+	def process_view(self, request, view_func, view_args, view_kwargs):
+		stats = _current.get()
+		if stats is not None:
+			stats.view_started = time.perf_counter()
+			stats.view_name = request.resolver_match.view_name if request.resolver_match else ""
+		return None
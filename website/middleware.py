@@ -1,35 +1,77 @@
-from django.shortcuts import redirect
-from django.urls import reverse
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control, patch_vary_headers
 
+from .db_router import SAFE_METHODS, pin_to_primary, replica_configured, tracking_writes
+from .route_permissions import build_route_table, has_role
 
-class AdminAccessMiddleware:
+
+class RoutePermissionMiddleware:
     """
-    Middleware لحماية الوصول للمناطق الإدارية
+    حماية المناطق الإدارية بجدول صلاحيات يُبنى مرة واحدة من ROUTE_PERMISSIONS وURLconf
     """
-    
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        self.table = None
+
     def __call__(self, request):
-        # قائمة المسارات المحمية
-        protected_paths = [
-            '/admin/',
-            '/dashboard/',
-        ]
-        
-        # التحقق من المسار
-        if any(request.path.startswith(path) for path in protected_paths):
-            # إذا كان المستخدم غير مسجل دخول
-            if not request.user.is_authenticated:
-                messages.error(request, 'يجب تسجيل الدخول للوصول لهذه الصفحة')
-                return redirect('login')
-            
-            # إذا كان المستخدم ليس مشرف
-            if not request.user.is_superuser:
-                messages.error(request, 'ليس لديك صلاحية للوصول لهذه الصفحة')
-                return redirect('home')
-        
-        response = self.get_response(request)
+        if self.table is None:
+            self.table = build_route_table()
+        role = self.table.required_role(request.path_info)
+        if role is not None and not has_role(request.user, role):
+            return self.deny(request)
+        return self.get_response(request)
+
+    def deny(self, request):
+        # طلبات fetch من الواجهة تأخذ JSON بدون إعادة توجيه ولا رسائل تُكتب في الجلسة
+        if "text/html" not in request.headers.get("Accept", ""):
+            return JsonResponse({'error': 'ليس لديك صلاحية'}, status=403)
+
+        if not request.user.is_authenticated:
+            messages.error(request, 'يجب تسجيل الدخول للوصول لهذه الصفحة')
+            return redirect_to_login(request.get_full_path())
+
+        messages.error(request, 'ليس لديك صلاحية للوصول لهذه الصفحة')
+        return redirect('home')
+
+
+class ReadYourWritesMiddleware:
+    """
+    تثبيت المستخدم على قاعدة البيانات الأساسية لبضع ثوانٍ بعد أي طلب كتب فيها،
+    ومنها طلبات GET التي تكتب (مثل إنشاء غرفة الدردشة ورسالة الترحيب في chat_view)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+        with tracking_writes() as writes:
+            response = self.get_response(request)
+        if writes["wrote"] or request.method not in SAFE_METHODS:
+            pin_to_primary(response)
         return response
 
+
+class PrivateResponseMiddleware:
+    """
+    كل استجابة لطلب بجلسة (أو تُنشئ جلسة) تُعلَّم Cache-Control: private
+    حتى لا يخزنها عامل الخدمة ولا أي كاش مشترك لمستخدم آخر
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # من الكوكي وليس request.user حتى لا يُحمَّل المستخدم في كل طلب
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or settings.SESSION_COOKIE_NAME in response.cookies:
+            if "no-store" not in response.get("Cache-Control", ""):
+                patch_cache_control(response, private=True)
+            patch_vary_headers(response, ("Cookie",))
+        return response
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from achievements.caching import get_content_version, versioned_key
+
+
+METRICS = ("hit", "stale", "wait", "miss", "bypass")
+METRICS_KEY = "page-cache:metrics:{}"
+# تبقى الصفحة بعد انتهاء صلاحيتها هذه المدة لتُقدَّم أثناء إعادة حسابها
+STALE_GRACE = 60
+LOCK_TIMEOUT = 30
+# انتظار طلب آخر يحسب نفس الصفحة قبل حسابها بأنفسنا
+WAIT_TIMEOUT = 2.0
+WAIT_STEP = 0.05
+
+
+def public_page_cache(view=None, *, timeout: int | None = None):
+	"""يعلّم العرض كصفحة عامة تخزنها PageCacheMiddleware للزوار غير المسجلين"""
+
+	def decorator(view):
+		view.page_cache_timeout = timeout or settings.PAGE_CACHE_TIMEOUT
+		return view
+
+	return decorator(view) if view is not None else decorator
+
+
+def record(metric: str) -> None:
+	# incr ذري في memcached/redis، وتقريبي مع الكاش الملفي تحت الضغط
+	key = METRICS_KEY.format(metric)
+	if not cache.add(key, 1, None):
+		try:
+			cache.incr(key)
+		except ValueError:
+			pass
+
+
+def page_cache_stats(reset: bool = False) -> dict[str, int]:
+	keys = {metric: METRICS_KEY.format(metric) for metric in METRICS}
+	values = cache.get_many(list(keys.values()))
+	if reset:
+		cache.delete_many(list(keys.values()))
+	return {metric: values.get(key, 0) for metric, key in keys.items()}
+
+
+def _anonymous(request) -> bool:
+	# بدون كوكي جلسة فالزائر غير مسجل مؤكدًا، ولا حاجة لتحميل المستخدم من قاعدة البيانات
+	return settings.SESSION_COOKIE_NAME not in request.COOKIES and CookieStorage.cookie_name not in request.COOKIES
+
+
+def _cacheable(response) -> bool:
+	# الاستجابة التي تضع كوكي (مثل CSRF) خاصة بزائرها ولا تُشارك
+	if response.status_code != 200 or response.streaming or response.cookies:
+		return False
+	cache_control = response.get("Cache-Control", "")
+	return "private" not in cache_control and "no-store" not in cache_control
+
+
+def _served(entry: dict, status: str):
+	response = entry["response"]
+	response["X-Cache"] = status
+	return response
+
+
+def _wait_for(key: str) -> dict | None:
+	deadline = time.monotonic() + WAIT_TIMEOUT
+	while time.monotonic() < deadline:
+		time.sleep(WAIT_STEP)
+		entry = cache.get(key)
+		if entry is not None:
+			return entry
+	return None
+
+
+class PageCacheMiddleware:
+	"""
+	تخزين صفحات GET العامة للزوار غير المسجلين في الكاش المشترك.
+	المفتاح مرتبط بإصدار المحتوى فيتغير عند أي تعديل في الإنجازات، وطلب واحد فقط
+	يعيد حساب الصفحة المنتهية بينما تُقدَّم النسخة القديمة أو ينتظر الباقون.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		response = self.get_response(request)
+		key = getattr(request, "_page_cache_key", None)
+		if key is not None:
+			self.store(request, key, response)
+		return response
+
+	def process_view(self, request, view_func, view_args, view_kwargs):
+		timeout = getattr(view_func, "page_cache_timeout", None)
+		if timeout is None or request.method not in ("GET", "HEAD"):
+			return None
+		if not _anonymous(request):
+			record("bypass")
+			return None
+
+		key = versioned_key("page", get_content_version(), request.get_host(), request.get_full_path())
+		lock = f"{key}:lock"
+		entry = cache.get(key)
+		owner = False
+		if entry is not None:
+			if entry["fresh_until"] > time.time():
+				record("hit")
+				return _served(entry, "HIT")
+			owner = cache.add(lock, 1, LOCK_TIMEOUT)
+			if not owner:
+				record("stale")
+				return _served(entry, "STALE")
+		else:
+			owner = cache.add(lock, 1, LOCK_TIMEOUT)
+			if not owner:
+				entry = _wait_for(key)
+				if entry is not None:
+					record("wait")
+					return _served(entry, "HIT")
+
+		record("miss")
+		request._page_cache_key = key
+		request._page_cache_timeout = timeout
+		request._page_cache_lock = lock if owner else None
+		return None
+
+	def store(self, request, key: str, response) -> None:
+		try:
+			if _cacheable(response):
+				patch_vary_headers(response, ("Cookie",))
+				entry = {"fresh_until": time.time() + request._page_cache_timeout, "response": response}
+				cache.set(key, entry, request._page_cache_timeout + STALE_GRACE)
+				response["X-Cache"] = "MISS"
+		finally:
+			if request._page_cache_lock:
+				cache.delete(request._page_cache_lock)
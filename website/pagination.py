@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+	"""تصفح بالمؤشر (keyset) على created_at بدلاً من OFFSET"""
+
+	ordering = ("-created_at", "-id")
+	page_size_query_param = "page_size"
+	max_page_size = 200
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Iterator
+
+from django.db import models
+from django.db.models import QuerySet
+
+
+def _uuid(value):
+	return None if value is None else str(value)
+
+
+def _isoformat(value):
+	return None if value is None else value.isoformat()
+
+
+def _decimal(value):
+	return None if value is None else str(value)
+
+
+# التحويلات الافتراضية حسب نوع الحقل؛ باقي الحقول تُنسخ كما هي
+DEFAULT_ENCODERS: dict[type, Callable[[Any], Any]] = {
+	models.UUIDField: _uuid,
+	models.DateTimeField: _isoformat,
+	models.DateField: _isoformat,
+	models.TimeField: _isoformat,
+	models.DecimalField: _decimal,
+}
+
+
+def _resolve_field(model, lookup: str) -> models.Field:
+	field = None
+	for part in lookup.split("__"):
+		field = model._meta.get_field(part)
+		if field.is_relation and field.related_model is not None:
+			model = field.related_model
+	if field.is_relation:
+		# علاقة بدون مسار إضافي تعني المفتاح الأساسي للنموذج المرتبط
+		field = field.target_field
+	return field
+
+
+def _default_encoder(field: models.Field):
+	for field_class in type(field).__mro__:
+		if field_class in DEFAULT_ENCODERS:
+			return DEFAULT_ENCODERS[field_class]
+	return None
+
+
+class Projection:
+	"""إسقاط قراءة فقط مبني على .values() مع مُشفّر مُجمَّع لكل نموذج
+
+	يُحدد `fields` كأسماء حقول، أو أزواج (المفتاح في الناتج، مسار الحقل).
+	يُبنى المشفّر مرة واحدة عند التعريف كدالة تُنشئ القاموس مباشرة، فلا يوجد
+	أي فحص للحقول لكل صف كما في ModelSerializer.
+	"""
+
+	def __init__(
+		self,
+		model: type[models.Model],
+		fields: Iterable[str | tuple[str, str]],
+		encoders: dict[str, Callable[[Any], Any]] | None = None,
+	):
+		self.model = model
+		self.columns: list[tuple[str, str]] = []
+		for spec in fields:
+			key, lookup = (spec, spec) if isinstance(spec, str) else spec
+			self.columns.append((key, lookup))
+		self.lookups = tuple(lookup for _, lookup in self.columns)
+		self.encode = self._compile(encoders or {})
+
+	def _compile(self, overrides: dict[str, Callable[[Any], Any]]) -> Callable[[dict], dict]:
+		namespace: dict[str, Any] = {}
+		items = []
+		for index, (key, lookup) in enumerate(self.columns):
+			encoder = overrides.get(key) or _default_encoder(_resolve_field(self.model, lookup))
+			value = f"row[{lookup!r}]"
+			if encoder is not None:
+				namespace[f"_e{index}"] = encoder
+				value = f"_e{index}({value})"
+			items.append(f"{key!r}: {value}")
+		source = "def encode(row):\n\treturn {" + ", ".join(items) + "}\n"
+		exec(compile(source, f"<projection {self.model.__name__}>", "exec"), namespace)
+		return namespace["encode"]
+
+	def values(self, queryset: QuerySet) -> QuerySet:
+		# prefetch_related لا معنى له مع .values() وقد يفشل
+		return queryset.prefetch_related(None).values(*self.lookups)
+
+	def rows(self, queryset: QuerySet) -> Iterator[dict]:
+		return map(self.encode, self.values(queryset))
+
+	def encode_many(self, rows: Iterable[dict]) -> list[dict]:
+		return list(map(self.encode, rows))
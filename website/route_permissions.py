@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+
+
+PUBLIC = "public"
+ROLES = {
+	PUBLIC: lambda user: True,
+	"authenticated": lambda user: user.is_authenticated,
+	"staff": lambda user: user.is_active and user.is_staff,
+	"superuser": lambda user: user.is_active and user.is_superuser,
+}
+
+
+def has_role(user, role: str) -> bool:
+	return ROLES[role](user)
+
+
+def _segments(path: str) -> list[str]:
+	return [segment for segment in path.split("/") if segment]
+
+
+@dataclass
+class _Node:
+	role: str | None = None
+	children: dict[str, _Node] = field(default_factory=dict)
+
+
+class RouteTable:
+	"""شجرة بادئات على مقاطع المسار؛ أعمق بادئة مطابقة تحدد الصلاحية المطلوبة"""
+
+	def __init__(self, rules: dict[str, str]):
+		self.root = _Node()
+		for prefix, role in rules.items():
+			if role not in ROLES:
+				raise ImproperlyConfigured(f"Unknown role {role!r} for {prefix!r} in ROUTE_PERMISSIONS")
+			node = self.root
+			for segment in _segments(prefix):
+				node = node.children.setdefault(segment, _Node())
+			node.role = role
+
+	def required_role(self, path: str) -> str | None:
+		node, role = self.root, self.root.role
+		for segment in _segments(path):
+			node = node.children.get(segment)
+			if node is None:
+				break
+			if node.role is not None:
+				role = node.role
+		return None if role == PUBLIC else role
+
+
+def namespace_prefixes(resolver=None, prefix: str = "/") -> dict[str, str]:
+	"""مسار تركيب كل namespace في URLconf، مثل {"admin_dashboard": "/dashboard/"}"""
+	resolver = resolver or get_resolver()
+	found: dict[str, str] = {}
+	for pattern in resolver.url_patterns:
+		# المسارات الثابتة فقط؛ البادئات ذات المتغيرات لا تصلح كمفتاح في الشجرة
+		if not isinstance(pattern, URLResolver) or not isinstance(pattern.pattern, RoutePattern) or "<" in str(pattern.pattern):
+			continue
+		path = prefix + str(pattern.pattern)
+		if pattern.namespace:
+			found.setdefault(pattern.namespace, path)
+		for namespace, nested in namespace_prefixes(pattern, path).items():
+			found.setdefault(namespace, nested)
+	return found
+
+
+def build_route_table(rules: dict[str, str] | None = None) -> RouteTable:
+	"""مفاتيح ROUTE_PERMISSIONS إما مسارات تبدأ بـ / أو أسماء namespaces تُحوَّل لمساراتها"""
+	rules = settings.ROUTE_PERMISSIONS if rules is None else rules
+	prefixes = None
+	resolved = {}
+	for key, role in rules.items():
+		if not key.startswith("/"):
+			prefixes = prefixes if prefixes is not None else namespace_prefixes()
+			if key not in prefixes:
+				raise ImproperlyConfigured(f"ROUTE_PERMISSIONS: no URL namespace named {key!r}")
+			key = prefixes[key]
+		resolved[key] = role
+	return RouteTable(resolved)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.templatetags.static import static
+
+
+# أصول الواجهة التي تُخزن مسبقاً؛ الصور الكبيرة تُخزن عند الطلب (stale-while-revalidate)
+PRECACHE_EXTENSIONS = (".css", ".js", ".json", ".svg", ".woff2")
+PRECACHE_EXCLUDE_PREFIXES = ("admin/",)
+
+
+def _manifest_icons(storage) -> set[str]:
+	"""مسارات أيقونات manifest.json (داخل static/) حتى تعمل الشاشة الأولى دون اتصال"""
+	if not storage.exists("manifest.json"):
+		return set()
+	with storage.open("manifest.json") as fh:
+		manifest = json.load(fh)
+	prefix = static("")
+	return {
+		icon["src"][len(prefix):]
+		for icon in manifest.get("icons", [])
+		if icon.get("src", "").startswith(prefix)
+	}
+
+
+@lru_cache(maxsize=1)
+def precache_manifest() -> tuple[list[dict], str]:
+	"""قائمة [{url, revision}] لأصول المشروع الثابتة ونسخة مشتقة منها
+
+	تُحسب مرة واحدة لكل عملية؛ أي تغيير في محتوى ملف يغير revision الخاص به
+	ونسخة الكاش في عامل الخدمة، فيُحذف الكاش القديم عند التفعيل.
+	"""
+	entries = []
+	icons: dict[int, set[str]] = {}
+	for path, storage in FileSystemFinder().list(ignore_patterns=["sw.js"]):
+		path = path.replace("\\", "/")
+		if path.startswith(PRECACHE_EXCLUDE_PREFIXES):
+			continue
+		if not path.endswith(PRECACHE_EXTENSIONS):
+			if id(storage) not in icons:
+				icons[id(storage)] = _manifest_icons(storage)
+			if path not in icons[id(storage)]:
+				continue
+		with storage.open(path) as fh:
+			revision = hashlib.sha256(fh.read()).hexdigest()[:12]
+		entries.append({"url": static(path), "revision": revision})
+	entries.sort(key=lambda entry: entry["url"])
+	version = hashlib.sha256(json.dumps(entries).encode()).hexdigest()[:12]
+	return entries, version
@@ -29,21 +29,38 @@ INSTALLED_APPS = [
 	"achievements",
 	"admin_dashboard",
 	"chat_app",
+	"blobstore",
 ]
 
 MIDDLEWARE = [
+	# أولًا حتى يشمل القياس كل الطبقات التالية
+	"website.instrumentation.InstrumentationMiddleware",
 	"django.middleware.security.SecurityMiddleware",
+	# قبل SessionMiddleware حتى يرى كوكي الجلسة الذي يُضاف عند تسجيل الدخول
+	"website.middleware.PrivateResponseMiddleware",
 	"django.contrib.sessions.middleware.SessionMiddleware",
 	"django.middleware.common.CommonMiddleware",
 	"django.middleware.csrf.CsrfViewMiddleware",
 	"django.contrib.auth.middleware.AuthenticationMiddleware",
 	"django.contrib.messages.middleware.MessageMiddleware",
 	"django.middleware.clickjacking.XFrameOptionsMiddleware",
-	"website.middleware.AdminAccessMiddleware",
+	"website.middleware.RoutePermissionMiddleware",
+	"website.middleware.ReadYourWritesMiddleware",
+	# أخيرًا: يُقدّم الصفحة المخزنة في process_view بعد أن تجهز الطبقات السابقة الطلب
+	"website.page_cache.PageCacheMiddleware",
 ]
 
 ROOT_URLCONF = "website.urls"
 
+# الصلاحية المطلوبة لكل جزء من الموقع (public/authenticated/staff/superuser)؛ المفتاح مسار
+# يبدأ بـ / أو اسم namespace في URLconf، وأعمق بادئة مطابقة هي المعتمدة
+ROUTE_PERMISSIONS = {
+	"admin": "superuser",
+	"admin_dashboard": "superuser",
+	"/chat/admin/": "staff",
+	"/dashboard/metrics/": "staff",
+}
+
 TEMPLATES = [
 	{
 		"BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -64,13 +81,111 @@ WSGI_APPLICATION = "website.wsgi.application"
 ASGI_APPLICATION = "website.asgi.application"
 
 
-# Database (SQLite for development)
-DATABASES = {
+# إعدادات كل اتصال SQLite: WAL يسمح للقرّاء بالعمل أثناء الكتابة، وsynchronous=NORMAL
+# آمن مع WAL ويوفر fsync في كل commit
+SQLITE_PRAGMAS = (
+	"PRAGMA journal_mode=WAL",
+	"PRAGMA synchronous=NORMAL",
+	"PRAGMA mmap_size=268435456",
+	"PRAGMA cache_size=-20000",
+	"PRAGMA temp_store=MEMORY",
+)
+
+# Database: SQLite للتطوير افتراضيًا، وMySQL للإنتاج عبر DJANGO_DB_ENGINE=mysql
+DB_ENGINE = os.environ.get("DJANGO_DB_ENGINE", "sqlite").lower()
+# عدد الاتصالات في مجمّع كل عملية (مع ASGI)؛ 0 = اتصالات دائمة لكل خيط عبر CONN_MAX_AGE
+DB_POOL_SIZE = int(os.environ.get("DJANGO_DB_POOL_SIZE", "0"))
+
+if DB_ENGINE == "mysql":
+	DATABASES = {
+		"default": {
+			"ENGINE": "website.db_backends.mysql_pooled" if DB_POOL_SIZE else "django.db.backends.mysql",
+			"NAME": os.environ.get("DJANGO_DB_NAME", "website"),
+			"USER": os.environ.get("DJANGO_DB_USER", "website"),
+			"PASSWORD": os.environ.get("DJANGO_DB_PASSWORD", ""),
+			"HOST": os.environ.get("DJANGO_DB_HOST", "127.0.0.1"),
+			"PORT": os.environ.get("DJANGO_DB_PORT", "3306"),
+			# مع المجمّع يُعاد الاتصال له بنهاية كل طلب بدل إبقائه مرتبطًا بالخيط
+			"CONN_MAX_AGE": 0 if DB_POOL_SIZE else int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", "300")),
+			"CONN_HEALTH_CHECKS": True,
+			"OPTIONS": {
+				"charset": "utf8mb4",
+				"init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+				# بدون أقفال الفجوات (gap locks) التي تُبطئ الإدراج المتزامن لرسائل الدردشة والإشعارات
+				"isolation_level": "read committed",
+				**(
+					{"pool": {"max_size": DB_POOL_SIZE, "timeout": float(os.environ.get("DJANGO_DB_POOL_TIMEOUT", "10"))}}
+					if DB_POOL_SIZE else {}
+				),
+			},
+		}
+	}
+else:
+	DATABASES = {
+		"default": {
+			"ENGINE": "django.db.backends.sqlite3",
+			"NAME": os.environ.get("DJANGO_SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+			"CONN_MAX_AGE": int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", "0")),
+			"CONN_HEALTH_CHECKS": True,
+			"OPTIONS": {
+				"init_command": "; ".join(SQLITE_PRAGMAS),
+				# انتظار القفل بدل الفشل الفوري بـ "database is locked"
+				"timeout": int(os.environ.get("DJANGO_SQLITE_TIMEOUT", "20")),
+				# المعاملة تحجز قفل الكتابة من BEGIN، فلا تفشل عند ترقية قفل القراءة إلى كتابة
+				"transaction_mode": "IMMEDIATE",
+			},
+		}
+	}
+
+# نسخة متماثلة للقراءة (اختيارية): تقرأ منها صفحات الإحصائيات واستعلامات الدردشة الدورية والتصدير
+if DB_ENGINE == "mysql" and os.environ.get("DJANGO_DB_REPLICA_HOST"):
+	DATABASES["replica"] = {
+		**DATABASES["default"],
+		"HOST": os.environ["DJANGO_DB_REPLICA_HOST"],
+		"PORT": os.environ.get("DJANGO_DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+		"USER": os.environ.get("DJANGO_DB_REPLICA_USER", DATABASES["default"]["USER"]),
+		"PASSWORD": os.environ.get("DJANGO_DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]),
+		"TEST": {"MIRROR": "default"},
+	}
+elif DB_ENGINE != "mysql" and os.environ.get("DJANGO_SQLITE_REPLICA_PATH"):
+	DATABASES["replica"] = {
+		**DATABASES["default"],
+		"NAME": os.environ["DJANGO_SQLITE_REPLICA_PATH"],
+		# للقراءة فقط؛ تُحدَّث بالأمر sync_sqlite_replica
+		"OPTIONS": {**DATABASES["default"]["OPTIONS"], "init_command": "; ".join((*SQLITE_PRAGMAS, "PRAGMA query_only=ON"))},
+		"TEST": {"MIRROR": "default"},
+	}
+
+DATABASE_ROUTERS = ["website.db_router.ReplicaRouter"]
+# مدة قراءة المستخدم من الأساسية بعد أي طلب كتابة (أطول من تأخر النسخة المتماثلة المعتاد)
+REPLICA_PIN_SECONDS = int(os.environ.get("DJANGO_DB_REPLICA_PIN_SECONDS", "5"))
+
+
+# Cache: ملفات مشتركة بين كل العمليات (الخادم وأوامر الإدارة) افتراضيًا،
+# أو memcached/redis محلي عبر DJANGO_CACHE_BACKEND وDJANGO_CACHE_LOCATION
+CACHE_BACKENDS = {
+	"file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+	"memcached": ("django.core.cache.backends.memcached.PyMemcacheCache", "127.0.0.1:11211"),
+	"redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+	"locmem": ("django.core.cache.backends.locmem.LocMemCache", ""),
+}
+CACHE_BACKEND = os.environ.get("DJANGO_CACHE_BACKEND", "file").lower()
+CACHES = {
 	"default": {
-		"ENGINE": "django.db.backends.sqlite3",
-		"NAME": BASE_DIR / "db.sqlite3",
+		"BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+		"LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", CACHE_BACKENDS[CACHE_BACKEND][1]),
+		"KEY_PREFIX": os.environ.get("DJANGO_CACHE_PREFIX", "website"),
+		**({"OPTIONS": {"MAX_ENTRIES": 20000}} if CACHE_BACKEND in ("file", "locmem") else {}),
 	}
 }
+# مدة تخزين الصفحات العامة للزوار (website.page_cache)
+PAGE_CACHE_TIMEOUT = int(os.environ.get("DJANGO_PAGE_CACHE_SECONDS", "300"))
+
+# نسبة الطلبات المقيسة (0 = معطّل، 0.05 = 5%)؛ راجع website.instrumentation
+INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get("DJANGO_INSTRUMENTATION_SAMPLE_RATE", "0"))
+# نسبة رسائل AIService التي تُقاس مراحلها، ونسبة المُعاين منها الذي يُسجَّل تحت cProfile (chat_app.profiling)
+AI_PROFILE_SAMPLE_RATE = float(os.environ.get("DJANGO_AI_PROFILE_SAMPLE_RATE", "0"))
+AI_PROFILE_CPROFILE_RATE = float(os.environ.get("DJANGO_AI_PROFILE_CPROFILE_RATE", "0"))
 
 
 # Password validation
@@ -97,6 +212,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# ملفات التصدير خاصة: تُحمَّل من لوحة التحكم فقط وليس عبر MEDIA_URL
+EXPORTS_ROOT = Path(os.environ.get("DJANGO_EXPORTS_ROOT", BASE_DIR / "exports"))
+EXPORT_ARTIFACT_TTL = timedelta(hours=int(os.environ.get("DJANGO_EXPORT_TTL_HOURS", "24")))
+
 
 # DRF and JWT
 REST_FRAMEWORK = {
@@ -107,6 +226,8 @@ REST_FRAMEWORK = {
 	"DEFAULT_PERMISSION_CLASSES": (
 		"rest_framework.permissions.IsAuthenticatedOrReadOnly",
 	),
+	"DEFAULT_PAGINATION_CLASS": "website.pagination.CreatedAtCursorPagination",
+	"PAGE_SIZE": 50,
 }
 
 SIMPLE_JWT = {
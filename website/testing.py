@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from achievements.facets import rebuild_facets
+from achievements.geography import get_geography
+from achievements.models import Achievement, AchievementImage
+from chat_app.models import AdminMessage, ChatNotification, ChatRoom, Message
+from requests_app.models import Request, RequestStatus
+from users.models import User
+
+
+PASSWORD = "pw-12345678"
+STATUS_NAMES = ("قيد المراجعة", "قيد التنفيذ", "مكتمل")
+# كاش في الذاكرة خاص بالاختبارات بدل كاش الملفات المشترك مع خادم التطوير
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"}}
+# ميزانيات الوقت للتقرير فقط افتراضيًا (زمن الساعة يتذبذب على أجهزة CI)؛ DJANGO_TEST_TIME_BUDGETS=1 يجعلها تُفشل الاختبار
+ENFORCE_TIME_BUDGETS = os.environ.get("DJANGO_TEST_TIME_BUDGETS", "") in ("1", "true", "yes")
+# مضاعف لميزانيات الوقت على الأجهزة البطيئة، مثل DJANGO_TEST_TIME_FACTOR=3
+TIME_FACTOR = float(os.environ.get("DJANGO_TEST_TIME_FACTOR", "1"))
+
+
+@dataclass(frozen=True)
+class Volume:
+	"""أحجام البيانات المزروعة؛ كبيرة بما يكفي لتظهر أي N+1 كتجاوز واضح للميزانية"""
+
+	citizens: int = 40
+	requests_per_citizen: int = 5
+	rooms: int = 30
+	messages_per_room: int = 60
+	admin_messages_per_room: int = 10
+	achievements: int = 60
+	images_per_achievement: int = 2
+
+
+@dataclass
+class Seed:
+	superuser: User
+	staff: User
+	citizen: User
+	room: ChatRoom
+	request: Request
+	notification: ChatNotification
+
+
+def seed_volume(volume: Volume = Volume()) -> Seed:
+	"""بيانات واقعية بإدخال مجمّع: مواطنون وطلبات وغرف بتاريخ رسائل طويل وإشعارات وإنجازات بصور"""
+	password = make_password(PASSWORD)
+	statuses = [RequestStatus.objects.get_or_create(name=name)[0] for name in STATUS_NAMES]
+	superuser = User.objects.create(username="superuser", password=password, is_staff=True, is_superuser=True)
+	staff = User.objects.create(username="staff", password=password, is_staff=True)
+	citizens = User.objects.bulk_create(
+		User(
+			username=f"citizen{i}",
+			password=password,
+			full_name=f"مواطن رقم {i}",
+			phone=f"0100000{i:04d}",
+			address=f"شارع {i}",
+		)
+		for i in range(volume.citizens)
+	)
+
+	requests = Request.objects.bulk_create(
+		Request(
+			user=user,
+			title=f"طلب {n} للمواطن {i}",
+			description="وصف تفصيلي للطلب " * 5,
+			full_name=user.full_name,
+			phone=user.phone,
+			address=user.address,
+			status=statuses[(i + n) % len(statuses)],
+			tracking_number=f"T{i:04d}{n:03d}",
+		)
+		for i, user in enumerate(citizens)
+		for n in range(volume.requests_per_citizen)
+	)
+
+	rooms = ChatRoom.objects.bulk_create(ChatRoom(user=user) for user in citizens[: volume.rooms])
+	messages = Message.objects.bulk_create(
+		Message(
+			chat_room=room,
+			message_type=("user", "bot", "user", "admin")[n % 4],
+			content=f"رسالة رقم {n} " * 3,
+			is_read=n < volume.messages_per_room // 2,
+		)
+		for room in rooms
+		for n in range(volume.messages_per_room)
+	)
+	AdminMessage.objects.bulk_create(
+		AdminMessage(chat_room=room, admin_user=staff, content=f"رد إداري {n}", is_important=n % 3 == 0)
+		for room in rooms
+		for n in range(volume.admin_messages_per_room)
+	)
+	notifications = ChatNotification.objects.bulk_create(
+		ChatNotification(
+			chat_room=message.chat_room,
+			message=message,
+			priority=(n % 10) + 1,
+			is_read=n % 2 == 0,
+			notification_type="urgent_message" if n % 10 >= 7 else "new_message",
+		)
+		for n, message in enumerate(m for m in messages if m.message_type == "user")
+	)
+
+	areas = get_geography().areas
+	achievements = Achievement.objects.bulk_create(
+		Achievement(title=f"إنجاز {i}", description="وصف الإنجاز " * 10, area=areas[i % len(areas)] if areas else "")
+		for i in range(volume.achievements)
+	)
+	AchievementImage.objects.bulk_create(
+		AchievementImage(achievement=achievement, image=f"achievements/{achievement.pk}-{n}.jpg")
+		for achievement in achievements
+		for n in range(volume.images_per_achievement)
+	)
+	# الإدخال المجمّع لا يطلق الإشارات التي تحدّث جدول الفلاتر
+	rebuild_facets()
+
+	return Seed(
+		superuser=superuser,
+		staff=staff,
+		citizen=citizens[0],
+		room=rooms[0],
+		request=requests[0],
+		notification=notifications[-1],
+	)
+
+
+def _signature(sql: str) -> str:
+	return re.sub(r"'(?:[^']|'')*'|\b\d+\b", "?", sql)
+
+
+@override_settings(CACHES=TEST_CACHES, INSTRUMENTATION_SAMPLE_RATE=0)
+class QueryBudgetTestCase(TestCase):
+	"""يزرع البيانات مرة لكل صنف، ويتحقق من حد أعلى لعدد الاستعلامات في كل عرض ويقيس زمنه"""
+
+	volume = Volume()
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.seed = seed_volume(cls.volume)
+
+	def setUp(self):
+		cache.clear()
+
+	@contextmanager
+	def assertQueryBudget(self, queries: int, ms: float = 500):
+		with CaptureQueriesContext(connection) as captured:
+			started = time.perf_counter()
+			yield captured
+			elapsed = (time.perf_counter() - started) * 1000
+		if len(captured) > queries:
+			repeated = Counter(_signature(query["sql"]) for query in captured.captured_queries)
+			details = "\n".join(f"  {n}x {sql[:200]}" for sql, n in repeated.most_common(5) if n > 1)
+			self.fail(f"{len(captured)} queries, budget is {queries}. Repeated queries:\n{details or '  (none)'}")
+		budget = ms * TIME_FACTOR
+		if elapsed <= budget:
+			return
+		message = f"took {elapsed:.0f}ms, budget is {budget:.0f}ms"
+		if ENFORCE_TIME_BUDGETS:
+			self.fail(message)
+		sys.stderr.write(f"\n[time budget] {self.id()}: {message}\n")
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import warnings
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from users.models import User
+
+from .db_backends.pool import ConnectionPool, PooledConnectionMixin, PoolTimeout
+from .db_router import PIN_COOKIE, REPLICA
+from .route_permissions import RouteTable
+from .testing import PASSWORD, QueryBudgetTestCase
+
+
+class HomeTests(QueryBudgetTestCase):
+	def test_home_anonymous(self):
+		with self.assertQueryBudget(0):
+			response = self.client.get(reverse("home"))
+		self.assertEqual(response.status_code, 200)
+
+	def test_home_superuser_stats(self):
+		self.client.force_login(self.seed.superuser)
+		with self.assertQueryBudget(5):
+			response = self.client.get(reverse("home"))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.context["users_count"], User.objects.count())
+
+
+class PrivateResponseTests(QueryBudgetTestCase):
+	def test_anonymous_pages_are_shareable(self):
+		response = self.client.get(reverse("home"))
+		self.assertNotIn("private", response.get("Cache-Control", ""))
+
+	def test_signed_in_pages_are_private(self):
+		self.client.force_login(self.seed.citizen)
+		for name in ("home", "achievements:list", "chat:get_user_stats"):
+			with self.subTest(name):
+				response = self.client.get(reverse(name))
+				self.assertIn("private", response["Cache-Control"])
+
+	def test_login_response_is_private(self):
+		response = self.client.post(
+			reverse("login"), {"username": self.seed.citizen.username, "password": PASSWORD}
+		)
+		self.assertIn("sessionid", response.cookies)
+		self.assertIn("private", response["Cache-Control"])
+
+
+class ReadYourWritesTests(QueryBudgetTestCase):
+	@contextmanager
+	def replica(self):
+		# الاسم معرّف في الإعدادات دون اتصال فعلي: أي قراءة من النسخة المتماثلة تفشل بـ ConnectionDoesNotExist
+		databases = {**settings.DATABASES, REPLICA: settings.DATABASES[DEFAULT_DB_ALIAS]}
+		with warnings.catch_warnings():
+			warnings.simplefilter("ignore")
+			with override_settings(DATABASES=databases):
+				yield
+
+	def test_get_that_writes_pins_to_primary(self):
+		# مواطن بلا غرفة: chat_view ينشئ الغرفة ورسالة الترحيب في طلب GET
+		self.client.force_login(User.objects.get(username="citizen35"))
+		with self.replica():
+			response = self.client.get(reverse("chat:chat"))
+			self.assertIn(PIN_COOKIE, response.cookies)
+			# الاستطلاع التالي يقرأ الغرفة الجديدة من الأساسية
+			response = self.client.get(reverse("chat:get_messages"))
+		self.assertEqual(response.status_code, 200)
+
+	def test_get_without_writes_is_not_pinned(self):
+		self.client.force_login(self.seed.citizen)
+		with self.replica():
+			response = self.client.get(reverse("chat:chat"))
+		self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class RouteTableTests(SimpleTestCase):
+	def test_deepest_prefix_wins(self):
+		table = RouteTable({"/dashboard/": "superuser", "/dashboard/metrics/": "staff", "/dashboard/public/": "public"})
+		self.assertEqual(table.required_role("/dashboard/"), "superuser")
+		self.assertEqual(table.required_role("/dashboard/exports/1/"), "superuser")
+		self.assertEqual(table.required_role("/dashboard/metrics/"), "staff")
+		self.assertIsNone(table.required_role("/dashboard/public/page/"))
+		# مقاطع كاملة فقط: /dashboardx/ ليست تحت /dashboard/
+		self.assertIsNone(table.required_role("/dashboardx/"))
+
+
+class FakeConnection:
+	def __init__(self, n: int):
+		self.n = n
+		self.closed = False
+
+	def close(self):
+		self.closed = True
+
+
+class FakeConnector:
+	def __init__(self, failures: int = 0):
+		self.failures = failures
+		self.made: list[FakeConnection] = []
+
+	def __call__(self):
+		if self.failures:
+			self.failures -= 1
+			raise OSError("connection refused")
+		self.made.append(FakeConnection(len(self.made)))
+		return self.made[-1]
+
+
+class ConnectionPoolTests(SimpleTestCase):
+	def test_failed_connect_frees_its_slot(self):
+		pool = ConnectionPool(FakeConnector(failures=1), max_size=1, timeout=0)
+		with self.assertRaises(OSError):
+			pool.acquire()
+		self.assertEqual(pool.size, 0)
+		pool.acquire()
+		self.assertEqual(pool.size, 1)
+
+	def test_exhausted_pool_times_out(self):
+		pool = ConnectionPool(FakeConnector(), max_size=1, timeout=0.01)
+		pool.acquire()
+		with self.assertRaises(PoolTimeout):
+			pool.acquire()
+		self.assertEqual(pool.size, 1)
+
+	def test_reuses_most_recently_released(self):
+		connector = FakeConnector()
+		pool = ConnectionPool(connector, max_size=2)
+		first, second = pool.acquire(), pool.acquire()
+		pool.release(first)
+		pool.release(second)
+		self.assertIs(pool.acquire(), second)
+		self.assertIs(pool.acquire(), first)
+		self.assertEqual(len(connector.made), 2)
+
+	def test_idle_connection_checked_after_recycle_after(self):
+		connector = FakeConnector()
+		pool = ConnectionPool(connector, max_size=1, check=lambda connection: False, recycle_after=0)
+		stale = pool.acquire()
+		pool.release(stale)
+		fresh = pool.acquire()
+		self.assertIsNot(fresh, stale)
+		self.assertTrue(stale.closed)
+		self.assertEqual(pool.size, 1)
+
+	def test_recent_connection_not_checked(self):
+		pool = ConnectionPool(FakeConnector(), check=lambda connection: self.fail("checked"), recycle_after=60)
+		connection = pool.acquire()
+		pool.release(connection)
+		self.assertIs(pool.acquire(), connection)
+
+
+class FakeWrapperBase:
+	"""الحد الأدنى من BaseDatabaseWrapper الذي يستخدمه PooledConnectionMixin"""
+
+	def __init__(self, pool: ConnectionPool):
+		self._connection_pool = pool
+		self.connection = pool.acquire()
+		self.in_atomic_block = False
+		self.errors_occurred = False
+		self.autocommit = True
+		self.initialized = 0
+
+	def init_connection_state(self):
+		self.initialized += 1
+
+	def _close(self):
+		self.connection.close()
+
+
+class FakeWrapper(PooledConnectionMixin, FakeWrapperBase):
+	pass
+
+
+class PooledConnectionMixinTests(SimpleTestCase):
+	def close(self, **state) -> tuple[ConnectionPool, FakeConnection]:
+		pool = ConnectionPool(FakeConnector())
+		wrapper = FakeWrapper(pool)
+		connection = wrapper.connection
+		for name, value in state.items():
+			setattr(wrapper, name, value)
+		wrapper._close()
+		return pool, connection
+
+	def test_clean_connection_returns_to_pool(self):
+		pool, connection = self.close()
+		self.assertEqual((pool.size, pool.idle), (1, 1))
+		self.assertFalse(connection.closed)
+
+	def test_dirty_connection_is_discarded(self):
+		for state in ({"in_atomic_block": True}, {"errors_occurred": True}, {"autocommit": False}):
+			with self.subTest(**state):
+				pool, connection = self.close(**state)
+				self.assertEqual((pool.size, pool.idle), (0, 0))
+				self.assertTrue(connection.closed)
+
+	def test_session_initialized_once_per_connection(self):
+		pool = ConnectionPool(FakeConnector())
+		wrapper = FakeWrapper(pool)
+		wrapper.init_connection_state()
+		wrapper._close()
+		wrapper.connection = pool.acquire()
+		wrapper.init_connection_state()
+		self.assertEqual(wrapper.initialized, 1)
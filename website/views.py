@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import json
+
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
 
 from achievements.models import Achievement
 from requests_app.models import Request
 from users.models import User
 
+from .db_router import replica_reads
+from .page_cache import public_page_cache
+from .service_worker import precache_manifest
+
 
+@public_page_cache
+@replica_reads
 def home_view(request):
     context = {}
     
@@ -27,7 +36,15 @@ def home_view(request):
     return render(request, "home.html", context)
 
 
+@public_page_cache
 def about_ahmed_abouzeid_view(request):
     """عرض صفحة عن النائب أحمد أبو زيد"""
     return render(request, "about_ahmed_abouzeid.html")
 
+
+@cache_control(no_cache=True)
+def service_worker_view(request):
+    """عامل الخدمة من جذر الموقع حتى يشمل نطاقه كل الصفحات"""
+    manifest, version = precache_manifest()
+    context = {"manifest": json.dumps(manifest), "version": version}
+    return render(request, "sw.js", context, content_type="application/javascript")